@@ -0,0 +1,116 @@
+"""
+md2pptx-builder - Parser engine throughput benchmark
+
+使い方:
+    python benchmarks/parser_throughput.py [Markdownファイル ...] [--slides N] [--repeat N]
+
+ファイルを省略すると、見出し・段落・入れ子のリスト・コードブロック・強調・リンクを
+含む合成スライドを使う。エンジンごとにスライドのパースだけを計測する（分割は含まない）。
+"""
+
+import os
+import sys
+import time
+import argparse
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from md2pptx_builder.parser import MarkdownParser  # noqa: E402
+from md2pptx_builder.fast_parser import PARSER_ENGINES, parse_subset  # noqa: E402
+
+def synthetic_slides(count: int) -> List[str]:
+    """計測用の合成スライドを作成する
+    
+    Args:
+        count: スライド数
+    
+    Returns:
+        List[str]: スライドのMarkdownテキストのリスト
+    """
+    slides = []
+    for i in range(count):
+        slides.append(
+            f"# スライド{i + 1}: **重要**な変更点\n"
+            f"\n"
+            f"これは*説明*の段落です。`config.yaml` の設定は[ドキュメント](https://example.com/docs/{i})を参照。\n"
+            f"2行目の文章も続きます。\n"
+            f"\n"
+            f"## 詳細\n"
+            f"\n"
+            f"- 項目 {i} の **要点**\n"
+            f"  - 入れ子の項目 `value={i}`\n"
+            f"  - もう一つの*補足*\n"
+            f"- 次の項目\n"
+            f"  1. 手順1\n"
+            f"  2. 手順2\n"
+            f"\n"
+            f"```python\n"
+            f"def handler(event):\n"
+            f"    return {{'id': {i}}}\n"
+            f"```\n"
+        )
+    return slides
+
+def measure(engine: str, slides: List[str], repeat: int) -> float:
+    """エンジンでスライドをすべてパースする時間を計測する（最良値）
+    
+    Args:
+        engine: パーサーエンジン
+        slides: スライドのMarkdownテキストのリスト
+        repeat: 計測回数
+    
+    Returns:
+        float: 秒数
+    """
+    parser = MarkdownParser(engine=engine, workers=1)
+    # mistuneの読み込みは計測に含めない
+    parser.parse_slide(slides[0])
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in slides:
+            parser.parse_slide(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main() -> int:
+    """ベンチマークを実行する
+    
+    Returns:
+        int: 終了コード
+    """
+    parser = argparse.ArgumentParser(description="パーサーエンジンのスループットを計測します")
+    parser.add_argument("files", nargs="*", help="計測に使うMarkdownファイル（省略時は合成スライド）")
+    parser.add_argument("--slides", type=int, default=2000, help="合成スライドの枚数")
+    parser.add_argument("--repeat", type=int, default=5, help="計測回数（最良値を表示）")
+    args = parser.parse_args()
+    
+    if args.files:
+        splitter = MarkdownParser()
+        slides = []
+        for path in args.files:
+            with open(path, encoding="utf-8") as f:
+                slides.extend(splitter.split_to_slides(f.read()))
+    else:
+        slides = synthetic_slides(args.slides)
+    if not slides:
+        print("スライドがありません", file=sys.stderr)
+        return 1
+    
+    size = sum(len(text.encode("utf-8")) for text in slides)
+    handled = sum(parse_subset(text) is not None for text in slides)
+    print(f"{len(slides)}枚 ({size / 1024 / 1024:.2f} MB)、fast で処理できるスライド: {handled}枚 "
+          f"({handled / len(slides):.0%})")
+    
+    results = {}
+    for engine in PARSER_ENGINES:
+        seconds = measure(engine, slides, args.repeat)
+        results[engine] = seconds
+        print(f"  {engine:8} {seconds:8.3f} 秒  {len(slides) / seconds:10.0f} 枚/秒  "
+              f"{size / seconds / 1024 / 1024:7.2f} MB/秒")
+    print(f"  fast / mistune: {results['mistune'] / results['fast']:.1f}倍")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
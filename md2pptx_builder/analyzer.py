@@ -0,0 +1,171 @@
+"""
+md2pptx-builder - PPTX size analyzer
+"""
+
+import re
+import logging
+import zipfile
+from collections import defaultdict
+from pathlib import Path
+from typing import List, Dict, Any, Union
+
+from md2pptx_builder.package import hash_member, read_relationships, slide_part_names
+
+logger = logging.getLogger(__name__)
+
+_SHAPE_RE = re.compile(rb"<p:(?:sp|pic|graphicFrame|grpSp|cxnSp)[\s/>]")
+_PARAGRAPH_RE = re.compile(rb"<a:p[\s/>]")
+_RUN_RE = re.compile(rb"<a:r[\s/>]")
+
+def analyze_pptx(file_path: Union[str, Path]) -> Dict[str, Any]:
+    """PPTXファイルのZIPを直接読み、サイズの内訳を調べる
+    
+    スライドXMLは要素数を数えるだけで、XMLとしてはパースしない。メディアは
+    ZIPの中央ディレクトリにあるサイズとCRCが一致するものだけハッシュを計算して
+    重複を判定する。
+    
+    Args:
+        file_path: PPTXファイルパス
+    
+    Returns:
+        Dict[str, Any]: スライド、メディア、重複メディアの情報と合計サイズ
+    """
+    with zipfile.ZipFile(file_path) as zf:
+        infos = {info.filename: info for info in zf.infolist()}
+        names = list(infos)
+        media_slides: Dict[str, List[int]] = defaultdict(list)
+        slides = []
+        
+        for number, name in enumerate(slide_part_names(zf), 1):
+            data = zf.read(name)
+            media = sorted({
+                target for target in read_relationships(zf, name).values()
+                if target.startswith("ppt/media/")
+            })
+            for target in media:
+                media_slides[target].append(number)
+            slides.append({
+                "number": number,
+                "part": name,
+                "xml_bytes": len(data),
+                "compressed_bytes": infos[name].compress_size,
+                "shapes": len(_SHAPE_RE.findall(data)),
+                "paragraphs": len(_PARAGRAPH_RE.findall(data)),
+                "runs": len(_RUN_RE.findall(data)),
+                "media": media,
+                "media_bytes": sum(infos[target].file_size for target in media if target in infos),
+            })
+        
+        media_parts = []
+        candidates: Dict[tuple, List[str]] = defaultdict(list)
+        for name, info in infos.items():
+            if not name.startswith("ppt/media/"):
+                continue
+            media_parts.append({
+                "part": name,
+                "bytes": info.file_size,
+                "compressed_bytes": info.compress_size,
+                "slides": media_slides.get(name, []),
+            })
+            candidates[(info.file_size, info.CRC)].append(name)
+        
+        # サイズとCRCが一致したものだけ内容のハッシュで確認する
+        groups: Dict[str, List[str]] = defaultdict(list)
+        for parts in candidates.values():
+            if len(parts) < 2:
+                continue
+            for name in parts:
+                groups[hash_member(zf, name)].append(name)
+        
+        duplicates = []
+        for digest, parts in groups.items():
+            if len(parts) < 2:
+                continue
+            size = infos[parts[0]].file_size
+            duplicates.append({
+                "sha1": digest,
+                "parts": sorted(parts),
+                "bytes": size,
+                "wasted_bytes": size * (len(parts) - 1),
+            })
+        
+        slide_xml_bytes = sum(slide["xml_bytes"] for slide in slides)
+        media_bytes = sum(part["bytes"] for part in media_parts)
+        total_bytes = sum(info.file_size for info in infos.values())
+    
+    duplicates.sort(key=lambda group: group["wasted_bytes"], reverse=True)
+    logger.debug(f"{len(slides)}枚のスライドと{len(media_parts)}個のメディアを解析しました")
+    
+    return {
+        "file": str(file_path),
+        "file_bytes": Path(file_path).stat().st_size,
+        "total_bytes": total_bytes,
+        "slide_xml_bytes": slide_xml_bytes,
+        "media_bytes": media_bytes,
+        "other_bytes": total_bytes - slide_xml_bytes - media_bytes,
+        "slides": slides,
+        "media": media_parts,
+        "duplicates": duplicates,
+    }
+
+def _format_bytes(size: int) -> str:
+    """バイト数を読みやすい単位に変換する
+    
+    Args:
+        size: バイト数
+    
+    Returns:
+        str: 単位付きの文字列
+    """
+    value = float(size)
+    for unit in ("B", "KB", "MB"):
+        if value < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GB"
+
+def format_report(report: Dict[str, Any], top: int = 10) -> str:
+    """解析結果を人が読めるテキストに整形する
+    
+    Args:
+        report: analyze_pptx の結果
+        top: 上位何件を表示するか
+    
+    Returns:
+        str: レポート
+    """
+    slides = report["slides"]
+    lines = [
+        f"ファイル: {report['file']} ({_format_bytes(report['file_bytes'])}、展開後 {_format_bytes(report['total_bytes'])})",
+        f"  スライドXML: {_format_bytes(report['slide_xml_bytes'])} ({len(slides)}枚)",
+        f"  メディア: {_format_bytes(report['media_bytes'])} ({len(report['media'])}個)",
+        f"  その他: {_format_bytes(report['other_bytes'])}",
+        "",
+        f"スライドXMLが大きいスライド（上位{top}件）:",
+    ]
+    
+    for slide in sorted(slides, key=lambda slide: slide["xml_bytes"], reverse=True)[:top]:
+        lines.append(
+            f"  {slide['number']:>5}  {_format_bytes(slide['xml_bytes']):>10}  "
+            f"図形 {slide['shapes']}, 段落 {slide['paragraphs']}, ラン {slide['runs']}, "
+            f"メディア {_format_bytes(slide['media_bytes'])}"
+        )
+    
+    lines.append("")
+    lines.append(f"大きいメディア（上位{top}件）:")
+    for part in sorted(report["media"], key=lambda part: part["bytes"], reverse=True)[:top]:
+        used_by = ", ".join(str(number) for number in part["slides"][:10])
+        if len(part["slides"]) > 10:
+            used_by += ", ..."
+        lines.append(f"  {_format_bytes(part['bytes']):>10}  {part['part']}  (スライド: {used_by or 'なし'})")
+    
+    lines.append("")
+    if report["duplicates"]:
+        wasted = sum(group["wasted_bytes"] for group in report["duplicates"])
+        lines.append(f"重複メディア: {len(report['duplicates'])}組、無駄な容量 {_format_bytes(wasted)}")
+        for group in report["duplicates"][:top]:
+            lines.append(f"  {_format_bytes(group['wasted_bytes']):>10}  {', '.join(group['parts'])}")
+    else:
+        lines.append("重複メディア: なし")
+    
+    return "\n".join(lines)
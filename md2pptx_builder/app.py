@@ -6,7 +6,7 @@ import os
 import logging
 import tempfile
 from pathlib import Path
-from typing import Optional, Tuple, List, Dict, Any
+from typing import Optional, Tuple, List, Dict, Any, Collection
 
 import streamlit as st
 from PIL import Image
@@ -14,6 +14,7 @@ from PIL import Image
 # 相対インポートに変更
 from parser import MarkdownParser
 from builder import PPTXBuilder
+from preview import IncrementalPreview
 from utils import (
     setup_logging, is_valid_image, is_valid_markdown, 
     create_temp_file, clean_temp_files
@@ -73,11 +74,45 @@ def save_uploaded_file(uploaded_file) -> Optional[str]:
         st.error(f"ファイル保存エラー: {e}")
         return None
 
-def display_slide_preview(slides_data: List[Dict[str, Any]]) -> None:
+def get_preview() -> IncrementalPreview:
+    """セッションごとのプレビューを返す（前回のパース結果を再実行の間で保持する）
+    
+    Returns:
+        IncrementalPreview: プレビュー
+    """
+    if "preview" not in st.session_state:
+        st.session_state["preview"] = IncrementalPreview()
+    return st.session_state["preview"]
+
+def update_preview(md_content: str) -> List[int]:
+    """プレビューに編集を反映し、変更されたスライドだけをパースし直す
+    
+    Args:
+        md_content: Markdownテキスト
+        
+    Returns:
+        List[int]: パースし直したスライドのインデックス（初回のプレビューでは空）
+    """
+    preview = get_preview()
+    if md_content == preview.text:
+        return []
+    
+    # 初回はすべてのスライドをパースするが、すべてを展開しないよう変更なしとして扱う
+    incremental = bool(preview.text)
+    status = st.empty()
+    status.caption("プレビューを更新しています...")
+    changed = preview.update(md_content)
+    status.empty()
+    return changed if incremental else []
+
+def display_slide_preview(slides_data: List[Dict[str, Any]], changed: Collection[int] = ()) -> None:
     """スライドプレビューを表示する
     
+    変更のないスライドは前回と同じ内容を出力するため、ブラウザ側では描画し直されない。
+    
     Args:
         slides_data: スライドデータのリスト
+        changed: 変更されたスライドのインデックス（展開して表示する）
     """
     if not slides_data:
         st.warning("スライドがありません。Markdownテキストを確認してください。")
@@ -86,7 +121,7 @@ def display_slide_preview(slides_data: List[Dict[str, Any]]) -> None:
     st.subheader("スライドプレビュー")
     
     for i, slide in enumerate(slides_data):
-        with st.expander(f"スライド {i+1}: {slide['title']}"):
+        with st.expander(f"スライド {i+1}: {slide['title']}", expanded=i in changed):
             st.markdown(slide["raw_text"])
 
 def create_presentation(
@@ -275,6 +310,13 @@ def app():
         if not background_path or not logo_path:
             st.warning("変換を実行するには、背景画像とロゴ画像をアップロードしてください。")
         
+        # 編集のたびにプレビューを更新する（変更されたスライドだけをパースし直す）
+        live_preview = st.checkbox(
+            "ライブプレビュー",
+            value=False,
+            help="入力を確定するたびに、変更されたスライドだけをパースし直してプレビューを更新します"
+        )
+        
         # ボタン列を作成
         col1, col2 = st.columns(2)
         
@@ -286,17 +328,17 @@ def app():
         with col2:
             convert_button = st.button("PowerPointに変換", type="primary", disabled=not (background_path and logo_path))
         
-        # プレビューボタンが押された場合
-        if preview_button:
+        # ライブプレビューが有効な場合、またはプレビューボタンが押された場合
+        if live_preview:
+            changed = update_preview(md_content)
+            display_slide_preview(get_preview().slides, changed)
+        elif preview_button:
             with st.spinner("プレビュー生成中..."):
-                # パーサー初期化
-                parser = MarkdownParser()
-                
-                # スライドデータ取得
-                slides_data = parser.process_markdown_content(md_content)
+                # 前回のプレビューから変更されたスライドだけをパースし直す
+                changed = update_preview(md_content)
                 
                 # プレビュー表示
-                display_slide_preview(slides_data)
+                display_slide_preview(get_preview().slides, changed)
         
         # 変換ボタンが押された場合
         if convert_button and background_path and logo_path:
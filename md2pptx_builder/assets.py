@@ -0,0 +1,251 @@
+"""
+md2pptx-builder - Content-addressed store for preprocessed images
+"""
+
+import io
+import os
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from typing import Optional, Union, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 埋め込む画像の解像度（スライド上の1インチあたりのピクセル数）
+ASSET_DPI = 200
+
+# JPEG画像を再圧縮するときの品質
+ASSET_JPEG_QUALITY = 90
+
+# キャッシュの容量の上限（バイト）
+ASSET_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# 前処理の内容を変えたら更新し、古いキャッシュを使わないようにする
+ASSET_FORMAT_VERSION = 1
+
+# キャッシュディレクトリを指定する環境変数
+ASSET_CACHE_ENV = "MD2PPTX_ASSET_CACHE"
+
+def default_asset_cache_dir() -> Path:
+    """既定のキャッシュディレクトリを返す
+    
+    Returns:
+        Path: キャッシュディレクトリ
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(Path.home(), ".cache")
+    return Path(base) / "md2pptx-builder" / "assets"
+
+def _preprocess(data: bytes, width: int, height: Optional[int]) -> bytes:
+    """画像を検証し、縮小・再圧縮したバイト列を返す
+    
+    Args:
+        data: 元の画像のバイト列
+        width: 最大幅（ピクセル）
+        height: 最大高さ（ピクセル、Noneなら幅のみで判定）
+    
+    Returns:
+        bytes: 埋め込み用の画像のバイト列
+    
+    Raises:
+        ValueError: 画像として読み込めない場合
+    """
+    from PIL import Image
+    
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            img.verify()
+        img = Image.open(io.BytesIO(data))
+        img.load()
+    except Exception as e:
+        raise ValueError(f"画像を読み込めません: {e}") from e
+    
+    source_format = img.format
+    scale = width / img.width
+    if height:
+        scale = min(scale, height / img.height)
+    resized = scale < 1.0
+    if resized:
+        size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+        img = img.resize(size, Image.LANCZOS)
+    
+    output = io.BytesIO()
+    if source_format == "JPEG" and img.mode in ("RGB", "L", "CMYK"):
+        img.save(output, "JPEG", quality=ASSET_JPEG_QUALITY, optimize=True)
+    else:
+        if img.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+            img = img.convert("RGBA")
+        img.save(output, "PNG", optimize=True)
+    processed = output.getvalue()
+    
+    # 縮小不要で再圧縮しても小さくならないPNG/JPEGは元のまま使う
+    if not resized and source_format in ("PNG", "JPEG") and len(processed) >= len(data):
+        return data
+    return processed
+
+class AssetStore:
+    """前処理済みの画像を内容のハッシュで保存するディスクキャッシュ
+    
+    キーは元画像の内容のハッシュと埋め込みサイズから作るため、同じ画像を
+    複数の実行やワーカープロセスで共有できる。書き込みは一時ファイルからの
+    os.replace で行い、容量の上限を超えたら最終アクセスの古いものから削除する。
+    """
+    
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None,
+                 max_bytes: int = ASSET_CACHE_MAX_BYTES):
+        """
+        Args:
+            cache_dir: キャッシュディレクトリ（省略時は既定のディレクトリ）
+            max_bytes: キャッシュの容量の上限（バイト）
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else default_asset_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+    
+    def _entry_path(self, key: str) -> Path:
+        """キーに対応するエントリのパスを返す
+        
+        Args:
+            key: キャッシュキー
+        
+        Returns:
+            Path: エントリのパス
+        """
+        return self.cache_dir / key[:2] / key
+    
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        """キャッシュ内のエントリを列挙する
+        
+        Returns:
+            List[Tuple[float, int, Path]]: (最終アクセス時刻, サイズ, パス) のリスト
+        """
+        entries = []
+        if not self.cache_dir.exists():
+            return entries
+        for shard in self.cache_dir.iterdir():
+            if not shard.is_dir():
+                continue
+            for path in shard.iterdir():
+                if path.name.startswith("."):
+                    continue
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    # 他のプロセスが削除した
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+    
+    def _read(self, path: Path) -> Optional[bytes]:
+        """エントリを読み込み、最終アクセス時刻を更新する
+        
+        Args:
+            path: エントリのパス
+        
+        Returns:
+            Optional[bytes]: エントリの内容（存在しなければNone）
+        """
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+    
+    def _write(self, path: Path, data: bytes) -> None:
+        """エントリを書き込む（他のプロセスからは書き込み途中の内容は見えない）
+        
+        Args:
+            path: エントリのパス
+            data: 書き込む内容
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+    
+    def evict(self) -> int:
+        """容量の上限を超えている場合、最終アクセスの古いエントリから削除する
+        
+        Returns:
+            int: 削除したエントリ数
+        """
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        
+        if removed:
+            logger.debug(f"画像キャッシュから{removed}件を削除しました")
+        return removed
+    
+    def prepare(self, file_path: Union[str, Path], width: int, height: Optional[int] = None) -> bytes:
+        """埋め込み用に前処理した画像のバイト列を返す
+        
+        キャッシュにあればそれを返し、なければ検証・縮小・再圧縮して保存する。
+        
+        Args:
+            file_path: 画像ファイルパス
+            width: 埋め込む幅（ピクセル）
+            height: 埋め込む高さ（ピクセル、Noneなら幅のみで判定）
+        
+        Returns:
+            bytes: 埋め込み用の画像のバイト列
+        
+        Raises:
+            ValueError: 画像として読み込めない場合
+        """
+        with open(file_path, "rb") as f:
+            data = f.read()
+        
+        digest = hashlib.sha256(data)
+        digest.update(f"\0{width}x{height or 0}\0v{ASSET_FORMAT_VERSION}".encode("ascii"))
+        path = self._entry_path(digest.hexdigest())
+        
+        cached = self._read(path)
+        if cached is not None:
+            self.hits += 1
+            logger.debug(f"キャッシュ済みの画像を使用: {file_path}")
+            return cached
+        
+        self.misses += 1
+        processed = _preprocess(data, width, height)
+        try:
+            self._write(path, processed)
+            self.evict()
+        except OSError as e:
+            # キャッシュに書けなくても変換は続ける
+            logger.warning(f"画像キャッシュへの書き込みに失敗: {e}")
+        
+        logger.debug(f"画像を前処理しました: {file_path} ({len(data)} → {len(processed)} バイト)")
+        return processed
+    
+    def clear(self) -> None:
+        """キャッシュのエントリをすべて削除する"""
+        for _, _, path in self._entries():
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
@@ -2,21 +2,136 @@
 md2pptx-builder - PowerPoint builder
 """
 
+import io
 import os
+import re
+import copy
+import json
+import zlib
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional, Tuple, Union
+import zipfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+from typing import IO, List, Dict, Any, Optional, Tuple, Union
 from pathlib import Path
+from xml.sax.saxutils import escape
 
 from pptx import Presentation
 from pptx.util import Inches, Pt
 from pptx.enum.shapes import MSO_SHAPE_TYPE
-from pptx.enum.text import PP_ALIGN
+from pptx.enum.text import PP_ALIGN, MSO_AUTO_SIZE
 from pptx.dml.color import RGBColor
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import qn, nsdecls
+from pptx.oxml.xmlchemy import OxmlElement
+from pptx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from pptx.opc.package import Part
+from pptx.opc.packuri import PackURI
+from pptx.parts.slide import SlidePart
 
-from md2pptx_builder.utils import is_valid_image, get_image_dimensions
+from md2pptx_builder import __version__
+from md2pptx_builder.utils import is_valid_image, get_image_dimensions, TextFlattener
+from md2pptx_builder.assets import AssetStore, ASSET_DPI
+from md2pptx_builder.highlight import highlight_code
+from md2pptx_builder.memory import MemoryReport, memory_stage
+from md2pptx_builder.package import (
+    CUSTOM_PROPERTIES_PART, SLIDE_HASHES_PROPERTY, SETTINGS_FINGERPRINT_PROPERTY, add_default_content_type, get_custom_property, referenced_parts,
+    rels_path, rewrite_package, set_custom_property, slide_part_names
+)
+from md2pptx_builder.layout import (
+    ContentLayout, get_measurer, find_font_file, table_rows,
+    BODY_FONT_SIZE, CODE_FONT_SIZE, TABLE_FONT_SIZE, HEADING_FONT_SIZES,
+    EMU_PER_POINT, FRAME_INSET_Y, TABLE_SPACE_AFTER, LINE_SPACING, LIST_MAX_LEVEL, LIST_MARKER_WIDTH,
+    LIST_SPACE_BEFORE, LIST_SPACE_AFTER, LIST_ITEM_SPACE_AFTER, NESTED_LIST_SPACE_AFTER, list_item_geometry
+)
 
 logger = logging.getLogger(__name__)
 
+# python-pptxが表に適用する既定の表スタイル（中間スタイル2 - アクセント1）
+TABLE_STYLE_ID = "{5C22544A-7EE6-4342-B048-85BDC9FD1C3A}"
+
+# Markdownの列の配置とDrawingMLの段落配置の対応
+TABLE_ALIGNMENTS = {"left": "l", "center": "ctr", "right": "r"}
+
+# 番号付きリストの区切り文字とDrawingMLの自動番号の種類の対応
+LIST_NUMBERING = {".": "arabicPeriod", ")": "arabicParenR"}
+
+# ロゴの幅
+LOGO_WIDTH = Inches(1.2)
+
+# XMLに含められない制御文字
+_INVALID_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# メディアのパート名の番号（ppt/media/image12.png → 12）
+_MEDIA_NUMBER_RE = re.compile(r"(\d+)\.\w+$")
+
+# (タイトル, コンテンツのAST, フォント縮小率, スライド番号, 総数)
+Page = Tuple[str, List[Dict[str, Any]], float, int, int]
+
+# 作成するページがこの枚数以上のときは複数プロセスで並列に描画する
+PARALLEL_RENDER_MIN_PAGES = 16
+
+# 並列描画で1つのプロセスに渡すページ数
+RENDER_BATCH_SIZE = 8
+
+# (スライドのXML, 画像のリレーションシップの (ID, SHA-1) のリスト)
+RenderedSlide = Tuple[bytes, List[Tuple[str, str]]]
+
+_worker_builder = None
+
+def _init_render_worker(options: Dict[str, Any], background_image: Union[str, bytes],
+                        logo_image: Union[str, bytes]) -> None:
+    """ワーカープロセスで描画に使うビルダーを作成する
+    
+    Args:
+        options: 親プロセスのビルダーのコンストラクター引数
+        background_image: 親プロセスで準備済みの背景画像
+        logo_image: 親プロセスで準備済みのロゴ画像
+    """
+    global _worker_builder
+    _worker_builder = PPTXBuilder(**options)
+    _worker_builder.background_image = background_image
+    _worker_builder.logo_image = logo_image
+
+def _render_page_batch(pages: List[Page]) -> Tuple[List[RenderedSlide], Dict[str, bytes]]:
+    """ワーカープロセスでページをまとめて描画し、スライドのXMLと画像を返す
+    
+    python-pptxのオブジェクトはプロセス間で受け渡せないため、シリアライズしたXMLと
+    参照する画像だけを返す。描画したスライドはワーカーのプレゼンテーションから取り除く。
+    
+    Args:
+        pages: 描画するページのリスト
+    
+    Returns:
+        Tuple[List[RenderedSlide], Dict[str, bytes]]: ページごとのXMLと画像の参照、SHA-1と画像の対応
+    
+    Raises:
+        ValueError: 画像とレイアウト以外のリレーションシップがある場合
+    """
+    builder = _worker_builder
+    slides = []
+    images: Dict[str, bytes] = {}
+    for page in pages:
+        slide = builder._render_page(page)
+        relationships = []
+        for rId, rel in slide.part.rels.items():
+            if rel.reltype == RT.SLIDE_LAYOUT:
+                continue
+            if rel.is_external or rel.reltype != RT.IMAGE:
+                raise ValueError(f"並列描画で扱えないリレーションシップです: {rel.reltype}")
+            image_part = rel.target_part
+            images.setdefault(image_part.sha1, image_part.blob)
+            relationships.append((rId, image_part.sha1))
+        slides.append((slide.part.blob, relationships))
+        
+        sldIdLst = builder.prs.slides._sldIdLst
+        sldId = sldIdLst[-1]
+        sldIdLst.remove(sldId)
+        builder.prs.part.drop_rel(sldId.rId)
+    return slides, images
+
 class PPTXBuilder:
     """MarkdownからPowerPointを生成するクラス"""
     
@@ -25,7 +140,10 @@ class PPTXBuilder:
                  logo_path: str, 
                  template_path: Optional[str] = None,
                  font_family: str = "メイリオ",
-                 verbose: bool = False):
+                 verbose: bool = False,
+                 measure_font_path: Optional[str] = None,
+                 asset_store: Optional[AssetStore] = None,
+                 workers: Optional[int] = 1):
         """
         Args:
             background_path: 背景画像のパス
@@ -33,44 +151,196 @@ class PPTXBuilder:
             template_path: テンプレートPPTXのパス（オプション）
             font_family: 使用するフォント
             verbose: 詳細ログを出力するかどうか
+            measure_font_path: テキスト計測に使うフォントファイル（省略時はfont_familyから探す）
+            asset_store: 前処理済み画像のキャッシュ（省略時は画像ファイルをそのまま埋め込む）
+            workers: 並列描画のプロセス数（1なら並列化しない、NoneならCPU数）
         """
         self.background_path = background_path
         self.logo_path = logo_path
         self.template_path = template_path
         self.font_family = font_family
         self.verbose = verbose
+        self.workers = workers
+        
+        # 並列描画のワーカープロセスで同じ設定のビルダーを作るための引数
+        self._options = {
+            "background_path": background_path,
+            "logo_path": logo_path,
+            "template_path": template_path,
+            "font_family": font_family,
+            "verbose": verbose,
+            "measure_font_path": measure_font_path,
+        }
         
         # フォント設定の英語フォールバック対応
         self.fallback_font = "Arial"
         if "明朝" in self.font_family or "Serif" in self.font_family:
             self.fallback_font = "Times New Roman"
         
-        # 画像ファイルのチェック
-        if not is_valid_image(background_path):
-            raise ValueError(f"無効な背景画像: {background_path}")
-        if not is_valid_image(logo_path):
-            raise ValueError(f"無効なロゴ画像: {logo_path}")
-        
-        # プレゼンテーション作成
+        # プレゼンテーション作成（テンプレートは一度だけ読み込む）
+        template = None
         if template_path and os.path.exists(template_path):
-            self.prs = Presentation(template_path)
+            with open(template_path, "rb") as f:
+                template = f.read()
+            self.prs = Presentation(io.BytesIO(template))
             logger.info(f"テンプレートを使用: {template_path}")
         else:
             self.prs = Presentation()
             logger.info("新規プレゼンテーションを作成")
-            
+        
         # デフォルトのスライドサイズを16:9に設定（テンプレートが無い場合）
         if not template_path:
             self.prs.slide_width = Inches(16 * 0.75)  # 16:9 比率
             self.prs.slide_height = Inches(9 * 0.75)
+        
+        # ビルドごとにこの空のプレゼンテーションを複製して使う（開き直すより速い）
+        self._base_presentation = copy.deepcopy(self.prs)
+        
+        # 画像ファイルのチェック（キャッシュがあれば検証済みの縮小画像を使う）
+        self.background_image = self._prepare_image(
+            background_path, asset_store, self.prs.slide_width, self.prs.slide_height, "背景画像"
+        )
+        self.logo_image = self._prepare_image(logo_path, asset_store, LOGO_WIDTH, None, "ロゴ画像")
+        self._fingerprint = self._settings_fingerprint(template)
+        
+        # ノードのテキストはレイアウト計算と描画で共有して記憶する
+        self._text = TextFlattener()
+        
+        # コンテンツ領域の計測（はみ出し防止のための縮小率と改ページの計算）
+        _, _, content_width, content_height = self._content_box_geometry()
+        self.layout = ContentLayout(
+            content_width / EMU_PER_POINT,
+            content_height / EMU_PER_POINT,
+            get_measurer(measure_font_path or find_font_file(self.font_family)),
+            get_measurer(find_font_file("Consolas"), True),
+            self._text
+        )
     
-    def create_slide(self, slide_data: Dict[str, Any], total_slides: int) -> None:
-        """スライドを作成する
+    def _settings_fingerprint(self, template: Optional[bytes]) -> str:
+        """出力に影響する設定のハッシュを計算する
+        
+        テンプレート・画像・フォント・バージョンが変わったら --update で全ページを作り直す。
+        
+        Args:
+            template: テンプレートの内容（なければNone）
+        
+        Returns:
+            str: ハッシュ値
+        """
+        digest = hashlib.sha1()
+        for value in (__version__, self.font_family, self.fallback_font,
+                      self.prs.slide_width, self.prs.slide_height):
+            digest.update(f"{value}\0".encode("utf-8"))
+        for source in (template, self.background_image, self.logo_image):
+            if isinstance(source, str) and os.path.exists(source):
+                with open(source, "rb") as f:
+                    source = f.read()
+            digest.update(hashlib.sha1(source if isinstance(source, bytes) else b"").digest())
+        return digest.hexdigest()
+    
+    def _session(self) -> "PPTXBuilder":
+        """1回のビルドで使うビルダーを作成する
+        
+        検証済みの画像、テンプレート、計測器などの設定は共有し、プレゼンテーションと
+        描画中の状態だけをビルドごとに分ける。これにより同じビルダーを何度でも、
+        複数のスレッドから同時にでも使える。
+        
+        Returns:
+            PPTXBuilder: このビルダーの浅いコピー
+        """
+        session = copy.copy(self)
+        session.prs = copy.deepcopy(self._base_presentation)
+        session._text = TextFlattener()
+        session.layout = copy.copy(self.layout)
+        session.layout.text = session._text
+        return session
+    
+    @staticmethod
+    def _prepare_image(path: str, asset_store: Optional[AssetStore], width: int,
+                       height: Optional[int], label: str) -> Union[str, bytes]:
+        """埋め込む画像を検証し、キャッシュがあれば前処理済みのバイト列を取得する
+        
+        Args:
+            path: 画像ファイルパス
+            asset_store: 前処理済み画像のキャッシュ
+            width: 埋め込む幅（EMU）
+            height: 埋め込む高さ（EMU、Noneなら幅のみ）
+            label: エラーメッセージ用の画像の種類
+        
+        Returns:
+            Union[str, bytes]: 画像ファイルパス、または前処理済みの画像のバイト列
+        
+        Raises:
+            ValueError: 無効な画像の場合
+        """
+        if asset_store is None:
+            if not is_valid_image(path):
+                raise ValueError(f"無効な{label}: {path}")
+            return path
+        
+        try:
+            return asset_store.prepare(
+                path,
+                round(width / Inches(1) * ASSET_DPI),
+                round(height / Inches(1) * ASSET_DPI) if height else None
+            )
+        except (OSError, ValueError) as e:
+            logger.error(f"無効な画像ファイル: {path}, エラー: {e}")
+            raise ValueError(f"無効な{label}: {path}") from e
+    
+    @staticmethod
+    def _image_source(image: Union[str, bytes]):
+        """add_pictureに渡す画像（パスまたはストリーム）を返す"""
+        return io.BytesIO(image) if isinstance(image, bytes) else image
+    
+    def _content_box_geometry(self) -> Tuple[int, int, int, int]:
+        """コンテンツ領域の位置とサイズを返す
+        
+        Returns:
+            Tuple[int, int, int, int]: 左、上、幅、高さ（EMU）
+        """
+        return (
+            Inches(1.0),  # 左マージン
+            Inches(2.0),  # タイトル下から（2.5→2.0に減少でタイトルにさらに近く）
+            self.prs.slide_width - Inches(2.0),  # 幅（両側マージン1.0インチずつ）
+            self.prs.slide_height - Inches(2.5)  # 高さ（下部マージン考慮、3.0→2.5でさらに拡大）
+        )
+    
+    def _plan_pages(self, slide_data: Dict[str, Any], total_slides: int) -> List[Page]:
+        """スライドを改ページし、作成するページの一覧を返す
+        
+        コンテンツがコンテンツ領域に収まらない場合はフォントを縮小し、
+        縮小しすぎる場合は続きのスライドに分割する。
         
         Args:
             slide_data: スライドデータ（タイトル、コンテンツなど）
             total_slides: スライドの総数
+        
+        Returns:
+            List[Page]: (タイトル, コンテンツのAST, フォント縮小率, スライド番号, 総数) のリスト
         """
+        title = slide_data.get("title", f"スライド {slide_data['index'] + 1}")
+        current_slide = slide_data["index"] + 1
+        pages = self.layout.paginate(slide_data["content"])
+        
+        # 続きのスライドはタイトルにその旨を付記し、元のスライドの番号を表示する
+        return [
+            (title if page_index == 0 else f"{title}（続き）", content_ast, font_scale, current_slide, total_slides)
+            for page_index, (content_ast, font_scale) in enumerate(pages)
+        ]
+    
+    def _render_page(self, page: Page):
+        """1ページ分のスライドを作成する
+        
+        Args:
+            page: _plan_pages が返すページ
+        
+        Returns:
+            スライドオブジェクト
+        """
+        page_title, content_ast, font_scale, current_slide, total_slides = page
+        self._text.clear()
+        
         # レイアウトインデックス6は白紙のスライド
         layout = self.prs.slide_layouts[6]
         slide = self.prs.slides.add_slide(layout)
@@ -82,17 +352,29 @@ class PPTXBuilder:
         self._add_logo(slide)
         
         # タイトル追加
-        title = slide_data.get("title", f"スライド {slide_data['index'] + 1}")
-        self._add_title(slide, title)
+        self._add_title(slide, page_title)
         
         # コンテンツ追加
-        self._add_content(slide, slide_data["content"])
+        self._add_content(slide, content_ast, font_scale)
         
         # スライド番号追加
-        current_slide = slide_data["index"] + 1
         self._add_slide_number(slide, current_slide, total_slides)
         
-        logger.info(f"スライド {current_slide}/{total_slides} を作成: {title}")
+        logger.info(f"スライド {current_slide}/{total_slides} を作成: {page_title}")
+        return slide
+    
+    def create_slide(self, slide_data: Dict[str, Any], total_slides: int) -> None:
+        """スライドを作成する
+        
+        コンテンツがコンテンツ領域に収まらない場合はフォントを縮小し、
+        縮小しすぎる場合は続きのスライドに分割する。
+        
+        Args:
+            slide_data: スライドデータ（タイトル、コンテンツなど）
+            total_slides: スライドの総数
+        """
+        for page in self._plan_pages(slide_data, total_slides):
+            self._render_page(page)
     
     def _apply_background(self, slide) -> None:
         """スライドに背景画像を適用する
@@ -106,7 +388,7 @@ class PPTXBuilder:
         try:
             # 背景画像を全面に設定
             slide.shapes.add_picture(
-                self.background_path,
+                self._image_source(self.background_image),
                 0, 0,
                 width=self.prs.slide_width,
                 height=self.prs.slide_height
@@ -122,9 +404,9 @@ class PPTXBuilder:
         """
         try:
             # ロゴを右上に配置
-            logo_width = Inches(1.2)  # ロゴサイズ
+            logo_width = LOGO_WIDTH
             logo = slide.shapes.add_picture(
-                self.logo_path,
+                self._image_source(self.logo_image),
                 self.prs.slide_width - logo_width - Inches(0.3),  # 右マージン (0.2→0.3)
                 Inches(0.3),  # 上マージン (0.2→0.3)
                 width=logo_width
@@ -162,44 +444,200 @@ class PPTXBuilder:
         title_run.font.name = self.font_family
         title_run.font.name_ascii = self.fallback_font  # 英文用フォールバック
     
-    def _add_content(self, slide, content_ast: List[Dict[str, Any]]) -> None:
+    def _add_content(self, slide, content_ast: List[Dict[str, Any]], font_scale: float = 1.0) -> None:
         """スライドにMarkdownコンテンツを追加する
         
+        表は独立した図形として配置し、その前後のテキストは表の上下に積み重ねる。
+        
         Args:
             slide: スライドオブジェクト
             content_ast: コンテンツのAST
+            font_scale: フォントサイズと段落間隔の縮小率
         """
-        # デバッグログ - AST構造を詳細に出力
-        import json
-        if logger.isEnabledFor(logging.INFO):
-            logger.info(f"コンテンツAST: {json.dumps(content_ast, indent=2, ensure_ascii=False)}")
+        # デバッグログ - AST構造を詳細に出力（シリアライズは描画のたびにかかるため DEBUG のときだけ行う）
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("コンテンツAST: %s", json.dumps(content_ast, indent=2, ensure_ascii=False))
+        
+        left, top, width, height = self._content_box_geometry()
         
+        # 表がなければコンテンツ領域全体を1つのテキストボックスにする
+        if not any(node.get("type") == "table" for node in content_ast):
+            self._add_text_box(slide, content_ast, font_scale, left, top, width, height)
+            return
+        
+        y = top
+        for is_table, group in groupby(content_ast, key=lambda node: node.get("type") == "table"):
+            nodes = list(group)
+            if is_table:
+                for node in nodes:
+                    y += self._add_table(slide, node, font_scale, left, y)
+            elif any(node.get("type") != "blank_line" for node in nodes):
+                box_height = Pt(self.layout.content_height(nodes, font_scale) + 2 * FRAME_INSET_Y)
+                self._add_text_box(slide, nodes, font_scale, left, y, width, box_height)
+                y += box_height
+    
+    def _add_text_box(self, slide, content_ast: List[Dict[str, Any]], font_scale: float,
+                      left: int, top: int, width: int, height: int) -> None:
+        """Markdownコンテンツをテキストボックスとして追加する
+        
+        Args:
+            slide: スライドオブジェクト
+            content_ast: コンテンツのAST（表を含まない）
+            font_scale: フォントサイズと段落間隔の縮小率
+            left: 左端（EMU）
+            top: 上端（EMU）
+            width: 幅（EMU）
+            height: 高さ（EMU）
+        """
         # コンテンツ領域の定義 - マージン改善
-        content_box = slide.shapes.add_textbox(
-            Inches(1.0),  # 左マージン
-            Inches(2.0),  # タイトル下から（2.5→2.0に減少でタイトルにさらに近く）
-            self.prs.slide_width - Inches(2.0),  # 幅（両側マージン1.0インチずつ）
-            self.prs.slide_height - Inches(2.5)  # 高さ（下部マージン考慮、3.0→2.5でさらに拡大）
-        )
+        content_box = slide.shapes.add_textbox(left, top, width, height)
         
         text_frame = content_box.text_frame
         text_frame.word_wrap = True
-        text_frame.auto_size = True  # テキストに合わせて自動調整
-        
-        # 段落間のスペーシング設定
-        text_frame.paragraphs[0].space_after = Pt(8)  # 段落後の間隔（6→8）
+        # 収まるかどうかは事前に計測済みのため、PowerPointに再計算させない
+        text_frame.auto_size = MSO_AUTO_SIZE.NONE
         
-        # 最初の段落をクリア
-        if text_frame.paragraphs:
-            first_paragraph = text_frame.paragraphs[0]
-            first_paragraph.text = ""
-            current_paragraph = first_paragraph
-        else:
-            current_paragraph = text_frame.add_paragraph()
+        # 新しいテキストボックスの空の段落は最初のノードで使う
+        self._unused_paragraph = text_frame.paragraphs[0]
+        self._last_paragraph = None
+        self._pending_space = 0.0
         
         # より直接的なアプローチでASTを処理
         for node in content_ast:
             self._process_node_direct(node, text_frame)
+        
+        if font_scale < 1.0:
+            self._scale_text_frame(text_frame, font_scale)
+    
+    def _add_table(self, slide, node: Dict[str, Any], font_scale: float, left: int, top: int) -> int:
+        """表ノードをネイティブの表として追加する
+        
+        セルごとにpython-pptxのプロキシを操作すると大きな表で非常に遅いため、
+        表全体のXMLを一度に生成して差し替える。
+        
+        Args:
+            slide: スライドオブジェクト
+            node: 表ノード
+            font_scale: フォントサイズの縮小率
+            left: 左端（EMU）
+            top: 上端（EMU）
+        
+        Returns:
+            int: 表と表の後の余白の高さ（EMU）
+        """
+        column_widths, row_heights = self.layout.table_metrics(node, font_scale)
+        if not column_widths:
+            return 0
+        
+        widths = [int(Pt(width)) for width in column_widths]
+        heights = [int(Pt(height)) for height in row_heights]
+        
+        graphic_frame = slide.shapes.add_table(1, len(widths), left, top, sum(widths), sum(heights))
+        tbl = graphic_frame._element.xpath("./a:graphic/a:graphicData/a:tbl")[0]
+        tbl.getparent().replace(tbl, parse_xml(self._table_xml(node, widths, heights, font_scale)))
+        
+        return sum(heights) + int(Pt(TABLE_SPACE_AFTER * font_scale))
+    
+    def _table_xml(self, node: Dict[str, Any], widths: List[int], heights: List[int],
+                   font_scale: float) -> str:
+        """表全体のXML（a:tbl）を生成する
+        
+        Args:
+            node: 表ノード
+            widths: 列幅（EMU）
+            heights: 行の高さ（EMU）
+            font_scale: フォントサイズの縮小率
+        
+        Returns:
+            str: a:tbl要素のXML
+        """
+        size = max(100, int(TABLE_FONT_SIZE * font_scale * 100))
+        typeface = escape(self.font_family, {'"': "&quot;"})
+        
+        parts = [
+            f'<a:tbl {nsdecls("a")}><a:tblPr firstRow="1" bandRow="1">'
+            f'<a:tableStyleId>{TABLE_STYLE_ID}</a:tableStyleId></a:tblPr><a:tblGrid>'
+        ]
+        parts.extend(f'<a:gridCol w="{width}"/>' for width in widths)
+        parts.append("</a:tblGrid>")
+        
+        for cells, height in zip(table_rows(node), heights):
+            parts.append(f'<a:tr h="{height}">')
+            for index in range(len(widths)):
+                cell = cells[index] if index < len(cells) else {}
+                attrs = cell.get("attrs", {})
+                bold = ' b="1"' if attrs.get("head") else ""
+                rPr = f'sz="{size}"{bold}><a:latin typeface="{typeface}"/>'
+                
+                parts.append("<a:tc><a:txBody><a:bodyPr/><a:lstStyle/><a:p>")
+                align = TABLE_ALIGNMENTS.get(attrs.get("align"))
+                if align:
+                    parts.append(f'<a:pPr algn="{align}"/>')
+                text = _INVALID_XML_CHARS.sub("", self._text(cell)) if cell else ""
+                if text:
+                    parts.append(f"<a:r><a:rPr {rPr}</a:rPr><a:t>{escape(text)}</a:t></a:r>")
+                parts.append(f"<a:endParaRPr {rPr}</a:endParaRPr></a:p></a:txBody><a:tcPr/></a:tc>")
+            parts.append("</a:tr>")
+        
+        parts.append("</a:tbl>")
+        return "".join(parts)
+    
+    def _scale_text_frame(self, text_frame, font_scale: float) -> None:
+        """テキストフレーム内のフォントサイズと段落間隔を縮小する
+        
+        Args:
+            text_frame: テキストフレーム
+            font_scale: 縮小率
+        """
+        txBody = text_frame._txBody
+        for tag in ("a:rPr", "a:endParaRPr"):
+            for rPr in txBody.iter(qn(tag)):
+                size = rPr.get("sz")
+                if size is not None:
+                    rPr.set("sz", str(max(100, int(int(size) * font_scale))))
+        for spacing in txBody.iter(qn("a:spcPts")):
+            spacing.set("val", str(int(int(spacing.get("val")) * font_scale)))
+    
+    def _new_paragraph(self, text_frame, space_before: float = 0.0, space_after: float = 0.0):
+        """段落を追加する
+        
+        空行などの余白は空の段落にせず、次の段落の段落前の間隔として設定する。
+        
+        Args:
+            text_frame: テキストフレーム
+            space_before: 段落前の間隔（ポイント）
+            space_after: 段落後の間隔（ポイント）
+        
+        Returns:
+            追加した段落
+        """
+        if self._unused_paragraph is not None:
+            p = self._unused_paragraph
+            self._unused_paragraph = None
+        else:
+            p = text_frame.add_paragraph()
+        
+        space_before += self._pending_space
+        self._pending_space = 0.0
+        if space_before:
+            p.space_before = Pt(space_before)
+        if space_after:
+            p.space_after = Pt(space_after)
+        
+        self._last_paragraph = p
+        return p
+    
+    def _add_space_after_last_paragraph(self, space: float) -> None:
+        """直前の段落の段落後の間隔を広げる
+        
+        Args:
+            space: 追加する間隔（ポイント）
+        """
+        if self._last_paragraph is None:
+            self._pending_space += space
+            return
+        current = self._last_paragraph.space_after
+        self._last_paragraph.space_after = Pt((current.pt if current is not None else 0.0) + space)
     
     def _process_node_direct(self, node: Dict[str, Any], text_frame) -> None:
         """ASTノードを直接処理して段落に変換する
@@ -211,322 +649,236 @@ class PPTXBuilder:
         node_type = node.get("type", "")
         
         if node_type == "blank_line":
-            # 空行は段落を追加して空白を作る
-            p = text_frame.add_paragraph()
-            p.space_after = Pt(8)  # 空行の後の間隔（10→8）
-            
+            # 空行は空の段落を追加せず、次の段落の前に同じ高さの間隔を空ける
+            self._pending_space += BODY_FONT_SIZE * LINE_SPACING + 8
+        
         elif node_type == "paragraph":
             # 段落テキストの抽出と追加
-            p = text_frame.add_paragraph()
-            p.space_after = Pt(12)  # 段落間の間隔（10→12）
-            
-            children = node.get("children", [])
-            for child in children:
-                self._process_inline_node(child, p)
-            
+            p = self._new_paragraph(text_frame, space_after=12)  # 段落間の間隔（10→12）
+            self._add_inline_runs(node.get("children", []), p)
+        
         elif node_type == "heading":
             # 見出しの処理
             level = node.get("attrs", {}).get("level", 2)
-            children = node.get("children", [])
             
-            p = text_frame.add_paragraph()
-            p.space_before = Pt(16)  # 見出し前の間隔を追加
-            p.space_after = Pt(8)  # 見出し後の間隔（12→8）
+            # 見出し前の間隔16pt、見出し後の間隔（12→8）
+            p = self._new_paragraph(text_frame, space_before=16, space_after=8)
             
             # 見出しレベルに応じたフォントサイズ設定
-            font_size = {
-                2: 28,  # H2
-                3: 24,  # H3
-                4: 20,  # H4
-                5: 18,  # H5
-                6: 16   # H6
-            }.get(level, 28)
-            
-            for child in children:
-                run = p.add_run()
-                run.text = self._node_to_text(child)
-                run.font.bold = True
-                run.font.size = Pt(font_size)
-                run.font.name = self.font_family
-                run.font.name_ascii = self.fallback_font
+            font_size = HEADING_FONT_SIZES.get(level, 28)
             
+            # 見出しはすべて同じ書式なので1つのランにまとめる
+            run = p.add_run()
+            run.text = self._text(node)
+            run.font.bold = True
+            run.font.size = Pt(font_size)
+            run.font.name = self.font_family
+            run.font.name_ascii = self.fallback_font
+        
         elif node_type == "list":
-            # リストの処理
-            # リスト前に少し余白を追加
-            space_before = text_frame.add_paragraph()
-            space_before.space_after = Pt(4)
-            
-            # リスト処理
-            self._process_list_direct(node, text_frame)
-            
-            # リスト後に余白を追加
-            space_after = text_frame.add_paragraph()
-            space_after.space_after = Pt(8)
-            
+            # リストの処理（前後の余白は最初と最後の項目の段落間隔で表す）
+            self._pending_space += LIST_SPACE_BEFORE
+            self._add_list(node, text_frame)
+            self._add_space_after_last_paragraph(LIST_SPACE_AFTER)
+        
         elif node_type == "block_code":
             # コードブロックの処理
             code_text = node.get("raw", "")
             lang = node.get("attrs", {}).get("info", "")
             
-            p = text_frame.add_paragraph()
-            p.space_before = Pt(12)  # コードブロック前の間隔（6→12）
-            p.space_after = Pt(12)  # コードブロック後の間隔（6→12）
+            # コードブロック前後の間隔（6→12）
+            p = self._new_paragraph(text_frame, space_before=12, space_after=12)
             
             # 言語情報があれば追加
             if lang:
                 lang_run = p.add_run()
                 lang_run.text = f"{lang}:\n"
                 lang_run.font.bold = True
-                lang_run.font.size = Pt(14)
+                lang_run.font.size = Pt(CODE_FONT_SIZE)
                 self._apply_font_to_run(lang_run)
             
-            # コードブロックの追加
-            code_run = p.add_run()
-            code_run.text = code_text
-            code_run.font.size = Pt(14)
-            code_run.font.name = "Consolas"  # コード用モノスペースフォント
-            code_run.font.name_ascii = "Consolas"
+            # コードブロックの追加（同じスタイルのトークンは1つのランにまとめられている）
+            for text, color, bold, italic in highlight_code(code_text, lang):
+                code_run = p.add_run()
+                code_run.text = text
+                code_run.font.size = Pt(CODE_FONT_SIZE)
+                code_run.font.name = "Consolas"  # コード用モノスペースフォント
+                code_run.font.name_ascii = "Consolas"
+                if color:
+                    code_run.font.color.rgb = RGBColor.from_string(color)
+                if bold:
+                    code_run.font.bold = True
+                if italic:
+                    code_run.font.italic = True
     
-    def _process_inline_node(self, node: Dict[str, Any], paragraph) -> None:
-        """インラインノードを処理して段落に追加する
+    def _inline_segments(self, node: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """インラインノードを (テキスト, 書式) の組のリストに変換する
+        
+        書式は "text"、"bold"、"italic"、"code"、"link" のいずれか。
         
         Args:
             node: インラインノードデータ
-            paragraph: 追加先の段落
+        
+        Returns:
+            List[Tuple[str, str]]: テキストと書式の組のリスト
         """
         node_type = node.get("type", "")
         
         if node_type == "text":
-            run = paragraph.add_run()
-            run.text = node.get("raw", "")
-            run.font.size = Pt(18)  # 本文フォントサイズ
-            self._apply_font_to_run(run)
-            
-        elif node_type == "strong":
-            # 太字
-            children = node.get("children", [])
-            for child in children:
-                run = paragraph.add_run()
-                run.text = self._node_to_text(child)
-                run.font.bold = True
-                run.font.size = Pt(18)
-                self._apply_font_to_run(run)
-                
-        elif node_type == "emphasis":
-            # 斜体
-            children = node.get("children", [])
-            for child in children:
-                run = paragraph.add_run()
-                run.text = self._node_to_text(child)
-                run.font.italic = True
-                run.font.size = Pt(18)
-                self._apply_font_to_run(run)
-                
-        elif node_type == "codespan":
+            return [(node.get("raw", ""), "text")]
+        
+        if node_type in ["strong", "emphasis"]:
+            # 太字・斜体
+            style = "bold" if node_type == "strong" else "italic"
+            return [(self._text(child), style) for child in node.get("children", [])]
+        
+        if node_type == "codespan":
             # インラインコード - rawキーを優先的に使用
-            run = paragraph.add_run()
-            run.text = node.get("raw", "")
-            run.font.name = "Consolas"  # コード用モノスペースフォント
-            run.font.name_ascii = "Consolas"
-            run.font.size = Pt(16)
-            # 背景色を薄いグレーに設定
-            run.font.fill.solid()
-            run.font.fill.fore_color.rgb = RGBColor(60, 60, 60)  # 濃いめのグレー
-            
-        elif node_type in ["link", "image"]:
+            return [(node.get("raw", ""), "code")]
+        
+        if node_type in ["link", "image"]:
             # リンクは下線付きテキスト、画像は今後の課題として通常テキストで
             text = node.get("text", "") or node.get("raw", "")
+            return [(text, "link" if node_type == "link" else "text")]
+        
+        return []
+    
+    def _add_inline_runs(self, nodes: List[Dict[str, Any]], paragraph) -> None:
+        """インラインノードのリストを段落に追加する
+        
+        同じ書式の隣接するテキストは1つのランにまとめる。
+        
+        Args:
+            nodes: インラインノードのリスト
+            paragraph: 追加先の段落
+        """
+        segments = []
+        for node in nodes:
+            for text, style in self._inline_segments(node):
+                if not text:
+                    continue
+                if segments and segments[-1][1] == style:
+                    segments[-1][0] += text
+                else:
+                    segments.append([text, style])
+        
+        for text, style in segments:
             run = paragraph.add_run()
             run.text = text
-            run.font.size = Pt(18)
-            if node_type == "link":
+            if style == "code":
+                run.font.name = "Consolas"  # コード用モノスペースフォント
+                run.font.name_ascii = "Consolas"
+                run.font.size = Pt(16)
+                # 背景色を薄いグレーに設定
+                run.font.fill.solid()
+                run.font.fill.fore_color.rgb = RGBColor(60, 60, 60)  # 濃いめのグレー
+                continue
+            
+            run.font.size = Pt(BODY_FONT_SIZE)  # 本文フォントサイズ
+            if style == "bold":
+                run.font.bold = True
+            elif style == "italic":
+                run.font.italic = True
+            elif style == "link":
                 run.font.underline = True
             self._apply_font_to_run(run)
     
-    def _process_list_direct(self, node: Dict[str, Any], text_frame) -> None:
-        """リストを処理してテキストフレームに追加する
+    def _add_list(self, node: Dict[str, Any], text_frame) -> None:
+        """リスト（ネストを含む）を1項目1段落としてテキストフレームに追加する
+        
+        ネストはスタックでたどるため、深さや項目数に比例した時間で処理できる。ASTは
+        キャッシュされることがあるため書き換えない。行頭記号と番号はPowerPointの箇条書き
+        （a:buChar / a:buAutoNum）で表し、本文には含めない。
         
         Args:
             node: リストノード
             text_frame: 追加先のテキストフレーム
         """
-        is_ordered = node.get("attrs", {}).get("ordered", False)
-        list_items = node.get("children", [])
-        depth = node.get("attrs", {}).get("depth", 0)
+        stack = [self._list_frame(node, node.get("attrs", {}).get("depth", 0))]
         
-        for i, item in enumerate(list_items):
-            try:
-                # リスト項目テキストを抽出（改善版）
-                item_text = self._extract_list_item_text(item)
-                
-                logger.info(f"リスト項目 {i} テキスト: '{item_text}'")
-                
-                # 空のリスト項目は処理しない
-                if not item_text.strip():
-                    logger.info(f"空のリスト項目をスキップ: {item}")
-                    continue
-                
+        while stack:
+            frame = stack[-1]
+            items, depth, numbering = frame[0], frame[1], frame[2]
+            item = next(items, None)
+            if item is None:
+                stack.pop()
+                if stack:
+                    # ネストされたリスト後に余白を追加（見やすさのため）
+                    self._add_space_after_last_paragraph(NESTED_LIST_SPACE_AFTER)
+                continue
+            
+            number = frame[3]
+            frame[3] += 1
+            
+            # リスト項目テキストを抽出（ネストされたリストは後で別の段落にする）
+            item_text = self._text(item)
+            if not item_text.strip():
+                # 空のリスト項目は処理しない（次の項目の番号は明示する）
+                frame[4] = True
+            else:
                 # コロンの後にスペースを追加（必要な場合）
-                if ":" in item_text and " " not in item_text.split(":", 1)[0]:
-                    parts = item_text.split(":", 1)
-                    if len(parts) == 2:
-                        item_text = f"{parts[0]}: {parts[1].lstrip()}"
-                        logger.info(f"コロン処理後: '{item_text}'")
-                
-                # リスト番号またはマーカーを生成
-                marker = f"{i+1}." if is_ordered else "•"
+                head, colon, tail = item_text.partition(":")
+                if colon and " " not in head:
+                    item_text = f"{head}: {tail.lstrip()}"
                 
-                # リスト項目を段落として追加
-                p = text_frame.add_paragraph()
-                p.level = depth  # インデントレベル
-                p.space_after = Pt(5)  # 項目間の間隔を調整
+                p = self._new_paragraph(text_frame, space_after=LIST_ITEM_SPACE_AFTER)
+                start = number if numbering and frame[4] and number != 1 else None
+                self._set_bullet(p, depth, numbering, start)
+                frame[4] = False
                 
                 run = p.add_run()
-                # マーカーとテキストを結合
-                run.text = f"{marker} {item_text}"
-                
-                # フォントスタイル設定
-                run.font.size = Pt(18 - depth)  # ネストレベルに応じて小さく
+                run.text = item_text
+                run.font.size = Pt(list_item_geometry(depth)[1])  # ネストレベルに応じて小さく
                 self._apply_font_to_run(run)
-                
-                # 子リストがあれば再帰的に処理
-                self._process_nested_lists(item, text_frame)
-                
-            except Exception as e:
-                logger.error(f"リスト項目処理エラー: {e}", exc_info=True)
-                # エラーがあっても処理を続行
+            
+            # 子リストは親の残りの項目より先に、文書順に処理する
+            nested = [child for child in item.get("children", []) if child.get("type") == "list"]
+            stack.extend(self._list_frame(child, depth + 1) for child in reversed(nested))
     
-    def _process_nested_lists(self, parent_item: Dict[str, Any], text_frame) -> None:
-        """ネストされたリストを処理する
+    @staticmethod
+    def _list_frame(node: Dict[str, Any], depth: int) -> list:
+        """リストの処理状態を作成する
         
         Args:
-            parent_item: 親リスト項目
-            text_frame: テキストフレーム
-        """
-        children = parent_item.get("children", [])
-        
-        # children内のリストを検索
-        for child in children:
-            if child.get("type") == "list":
-                # 子リストがある場合、深さを増やして処理
-                child_list = child
-                depth = child_list.get("attrs", {}).get("depth", 0) + 1
-                
-                # 深さ情報を設定
-                if "attrs" not in child_list:
-                    child_list["attrs"] = {}
-                child_list["attrs"]["depth"] = depth
-                
-                # リストを処理
-                self._process_list_direct(child_list, text_frame)
-                
-                # ネストされたリスト後に余分な空白を追加（見やすさのため）
-                space_para = text_frame.add_paragraph()
-                space_para.space_after = Pt(4)
-    
-    def _extract_list_item_text(self, item: Dict[str, Any]) -> str:
-        """リスト項目からテキストを効率的に抽出する改善版メソッド
+            node: リストノード
+            depth: ネストの深さ
         
-        Args:
-            item: リスト項目ノード
-            
         Returns:
-            str: 抽出されたテキスト
+            list: [残りの項目, 深さ, 番号の種類（箇条書きならNone）, 次の項目の番号, 番号の開始値を明示するか]
         """
-        if not item or "children" not in item:
-            return ""
-            
-        # リスト項目の子要素を取得
-        children = item.get("children", [])
-        result_text = ""
-        
-        # block_text要素を探す（最も一般的なリスト項目の構造）
-        for child in children:
-            if child.get("type") == "block_text" and "children" in child:
-                block_children = child.get("children", [])
-                
-                # 子要素を順番に処理
-                for block_child in block_children:
-                    child_type = block_child.get("type", "")
-                    
-                    # テキスト要素
-                    if child_type == "text":
-                        result_text += block_child.get("raw", "")
-                    
-                    # コードスパン要素
-                    elif child_type == "codespan":
-                        result_text += block_child.get("raw", "")
-                    
-                    # 強調・太字要素
-                    elif child_type in ["strong", "emphasis"]:
-                        for grandchild in block_child.get("children", []):
-                            result_text += grandchild.get("raw", "")
-                            
-                # block_text処理完了
-                return result_text
-        
-        # その他のケース用のフォールバック処理
-        for child in children:
-            if "raw" in child:
-                result_text += child.get("raw", "")
-            elif "children" in child:
-                # 再帰的に子要素を処理
-                for grandchild in child.get("children", []):
-                    if "raw" in grandchild:
-                        result_text += grandchild.get("raw", "")
-                    elif "children" in grandchild:
-                        for gc in grandchild.get("children", []):
-                            result_text += gc.get("raw", "")
-        
-        return result_text
-    
-    def _node_to_text(self, node: Dict[str, Any]) -> str:
-        """ノードからテキストを抽出する
+        attrs = node.get("attrs", {})
+        numbering = None
+        if attrs.get("ordered", False):
+            numbering = LIST_NUMBERING.get(node.get("bullet", "."), LIST_NUMBERING["."])
+        # 続きのスライドに分割された番号付きリストは途中の番号から始まる
+        return [iter(node.get("children", [])), depth, numbering, attrs.get("start", 1), True]
+    
+    @staticmethod
+    def _set_bullet(paragraph, depth: int, numbering: Optional[str], start: Optional[int]) -> None:
+        """段落をリスト項目の箇条書きにする
         
         Args:
-            node: ASTノード
-            
-        Returns:
-            str: 抽出されたテキスト
+            paragraph: 段落
+            depth: ネストの深さ
+            numbering: a:buAutoNum の番号の種類（箇条書きならNone）
+            start: 番号の開始値（前の項目から続ける場合はNone）
         """
-        node_type = node.get("type", "")
-        raw_content = node.get("raw", "")
-        logger.debug(f"_node_to_text処理: type={node_type}, raw={raw_content}")
-        
-        # 特殊なノードタイプの直接処理
-        if node_type == "codespan":
-            # コードスパンの内容をそのまま使用
-            logger.debug(f"_node_to_text: コードスパン '{raw_content}' を抽出")
-            return raw_content
-        
-        # 子要素がない場合のシンプルなノード処理
-        if "children" not in node:
-            logger.debug(f"_node_to_text: シンプルノード '{raw_content}' を抽出")
-            return raw_content
-        
-        # 子要素を持つ複合ノードを処理
-        texts = []
-        for child in node["children"]:
-            child_type = child.get("type", "")
-            child_raw = child.get("raw", "")
-            
-            # 各子要素のタイプに基づいて処理
-            if child_type == "text":
-                texts.append(child_raw)
-            elif child_type == "codespan":
-                texts.append(child_raw)
-            elif child_type in ["strong", "emphasis"]:
-                # 強調や斜体も処理
-                texts.append(self._node_to_text(child))
-            elif "children" in child:
-                texts.append(self._node_to_text(child))
-            else:
-                # その他の要素
-                texts.append(child_raw)
-        
-        result = "".join(texts)
-        logger.debug(f"_node_to_text: 複合ノード '{result}' を抽出")
-        return result
+        margin = list_item_geometry(depth)[0]
+        pPr = paragraph._p.get_or_add_pPr()
+        pPr.set("lvl", str(min(depth, LIST_MAX_LEVEL)))
+        pPr.set("marL", str(int(margin * EMU_PER_POINT)))
+        pPr.set("indent", str(-int(LIST_MARKER_WIDTH * EMU_PER_POINT)))
+        if numbering is None:
+            bullets = [("a:buFont", {"typeface": "Arial"}), ("a:buChar", {"char": "•"})]
+        else:
+            bullets = [("a:buAutoNum", {"type": numbering})]
+            if start is not None:
+                bullets[0][1]["startAt"] = str(start)
+        for tag, attrs in bullets:
+            element = OxmlElement(tag)
+            for name, value in attrs.items():
+                element.set(name, value)
+            pPr.append(element)
     
     def _add_slide_number(self, slide, current: int, total: int) -> None:
         """スライド番号を追加する
@@ -554,27 +906,303 @@ class PPTXBuilder:
         number_run.font.name = "メイリオ"
         number_run.font.name_ascii = "Arial"
     
-    def build_presentation(self, slides_data: List[Dict[str, Any]], output_path: str) -> None:
-        """スライドデータからプレゼンテーションを構築し保存する
+    def _plan_presentation(self, slides_data: List[Dict[str, Any]]) -> List[Page]:
+        """全スライドを改ページし、作成するページの一覧を返す
         
         Args:
             slides_data: スライドデータのリスト
-            output_path: 出力PPTXのパス
+        
+        Returns:
+            List[Page]: ページのリスト
         """
         total_slides = len(slides_data)
-        logger.info(f"{total_slides}枚のスライドを作成します")
-        
+        pages = []
         for slide_data in slides_data:
-            self.create_slide(slide_data, total_slides)
+            # 一部のスライドだけを作成する場合も文書全体での総数を表示する
+            pages.extend(self._plan_pages(slide_data, slide_data.get("total_slides", total_slides)))
+        return pages
+    
+    def _page_hash(self, page: Page) -> str:
+        """ページの内容と出力に影響する設定からハッシュを計算する
+        
+        Args:
+            page: _plan_pages が返すページ
+        
+        Returns:
+            str: ハッシュ値（16桁の16進数）
+        """
+        data = json.dumps([self._fingerprint, page], ensure_ascii=False, sort_keys=True,
+                          separators=(",", ":"), default=str)
+        return hashlib.sha1(data.encode("utf-8")).hexdigest()[:16]
+    
+    def _store_slide_hashes(self, hashes: List[str]) -> None:
+        """ページごとのハッシュと設定のハッシュをユーザー定義プロパティとしてプレゼンテーションに保存する
+        
+        Args:
+            hashes: ページごとのハッシュのリスト
+        """
+        package = self.prs.part.package
+        try:
+            part = package.part_related_by(RT.CUSTOM_PROPERTIES)
+            blob = part.blob
+        except KeyError:
+            part, blob = None, None
+        blob = set_custom_property(blob, SLIDE_HASHES_PROPERTY, ",".join(hashes))
+        blob = set_custom_property(blob, SETTINGS_FINGERPRINT_PROPERTY, self._fingerprint)
+        if part is None:
+            part = Part(PackURI(f"/{CUSTOM_PROPERTIES_PART}"), CT.OFC_CUSTOM_PROPERTIES, package, blob)
+            package.relate_to(part, RT.CUSTOM_PROPERTIES)
+            return
+        part.blob = blob
+    
+    def build_presentation(self, slides_data: List[Dict[str, Any]], output_path: Union[str, IO[bytes]],
+                           memory_report: Optional[MemoryReport] = None) -> None:
+        """スライドデータからプレゼンテーションを構築し保存する
+        
+        同じビルダーで何度でも、複数のスレッドから同時にでも呼び出せる。
+        
+        Args:
+            slides_data: スライドデータのリスト
+            output_path: 出力PPTXのパス、または書き込み先のバイナリストリーム
+            memory_report: 構築（build）と保存（save）のメモリ使用量を記録するレポート
+        """
+        logger.info(f"{len(slides_data)}枚のスライドを作成します")
+        
+        with memory_stage(memory_report, "build"):
+            session = self._session()
+            pages = session._plan_presentation(slides_data)
+            if not session._render_pages_parallel(pages):
+                for page in pages:
+                    session._render_page(page)
+            
+            # 次回の update_presentation で変更のあったスライドを判定するために保存する
+            session._store_slide_hashes([session._page_hash(page) for page in pages])
         
         # 保存
         try:
-            self.prs.save(output_path)
-            logger.info(f"プレゼンテーションを保存しました: {output_path}")
+            with memory_stage(memory_report, "save"):
+                session.prs.save(output_path)
+            if isinstance(output_path, str):
+                logger.info(f"プレゼンテーションを保存しました: {output_path}")
         except Exception as e:
             logger.error(f"プレゼンテーション保存エラー: {e}")
             raise 
-
+    
+    def build(self, slides_data: List[Dict[str, Any]], memory_report: Optional[MemoryReport] = None) -> bytes:
+        """スライドデータからプレゼンテーションを構築し、PPTXのバイト列を返す
+        
+        Args:
+            slides_data: スライドデータのリスト
+            memory_report: 構築（build）と保存（save）のメモリ使用量を記録するレポート
+        
+        Returns:
+            bytes: PPTXファイルの内容
+        """
+        stream = io.BytesIO()
+        self.build_presentation(slides_data, stream, memory_report)
+        return stream.getvalue()
+    
+    def _render_pages_parallel(self, pages: List[Page]) -> bool:
+        """ページを複数プロセスで描画し、このプロセスで順にパッケージへ組み立てる
+        
+        ワーカーはページごとのスライドのXMLと画像を返し、このプロセスはスライドパート、
+        リレーションシップ、画像パートを元の順序で追加する。順に描画した場合と同じ
+        パッケージになる。
+        
+        Args:
+            pages: 全ページのリスト
+        
+        Returns:
+            bool: 並列に描画した場合はTrue（並列化しない場合やプロセスを使えない場合はFalse）
+        """
+        workers = self.workers or os.cpu_count() or 1
+        if workers <= 1 or len(pages) < PARALLEL_RENDER_MIN_PAGES:
+            return False
+        
+        batches = [pages[i:i + RENDER_BATCH_SIZE] for i in range(0, len(pages), RENDER_BATCH_SIZE)]
+        try:
+            with ProcessPoolExecutor(
+                max_workers=min(workers, len(batches)),
+                initializer=_init_render_worker,
+                initargs=(self._options, self.background_image, self.logo_image)
+            ) as executor:
+                results = list(executor.map(_render_page_batch, batches))
+        except Exception as e:
+            # プロセスを使えない環境ではこのプロセスで描画する
+            logger.warning(f"並列描画に失敗したため順に描画します: {e}")
+            return False
+        
+        self._assemble_slides(results)
+        logger.debug(f"{len(pages)}ページを{workers}プロセスで並列に描画しました")
+        return True
+    
+    def _assemble_slides(self, results: List[Tuple[List[RenderedSlide], Dict[str, bytes]]]) -> None:
+        """ワーカーが描画したスライドをプレゼンテーションの末尾に順に追加する
+        
+        add_slide はスライドごとにプレゼンテーションのリレーションシップとスライドIDを
+        走査するため、パートとリレーションシップを直接追加する。パート名、リレーションシップID、
+        スライドIDの決め方は add_slide と同じ。
+        
+        Args:
+            results: バッチごとの _render_page_batch の戻り値
+        
+        Raises:
+            ValueError: リレーションシップのIDがワーカーと一致しない場合
+        """
+        presentation_part = self.prs.part
+        package = presentation_part.package
+        layout_part = self.prs.slide_layouts[6].part
+        sldIdLst = self.prs.slides._sldIdLst
+        slide_id = sldIdLst._next_id
+        image_parts: Dict[str, Any] = {}
+        
+        for slides, images in results:
+            for xml, relationships in slides:
+                slide_part = SlidePart(presentation_part._next_slide_partname, CT.PML_SLIDE,
+                                       package, parse_xml(xml))
+                slide_part.relate_to(layout_part, RT.SLIDE_LAYOUT)
+                # 画像のパート名はパッケージから辿れるパートを数えて決まるため、先にスライドを関連付ける
+                sldIdLst._add_sldId(id=slide_id, rId=presentation_part.rels._add_relationship(RT.SLIDE, slide_part))
+                slide_id += 1
+                
+                for rId, sha1 in relationships:
+                    image_part = image_parts.get(sha1)
+                    if image_part is None:
+                        # テンプレートに同じ画像があればそれを使う（順に描画した場合と同じ）
+                        image_part = package.get_or_add_image_part(io.BytesIO(images[sha1]))
+                        image_parts[sha1] = image_part
+                    if slide_part.relate_to(image_part, RT.IMAGE) != rId:
+                        raise ValueError(f"画像のリレーションシップIDが一致しません: {rId}")
+    
+    def update_presentation(self, slides_data: List[Dict[str, Any]], output_path: str,
+                            memory_report: Optional[MemoryReport] = None) -> bool:
+        """既存の出力ファイルのうち、内容が変わったスライドだけを書き直す
+        
+        前回の出力に保存したページごとのハッシュと比較し、変わったスライドのXMLと
+        新しい画像だけを書き込む。変更のないエントリは再圧縮せずにそのままコピーする。
+        出力ファイルがない、ハッシュが保存されていない、ページ数が変わった、テンプレート・画像・
+        フォント・スライドサイズが前回と異なるなどの場合は build_presentation で全体を作成し直す
+        （マスター、テーマ、スライドサイズなどのパッケージ全体のパートは差分では書き換えないため）。
+        
+        Args:
+            slides_data: スライドデータのリスト
+            output_path: 出力PPTXのパス
+            memory_report: 構築（build）と保存（save）のメモリ使用量を記録するレポート
+        
+        Returns:
+            bool: 既存のファイルを更新した場合はTrue、全体を作成し直した場合はFalse
+        """
+        changes = None
+        with memory_stage(memory_report, "build"):
+            session = self._session()
+            pages = session._plan_presentation(slides_data)
+            hashes = [session._page_hash(page) for page in pages]
+            
+            if os.path.exists(output_path):
+                try:
+                    with zipfile.ZipFile(output_path) as zf:
+                        changes = session._collect_changes(zf, pages, hashes)
+                except zipfile.BadZipFile as e:
+                    logger.warning(f"既存の出力ファイルを読み込めません: {output_path}, エラー: {e}")
+        
+        if changes is None:
+            logger.info(f"既存の出力ファイルを更新できないため、全体を作成します: {output_path}")
+            self.build_presentation(slides_data, output_path, memory_report)
+            return False
+        
+        replace, remove, changed = changes
+        if not changed:
+            logger.info(f"変更されたスライドはありません: {output_path}")
+            return True
+        
+        with memory_stage(memory_report, "save"):
+            rewrite_package(output_path, output_path, replace, remove)
+        logger.info(f"{len(changed)}/{len(pages)}枚のスライドを更新しました: {output_path}")
+        return True
+    
+    def _collect_changes(self, zf: zipfile.ZipFile, pages: List[Page],
+                         hashes: List[str]) -> Optional[Tuple[Dict[str, bytes], set, List[int]]]:
+        """変更されたページを作成し、既存のパッケージに書き込むエントリを集める
+        
+        Args:
+            zf: 既存の出力ファイル
+            pages: 全ページのリスト
+            hashes: ページごとのハッシュのリスト
+        
+        Returns:
+            Optional[Tuple[Dict[str, bytes], set, List[int]]]: 書き直すエントリ、削除するエントリ、
+            変更されたページの番号（0始まり）。既存のファイルを更新できない場合はNone
+        """
+        names = set(zf.namelist())
+        custom = zf.read(CUSTOM_PROPERTIES_PART) if CUSTOM_PROPERTIES_PART in names else None
+        if get_custom_property(custom, SETTINGS_FINGERPRINT_PROPERTY) != self._fingerprint:
+            logger.info("テンプレート・画像・フォントなどの設定が前回の出力と異なります")
+            return None
+        old_hashes = (get_custom_property(custom, SLIDE_HASHES_PROPERTY) or "").split(",")
+        slide_parts = slide_part_names(zf)
+        if len(old_hashes) != len(pages) or len(slide_parts) != len(pages):
+            return None
+        
+        changed = [index for index, (old, new) in enumerate(zip(old_hashes, hashes)) if old != new]
+        if not changed:
+            return {}, set(), changed
+        
+        # テンプレートが同じならレイアウトのパート名も同じになる
+        layout_part = self.prs.slide_layouts[6].part.partname.lstrip("/")
+        if layout_part not in names:
+            return None
+        
+        media: Dict[Tuple[int, int], List[str]] = defaultdict(list)
+        numbers = [0]
+        for info in zf.infolist():
+            if info.filename.startswith("ppt/media/"):
+                media[(info.file_size, info.CRC)].append(info.filename)
+                match = _MEDIA_NUMBER_RE.search(info.filename)
+                if match:
+                    numbers.append(int(match.group(1)))
+        next_number = max(numbers) + 1
+        
+        replace: Dict[str, bytes] = {}
+        content_types = zf.read("[Content_Types].xml")
+        image_targets: Dict[int, str] = {}
+        
+        for index in changed:
+            slide = self._render_page(pages[index])
+            for rel in slide.part.rels.values():
+                if rel.is_external or rel.reltype != RT.IMAGE:
+                    continue
+                image_part = rel.target_part
+                if id(image_part) not in image_targets:
+                    # 既存のメディアと同じ画像はそれを参照し、新しい画像だけを追加する
+                    blob = image_part.blob
+                    target = next((
+                        name for name in media.get((len(blob), zlib.crc32(blob)), [])
+                        if zf.read(name) == blob
+                    ), None)
+                    if target is None:
+                        target = f"ppt/media/image{next_number}.{image_part.ext}"
+                        next_number += 1
+                        replace[target] = blob
+                        content_types = add_default_content_type(content_types, image_part.ext, image_part.content_type)
+                    # リレーションシップの参照先はパート名から計算される
+                    image_part.partname = PackURI(f"/{target}")
+                    image_targets[id(image_part)] = target
+            
+            part_name = slide_parts[index]
+            replace[part_name] = slide.part.blob
+            replace[rels_path(part_name)] = slide.part.rels.xml
+        
+        replace["[Content_Types].xml"] = content_types
+        replace[CUSTOM_PROPERTIES_PART] = set_custom_property(custom, SLIDE_HASHES_PROPERTY, ",".join(hashes))
+        
+        # どこからも参照されなくなったメディアは削除する
+        referenced = referenced_parts(zf, replace)
+        remove = {
+            name for name in names | set(replace)
+            if name.startswith("ppt/media/") and name not in referenced
+        }
+        return replace, remove, changed
+    
     def _apply_font_to_run(self, run) -> None:
         """テキストランにフォント設定を適用する
         
@@ -591,7 +1219,7 @@ class PPTXBuilder:
                 run.font.name_eastasia = self.font_family
         except Exception as e:
             logger.warning(f"フォント適用エラー: {e}")
-
+    
     def _add_paragraph_with_style(self, text_frame, text: str, 
                                   font_size: int = 18, 
                                   bold: bool = False, 
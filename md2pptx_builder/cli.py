@@ -2,19 +2,75 @@
 md2pptx-builder - CLI interface
 """
 
+import io
 import os
 import sys
+import json
 import argparse
+import importlib
 import logging
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
-from md2pptx_builder.parser import MarkdownParser
-from md2pptx_builder.builder import PPTXBuilder
-from md2pptx_builder.utils import setup_logging, is_valid_image, is_valid_markdown
+from md2pptx_builder.utils import (
+    setup_logging, is_valid_image, is_valid_markdown, parse_slide_selection, select_slide_indices
+)
+from md2pptx_builder.scanner import scan_markdown, scan_markdown_file, manifest_document
+from md2pptx_builder.assets import AssetStore, ASSET_CACHE_ENV
+from md2pptx_builder.fast_parser import PARSER_ENGINES
 
 logger = logging.getLogger(__name__)
 
+# 入力・出力のパスとして指定すると標準入力・標準出力を使う
+STDIO_PATH = "-"
+
+# 重い依存（mistune, python-pptx, lxml, PIL）を持つクラスは必要になった段階で読み込む
+# --help や入力検証エラーではこれらのモジュールを一切インポートしない
+_LAZY_ATTRIBUTES = {
+    "MarkdownParser": "md2pptx_builder.parser",
+    "PPTXBuilder": "md2pptx_builder.builder",
+    "MemoryReport": "md2pptx_builder.memory",
+}
+
+def __getattr__(name: str) -> Any:
+    """遅延インポート対象の属性を初回アクセス時に読み込む
+    
+    Args:
+        name: 属性名
+        
+    Returns:
+        Any: 読み込んだ属性
+    """
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+def _lazy(name: str) -> Any:
+    """遅延インポート対象の属性を取得する（テストでの差し替えにも対応）
+    
+    Args:
+        name: 属性名
+        
+    Returns:
+        Any: 属性の値
+    """
+    value = globals().get(name)
+    if value is None:
+        value = __getattr__(name)
+    return value
+
+def _slide_selection(value: str):
+    """--slides の値をパースする（argparseの型変換用）"""
+    try:
+        return parse_slide_selection(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
 def parse_arguments() -> Dict[str, Any]:
     """コマンドライン引数をパースする
     
@@ -28,7 +84,7 @@ def parse_arguments() -> Dict[str, Any]:
     
     parser.add_argument(
         "input_md",
-        help="入力Markdownファイルパス"
+        help=f"入力Markdownファイルパス（{STDIO_PATH} で標準入力）"
     )
     
     parser.add_argument(
@@ -51,7 +107,7 @@ def parse_arguments() -> Dict[str, Any]:
     parser.add_argument(
         "-o", "--output",
         default="output.pptx",
-        help="出力PPTXファイルパス"
+        help=f"出力PPTXファイルパス（{STDIO_PATH} で標準出力）"
     )
     
     parser.add_argument(
@@ -60,12 +116,70 @@ def parse_arguments() -> Dict[str, Any]:
         help="Markdownスライド区切り文字"
     )
     
+    parser.add_argument(
+        "--slides",
+        type=_slide_selection,
+        help="作成するスライドの番号または範囲（例: 300-320,5）。指定したスライドだけをパースする"
+    )
+    
+    parser.add_argument(
+        "--engine",
+        choices=PARSER_ENGINES,
+        default="mistune",
+        help="Markdownパーサー（fast は見出し・段落・リスト・コード・強調・リンクだけのスライドを高速にパースし、それ以外はmistuneを使う）"
+    )
+    
+    parser.add_argument(
+        "--parse-cache",
+        action="store_true",
+        help="パース結果を入力ファイルの隣にキャッシュし、変更がなければ次回以降の実行で再利用します"
+    )
+    
+    parser.add_argument(
+        "--asset-cache",
+        default=os.environ.get(ASSET_CACHE_ENV),
+        help=f"前処理済みの背景画像・ロゴを保存して再利用するディレクトリ（環境変数{ASSET_CACHE_ENV}でも指定可）"
+    )
+    
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help="既存の出力ファイルのうち、内容が変わったスライドだけを書き直します"
+    )
+    
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=1,
+        help="スライドを並列にパースするプロセス数（0でCPU数、1なら並列化しない）。スライドの少ない文書は順にパースする"
+    )
+    
+    parser.add_argument(
+        "--render-workers",
+        type=int,
+        default=1,
+        help="スライドを並列に描画するプロセス数（0でCPU数、1なら並列化しない）。出力は順に描画した場合と同じ"
+    )
+    
+    parser.add_argument(
+        "--memory-report",
+        metavar="PATH",
+        help="分割・パース・構築・保存の各段階のメモリ使用量（tracemallocの最大値と割り当て元、RSS）をJSONで保存します"
+    )
+    
     parser.add_argument(
         "--dry-run",
         action="store_true",
         help="解析のみを行い、ファイルは書き出しません"
     )
     
+    parser.add_argument(
+        "--manifest",
+        metavar="PATH",
+        help=f"スライドごとのタイトル・バイト数・要素数・画像の参照・描画コストの見積もりをJSONで書き出します"
+             f"（{STDIO_PATH} で標準出力）。--dry-run と同じくパースもPPTXの生成も行いません"
+    )
+    
     parser.add_argument(
         "-v", "--verbose",
         action="store_true",
@@ -83,8 +197,8 @@ def validate_inputs(args: Dict[str, Any]) -> bool:
     Returns:
         bool: 検証結果
     """
-    # 入力Markdownファイル
-    if not os.path.exists(args["input_md"]):
+    # 入力Markdownファイル（標準入力の場合は読み込み時に検証する）
+    if args["input_md"] != STDIO_PATH and not os.path.exists(args["input_md"]):
         logger.error(f"入力Markdownファイルが見つかりません: {args['input_md']}")
         return False
     
@@ -93,7 +207,7 @@ def validate_inputs(args: Dict[str, Any]) -> bool:
         logger.error(f"背景画像ファイルが見つかりません: {args['background']}")
         return False
     
-    if not is_valid_image(args["background"]):
+    if not is_valid_image(args["background"], cache_dir=args.get("asset_cache")):
         logger.error(f"無効な背景画像ファイルです: {args['background']}")
         return False
     
@@ -102,7 +216,7 @@ def validate_inputs(args: Dict[str, Any]) -> bool:
         logger.error(f"ロゴ画像ファイルが見つかりません: {args['logo']}")
         return False
     
-    if not is_valid_image(args["logo"]):
+    if not is_valid_image(args["logo"], cache_dir=args.get("asset_cache")):
         logger.error(f"無効なロゴ画像ファイルです: {args['logo']}")
         return False
     
@@ -111,8 +225,24 @@ def validate_inputs(args: Dict[str, Any]) -> bool:
         logger.error(f"テンプレートPPTXファイルが見つかりません: {args['template']}")
         return False
     
+    # 標準入出力と組み合わせられないオプション
+    if args.get("update") and args["output"] == STDIO_PATH:
+        logger.error("--update は標準出力への出力と同時には指定できません")
+        return False
+    
+    if args.get("parse_workers", 1) < 0:
+        logger.error("--parse-workers には0以上の数を指定してください")
+        return False
+    
+    if args.get("render_workers", 1) < 0:
+        logger.error("--render-workers には0以上の数を指定してください")
+        return False
+    
+    if args.get("parse_cache") and args["input_md"] == STDIO_PATH:
+        logger.warning("標準入力からの入力ではパースキャッシュを使用しません")
+    
     # 出力先ディレクトリ
-    output_dir = os.path.dirname(args["output"])
+    output_dir = "" if args["output"] == STDIO_PATH else os.path.dirname(args["output"])
     if output_dir and not os.path.exists(output_dir):
         try:
             os.makedirs(output_dir)
@@ -123,6 +253,66 @@ def validate_inputs(args: Dict[str, Any]) -> bool:
     
     return True
 
+def _read_stdin() -> str:
+    """標準入力からMarkdownを読み込む
+    
+    Returns:
+        str: 改行を正規化したMarkdownテキスト
+    """
+    content = sys.stdin.buffer.read().decode("utf-8")
+    return content.replace("\r\n", "\n").replace("\r", "\n")
+
+def dry_run(args: Dict[str, Any]) -> int:
+    """Markdownをパースせずにスライド構成だけを報告する
+    
+    Args:
+        args: パースされた引数
+        
+    Returns:
+        int: 終了コード
+    """
+    if args["input_md"] == STDIO_PATH:
+        manifest = scan_markdown(_read_stdin(), pagebreak=args["pagebreak"])
+    else:
+        manifest = scan_markdown_file(args["input_md"], pagebreak=args["pagebreak"])
+    total_slides = len(manifest)
+    if args.get("slides"):
+        manifest = [manifest[index] for index in select_slide_indices(args["slides"], total_slides)]
+    
+    if args.get("manifest"):
+        document = manifest_document(
+            manifest, total_slides, None if args["input_md"] == STDIO_PATH else args["input_md"],
+            args["pagebreak"]
+        )
+        if args["manifest"] == STDIO_PATH:
+            sys.stdout.buffer.write(json.dumps(document, ensure_ascii=False).encode("utf-8") + b"\n")
+            sys.stdout.buffer.flush()
+        else:
+            with open(args["manifest"], "w", encoding="utf-8") as f:
+                json.dump(document, f, ensure_ascii=False, indent=2)
+            logger.info(f"マニフェストを保存しました: {args['manifest']}")
+        # 多数の文書を処理するスケジューラー向けに、スライドごとのログは出力しない
+        logger.info(f"{len(manifest)}枚のスライド（描画コストの見積もり {document['estimated_cost']}）")
+        return 0
+    
+    if not manifest:
+        logger.warning("変換可能なスライドがありません")
+        return 0
+    
+    logger.info(f"{len(manifest)}枚のスライドを検出しました")
+    for entry in manifest:
+        counts = entry["counts"]
+        logger.info(
+            f"スライド {entry['index'] + 1}: {entry['title']} "
+            f"({entry['source'] + ' ' if entry['source'] else ''}bytes {entry['start']}-{entry['end']}, "
+            f"見出し {counts['headings']}, 段落 {counts['paragraphs']}, "
+            f"リスト項目 {counts['list_items']}, コード {counts['code_blocks']}, "
+            f"表 {counts['tables']})"
+        )
+    
+    logger.info("ドライラン: PPTXファイルは生成されません")
+    return 0
+
 def run(args: Dict[str, Any]) -> int:
     """メイン処理を実行する
     
@@ -136,37 +326,63 @@ def run(args: Dict[str, Any]) -> int:
     if not validate_inputs(args):
         return 1
     
+    # メモリレポート（指定された場合だけtracemallocを読み込む）
+    report = _lazy("MemoryReport")() if args.get("memory_report") else None
+    
     try:
+        # ドライランの場合はASTを構築せずにスライドを走査して終了
+        if args["dry_run"] or args.get("manifest"):
+            with report.stage("split") if report else nullcontext():
+                return dry_run(args)
+        
         # Markdownパーサー初期化
-        parser = MarkdownParser(pagebreak=args["pagebreak"])
+        parser = _lazy("MarkdownParser")(pagebreak=args["pagebreak"], workers=args.get("parse_workers", 1) or None,
+                                         engine=args.get("engine", "mistune"))
         
-        # Markdownファイルを処理
-        slides_data = parser.process_markdown_file(args["input_md"])
+        # Markdownファイルを処理（標準入力の場合はカレントディレクトリからインクルードする）
+        if args["input_md"] == STDIO_PATH:
+            slides_data = parser.process_markdown_content(
+                _read_stdin(), slides=args.get("slides"), memory_report=report
+            )
+        else:
+            slides_data = parser.process_markdown_file(
+                args["input_md"], slides=args.get("slides"), cache=args.get("parse_cache", False),
+                memory_report=report
+            )
         
         # スライドが存在するか確認
         if not slides_data:
+            if args.get("slides"):
+                logger.error("指定された範囲にスライドがありません")
+                return 1
             logger.warning("変換可能なスライドがありません")
             return 0
         
         logger.info(f"{len(slides_data)}枚のスライドを検出しました")
         
-        # ドライランの場合はここで終了
-        if args["dry_run"]:
-            logger.info("ドライラン: PPTXファイルは生成されません")
-            return 0
-        
         # PPTXビルダー初期化
-        builder = PPTXBuilder(
+        builder = _lazy("PPTXBuilder")(
             background_path=args["background"],
             logo_path=args["logo"],
             template_path=args["template"],
-            verbose=args["verbose"]
+            verbose=args["verbose"],
+            asset_store=AssetStore(args["asset_cache"]) if args.get("asset_cache") else None,
+            workers=args.get("render_workers", 1) or None
         )
         
-        # プレゼンテーション構築
-        builder.build_presentation(slides_data, args["output"])
+        # プレゼンテーション構築（更新モードでは変更されたスライドだけを書き直す）
+        if args["output"] == STDIO_PATH:
+            # 一時ファイルを作らずメモリ上に作成してから書き出す
+            stream = io.BytesIO()
+            builder.build_presentation(slides_data, stream, memory_report=report)
+            sys.stdout.buffer.write(stream.getvalue())
+            sys.stdout.buffer.flush()
+        elif args.get("update"):
+            builder.update_presentation(slides_data, args["output"], memory_report=report)
+        else:
+            builder.build_presentation(slides_data, args["output"], memory_report=report)
         
-        logger.info(f"変換が完了しました: {args['output']}")
+        logger.info(f"変換が完了しました: {'標準出力' if args['output'] == STDIO_PATH else args['output']}")
         return 0
         
     except Exception as e:
@@ -175,9 +391,158 @@ def run(args: Dict[str, Any]) -> int:
             import traceback
             logger.error(traceback.format_exc())
         return 1
+    
+    finally:
+        # 失敗した場合もそれまでの段階を書き出す
+        if report is not None:
+            report.close()
+            try:
+                report.write(args["memory_report"])
+            except OSError as e:
+                logger.error(f"メモリレポートを保存できません: {args['memory_report']}, エラー: {e}")
+
+def parse_analyze_arguments(argv: List[str]) -> Dict[str, Any]:
+    """analyzeサブコマンドの引数をパースする
+    
+    Args:
+        argv: サブコマンド名を除いたコマンドライン引数
+        
+    Returns:
+        Dict[str, Any]: パースされた引数
+    """
+    parser = argparse.ArgumentParser(
+        prog="md2pptx-builder analyze",
+        description="生成したPowerPointのサイズの内訳（スライドXML、メディア、重複メディア）を報告します",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    
+    parser.add_argument(
+        "input_pptx",
+        help="解析するPPTXファイルパス"
+    )
+    
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="表示する上位の件数"
+    )
+    
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="結果をJSONで出力します"
+    )
+    
+    parser.add_argument(
+        "-v", "--verbose",
+        action="store_true",
+        help="詳細ログを出力します"
+    )
+    
+    return vars(parser.parse_args(argv))
+
+def run_analyze(args: Dict[str, Any]) -> int:
+    """PPTXファイルを解析してレポートを出力する
+    
+    Args:
+        args: パースされた引数
+        
+    Returns:
+        int: 終了コード
+    """
+    from md2pptx_builder.analyzer import analyze_pptx, format_report
+    
+    if not os.path.exists(args["input_pptx"]):
+        logger.error(f"PPTXファイルが見つかりません: {args['input_pptx']}")
+        return 1
+    
+    try:
+        report = analyze_pptx(args["input_pptx"])
+    except Exception as e:
+        logger.error(f"PPTXファイル解析エラー: {e}")
+        return 1
+    
+    if args["json"]:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print(format_report(report, top=args["top"]))
+    return 0
+
+def parse_merge_arguments(argv: List[str]) -> Dict[str, Any]:
+    """mergeサブコマンドの引数をパースする
+    
+    Args:
+        argv: サブコマンド名を除いたコマンドライン引数
+        
+    Returns:
+        Dict[str, Any]: パースされた引数
+    """
+    parser = argparse.ArgumentParser(
+        prog="md2pptx-builder merge",
+        description="同じテンプレートで作成したPowerPointを順に結合します（--slides で分けて作成したデッキなど）",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    
+    parser.add_argument(
+        "input_pptx",
+        nargs="+",
+        help="結合するPPTXファイルパス（この順に結合する）"
+    )
+    
+    parser.add_argument(
+        "-o", "--output",
+        required=True,
+        help="出力PPTXファイルパス"
+    )
+    
+    parser.add_argument(
+        "-v", "--verbose",
+        action="store_true",
+        help="詳細ログを出力します"
+    )
+    
+    return vars(parser.parse_args(argv))
+
+def run_merge(args: Dict[str, Any]) -> int:
+    """PPTXファイルを結合する
+    
+    Args:
+        args: パースされた引数
+        
+    Returns:
+        int: 終了コード
+    """
+    from md2pptx_builder.merge import merge_presentations
+    
+    for path in args["input_pptx"]:
+        if not os.path.exists(path):
+            logger.error(f"PPTXファイルが見つかりません: {path}")
+            return 1
+    
+    try:
+        merge_presentations(args["input_pptx"], args["output"])
+    except Exception as e:
+        logger.error(f"PPTXファイル結合エラー: {e}")
+        return 1
+    return 0
+
+# 第1引数で選択するサブコマンド（引数解析関数、実行関数）
+SUBCOMMANDS = {
+    "analyze": (parse_analyze_arguments, run_analyze),
+    "merge": (parse_merge_arguments, run_merge),
+}
 
 def main() -> None:
     """CLIのエントリーポイント"""
+    # サブコマンドは第1引数で判定し、それ以外は従来どおり変換を行う
+    argv = sys.argv[1:]
+    if argv and argv[0] in SUBCOMMANDS:
+        parse, execute = SUBCOMMANDS[argv[0]]
+        args = parse(argv[1:])
+        setup_logging(args["verbose"])
+        sys.exit(execute(args))
+    
     # 引数解析
     args = parse_arguments()
     
@@ -0,0 +1,453 @@
+"""
+md2pptx-builder - Fast-path parser for the Markdown subset the builder renders
+"""
+
+import re
+from functools import lru_cache
+from typing import List, Dict, Any, Optional
+
+# 見出し、段落、リスト、コードブロック、コードスパン、強調、リンクだけを扱い、
+# それ以外の構文を見つけたらNoneを返してmistuneに任せる。結果のASTはmistune 3の
+# ASTレンダラー（plugins=['table']）と同じ形にする。
+
+# MarkdownParser のパーサーエンジン（fast はこのモジュールを先に試す）
+PARSER_ENGINES = ("mistune", "fast")
+
+_ATX_RE = re.compile(r"^(#{1,6})(?: +(.*))?$")
+_FENCE_RE = re.compile(r"^(`{3,}|~{3,})(.*)$")
+_LIST_ITEM_RE = re.compile(r"^( {0,3})([-*+]|(\d{1,9})[.)])(?:( +)(.*))?$")
+
+# このパーサーでは扱わないブロック（引用、HTML、水平線、Setext見出し、参照リンクの定義）
+_UNSUPPORTED_BLOCK_RE = re.compile(
+    r"^ {0,3}(?:[><]|\[[^\]]*\]:|([-*_])(?: *\1){2,} *$|=+ *$|-+ *$)"
+)
+
+# ブロックの開始になりうる行頭の文字（数字は別に判定する）
+_BLOCK_START_CHARS = frozenset(" #`~-*+_=><[")
+
+# 表の区切り行になりうる行
+_TABLE_DELIMITER_RE = re.compile(r"^[ |:-]*\|[ |:-]*$")
+
+# インライン要素の開始（mistuneのインラインパーサーと同じ優先順位）
+_INLINE_RE = re.compile(
+    r"(?P<escape>\\[!-/:-@\[-`{-~])"
+    r"|(?P<codespan>`+)"
+    r"|(?P<emphasis>\*{1,3}(?=[^\s*]))"
+    r"|(?P<underscore>\b_{1,3}(?=[^\s_]))"
+    r"|(?P<link>!?\[)"
+    r"|(?P<html><[A-Za-z/!?])"
+    r"|(?P<linebreak>(?:\\| {2,})\n)"
+    r"|(?P<softbreak> *\n\s*)"
+)
+
+# コードスパン・リンク・HTMLの開始（強調の範囲と重なる場合はこちらを優先する）
+_PRECEDENCE_RE = re.compile(r"`+|!?\[|<[A-Za-z/!?]")
+
+_EMPHASIS_END_RE = {
+    1: re.compile(r"[^\s*]\*(?!\*)"),
+    2: re.compile(r"[^\s*]\*\*(?!\*)"),
+}
+
+# 単純な [テキスト](URL "タイトル") の形のリンクだけを扱う
+_LINK_RE = re.compile(
+    r"\[([^\[\]\\`<\n]+)\]\(([A-Za-z0-9\-._~:/?#@!$&'+,;=%*]+)(?: +\"([^\"\\\n&]*)\")?\)"
+)
+
+class _Unsupported(Exception):
+    """このパーサーで扱わない構文を見つけた"""
+
+@lru_cache(maxsize=8)
+def _codespan_end(marker: str) -> "re.Pattern[str]":
+    """開きと同じ長さのバッククォートで閉じるコードスパンの正規表現を返す
+    
+    Args:
+        marker: 開きのバッククォート
+    
+    Returns:
+        re.Pattern[str]: コードスパンの内容と閉じを照合する正規表現
+    """
+    return re.compile(r"(.*?[^`])" + marker + r"(?!`)", re.S)
+
+def _text(raw: str) -> Dict[str, Any]:
+    """テキストノードを作成する"""
+    return {"type": "text", "raw": raw}
+
+def _indent(line: str) -> int:
+    """行頭の半角空白の数を返す"""
+    return len(line) - len(line.lstrip(" "))
+
+def _is_blank(line: str) -> bool:
+    """空行かどうかを判定する（空白だけの行は扱わない）"""
+    if not line:
+        return True
+    if not line.strip():
+        raise _Unsupported()
+    return False
+
+class _InlineParser:
+    """mistuneのインラインパーサーのうち、コードスパン・強調・リンク・改行だけを同じ規則で処理する"""
+    
+    def __init__(self, src: str, in_link: bool = False, in_emphasis: bool = False, in_strong: bool = False):
+        """
+        Args:
+            src: 処理するテキスト
+            in_link: リンクのテキストの内側かどうか
+            in_emphasis: * による強調の内側かどうか
+            in_strong: ** による強調の内側かどうか
+        """
+        self.src = src
+        self.in_link = in_link
+        self.in_emphasis = in_emphasis
+        self.in_strong = in_strong
+        self.tokens: List[Dict[str, Any]] = []
+    
+    def _child(self, src: str, **flags: bool) -> "_InlineParser":
+        """状態を引き継いで、強調やリンクの内側を処理するパーサーを作成する"""
+        state = {"in_link": self.in_link, "in_emphasis": self.in_emphasis, "in_strong": self.in_strong}
+        state.update(flags)
+        return _InlineParser(src, **state)
+    
+    def parse(self) -> List[Dict[str, Any]]:
+        """インライン要素のノードのリストを返す
+        
+        Returns:
+            List[Dict[str, Any]]: ノードのリスト
+        
+        Raises:
+            _Unsupported: 扱わない構文を含む場合
+        """
+        src = self.src
+        pos = 0
+        while pos < len(src):
+            m = _INLINE_RE.search(src, pos)
+            if not m:
+                break
+            start = m.start()
+            if start > pos:
+                self.tokens.append(_text(src[pos:start]))
+            new_pos = self._dispatch(m)
+            if not new_pos:
+                pos = start + 1
+                self.tokens.append(_text(src[start:pos]))
+            else:
+                pos = new_pos
+        
+        if pos == 0:
+            self.tokens.append(_text(src))
+        elif pos < len(src):
+            self.tokens.append(_text(src[pos:]))
+        return self.tokens
+    
+    def _dispatch(self, m: "re.Match[str]") -> Optional[int]:
+        """インライン要素を処理し、次の位置を返す（Noneなら開始の1文字をテキストとして扱う）"""
+        kind = m.lastgroup
+        if kind == "codespan":
+            return self._codespan(m.start(), m.group(0))
+        if kind == "emphasis":
+            return self._emphasis(m)
+        if kind == "link":
+            return self._link(m.start(), m.group(0))
+        if kind == "softbreak":
+            self.tokens.append({"type": "softbreak"})
+            return m.end()
+        # エスケープ、_ による強調、自動リンク、HTML、ハード改行
+        raise _Unsupported()
+    
+    def _codespan(self, start: int, marker: str) -> int:
+        """コードスパンを処理する（閉じがなければバッククォートをテキストとして扱う）"""
+        pos = start + len(marker)
+        m = _codespan_end(marker).match(self.src, pos)
+        if not m:
+            self.tokens.append(_text(marker))
+            return pos
+        code = m.group(1)
+        if "\n" in code:
+            raise _Unsupported()
+        if code.strip() and code.startswith(" ") and code.endswith(" "):
+            code = code[1:-1]
+        self.tokens.append({"type": "codespan", "raw": code})
+        return m.end()
+    
+    def _link(self, start: int, marker: str) -> int:
+        """[テキスト](URL "タイトル") の形のリンクを処理する"""
+        if marker != "[" or self.in_link:
+            raise _Unsupported()
+        m = _LINK_RE.match(self.src, start)
+        if not m:
+            raise _Unsupported()
+        text, url, title = m.groups()
+        attrs = {"url": url}
+        if title:
+            attrs["title"] = title
+        children = self._child(text, in_link=True).parse()
+        self.tokens.append({"type": "link", "children": children, "attrs": attrs})
+        return m.end()
+    
+    def _emphasis(self, m: "re.Match[str]") -> int:
+        """* と ** による強調を処理する（mistuneと同じく、最初に見つかった閉じで終える）"""
+        src = self.src
+        marker = m.group(0)
+        length = len(marker)
+        pos = m.end()
+        if length == 3:
+            raise _Unsupported()
+        if (length == 1 and self.in_emphasis) or (length == 2 and self.in_strong):
+            self.tokens.append(_text(marker))
+            return pos
+        
+        end = _EMPHASIS_END_RE[length].search(src, pos)
+        if not end:
+            self.tokens.append(_text(marker))
+            return pos
+        end_pos = end.end()
+        if "\\" in src[pos:end_pos]:
+            raise _Unsupported()
+        
+        # 範囲内で先に始まるコードスパンやリンクが範囲の外まで続く場合は、そちらを優先する
+        prec = _PRECEDENCE_RE.search(src, pos, end_pos)
+        if prec:
+            prec_marker = prec.group(0)
+            if prec_marker.startswith("`"):
+                inner = self._child(src)
+                prec_end = inner._codespan(prec.start(), prec_marker)
+            elif prec_marker.startswith("<") or prec_marker.startswith("!"):
+                raise _Unsupported()
+            else:
+                inner = self._child(src)
+                prec_end = inner._link(prec.start(), prec_marker)
+            if prec_end and prec_end >= end_pos:
+                self.tokens.append(_text(src[m.start():prec.start()]))
+                self.tokens.extend(inner.tokens)
+                return prec_end
+        
+        text = src[pos:end_pos - length]
+        if length == 1:
+            children = self._child(text, in_emphasis=True).parse()
+            self.tokens.append({"type": "emphasis", "children": children})
+        else:
+            children = self._child(text, in_strong=True).parse()
+            self.tokens.append({"type": "strong", "children": children})
+        return end_pos
+
+def _parse_inline(text: str) -> List[Dict[str, Any]]:
+    """段落や見出しのテキストをインライン要素のノードのリストに変換する"""
+    return _InlineParser(text).parse()
+
+class _BlockParser:
+    """行単位でブロックを読み取る"""
+    
+    def __init__(self, lines: List[str], depth: int = 0):
+        """
+        Args:
+            lines: 行のリスト（リスト項目の中では項目のインデントを除いたもの）
+            depth: リストの入れ子の深さ（0なら文書の最上位）
+        """
+        self.lines = lines
+        self.depth = depth
+        self.pos = 0
+    
+    def parse(self) -> List[Dict[str, Any]]:
+        """ブロックのノードのリストを返す
+        
+        Returns:
+            List[Dict[str, Any]]: ノードのリスト
+        
+        Raises:
+            _Unsupported: 扱わない構文を含む場合
+        """
+        lines = self.lines
+        nodes: List[Dict[str, Any]] = []
+        while self.pos < len(lines):
+            line = lines[self.pos]
+            if _is_blank(line):
+                while self.pos < len(lines) and _is_blank(lines[self.pos]):
+                    self.pos += 1
+                nodes.append({"type": "blank_line"})
+                continue
+            
+            # 行頭の1文字で候補を絞ってから正規表現で確認する
+            first = line[0]
+            if first in _BLOCK_START_CHARS:
+                if _indent(line) >= 4 or _UNSUPPORTED_BLOCK_RE.match(line):
+                    raise _Unsupported()
+            if first == "#":
+                nodes.append(self._heading(line))
+            elif first in "`~" and _FENCE_RE.match(line):
+                nodes.append(self._fence())
+            elif (first in _BLOCK_START_CHARS or first.isdigit()) and _LIST_ITEM_RE.match(line):
+                nodes.append(self._list())
+            elif first == " ":
+                raise _Unsupported()
+            else:
+                nodes.append(self._paragraph())
+        return nodes
+    
+    def _heading(self, line: str) -> Dict[str, Any]:
+        """ATX見出しを読み取る"""
+        m = _ATX_RE.match(line)
+        if not m or not m.group(2):
+            raise _Unsupported()
+        text = m.group(2)
+        if text != text.strip() or text.endswith("#"):
+            raise _Unsupported()
+        self.pos += 1
+        return {
+            "type": "heading",
+            "attrs": {"level": len(m.group(1))},
+            "style": "atx",
+            "children": _parse_inline(text),
+        }
+    
+    def _fence(self) -> Dict[str, Any]:
+        """フェンスで囲んだコードブロックを読み取る（閉じフェンスがなければ扱わない）"""
+        lines = self.lines
+        marker, info = _FENCE_RE.match(lines[self.pos]).groups()
+        info = info.strip()
+        if (marker[0] == "`" and "`" in info) or "\\" in info or "&" in info:
+            raise _Unsupported()
+        
+        closing = re.compile(r"^ {0,3}" + re.escape(marker[0]) + "{%d,} *$" % len(marker))
+        for end in range(self.pos + 1, len(lines)):
+            if closing.match(lines[end]):
+                break
+        else:
+            raise _Unsupported()
+        
+        body = lines[self.pos + 1:end]
+        self.pos = end + 1
+        node = {
+            "type": "block_code",
+            "raw": "".join(line + "\n" for line in body),
+            "style": "fenced",
+            "marker": marker,
+        }
+        if info:
+            node["attrs"] = {"info": info}
+        return node
+    
+    def _interrupts(self, line: str) -> bool:
+        """段落の途中の行が新しいブロックを始めるかどうかを判定する"""
+        if _is_blank(line):
+            return True
+        if line[0] not in _BLOCK_START_CHARS and not line[0].isdigit():
+            return False
+        if _indent(line) >= 4:
+            return False
+        stripped = line.lstrip(" ")
+        if _UNSUPPORTED_BLOCK_RE.match(line):
+            raise _Unsupported()
+        if stripped.startswith("#") and _ATX_RE.match(stripped):
+            if line[0] == " ":
+                raise _Unsupported()
+            return True
+        if _FENCE_RE.match(stripped):
+            if line[0] == " ":
+                raise _Unsupported()
+            return True
+        m = _LIST_ITEM_RE.match(line)
+        if m:
+            if m.group(3) is None or m.group(3) == "1":
+                return True
+            if int(m.group(3)) == 1:
+                raise _Unsupported()
+        return False
+    
+    def _paragraph(self) -> Dict[str, Any]:
+        """新しいブロックが始まるまでの行を段落として読み取る"""
+        lines = self.lines
+        start = self.pos
+        self.pos += 1
+        while self.pos < len(lines) and not self._interrupts(lines[self.pos]):
+            self.pos += 1
+        text = "\n".join(lines[start:self.pos])
+        if text != text.strip():
+            raise _Unsupported()
+        return {"type": "paragraph", "children": _parse_inline(text)}
+    
+    def _list(self) -> Dict[str, Any]:
+        """リストを読み取る（項目の内容は入れ子のブロックとして読み取る）"""
+        lines = self.lines
+        m = _LIST_ITEM_RE.match(lines[self.pos])
+        bullet = m.group(2)[-1]
+        ordered = m.group(3) is not None
+        start = int(m.group(3)) if ordered else None
+        items = []
+        
+        while m:
+            indent, marker, _, spaces, content = m.groups()
+            # 空の項目や、マーカーの後の空白が2つ以上ある項目は扱わない
+            if not content or len(spaces) != 1:
+                raise _Unsupported()
+            offset = len(indent) + len(marker) + 1
+            body = [content]
+            self.pos += 1
+            m = None
+            
+            while self.pos < len(lines):
+                line = lines[self.pos]
+                if _is_blank(line):
+                    # 空行の後に同じリストが続く場合（ゆるいリスト）は扱わない
+                    following = self.pos
+                    while following < len(lines) and _is_blank(lines[following]):
+                        following += 1
+                    if following < len(lines):
+                        line = lines[following]
+                        if _indent(line) >= offset or self._sibling(line, bullet):
+                            raise _Unsupported()
+                    self.pos = following
+                    break
+                if _indent(line) >= offset:
+                    body.append(line[offset:])
+                    self.pos += 1
+                    continue
+                m = self._sibling(line, bullet)
+                if m:
+                    break
+                # 怠惰な継続行は扱わない
+                if line.startswith(" ") or not self._interrupts(line):
+                    raise _Unsupported()
+                break
+            
+            items.append({"type": "list_item", "children": _BlockParser(body, self.depth + 1).parse()})
+        
+        # mistuneと同じく、段落を2つ以上含む項目があればゆるいリストとする
+        tight = all(
+            sum(node["type"] == "paragraph" for node in item["children"]) < 2 for item in items
+        )
+        if tight:
+            for item in items:
+                for node in item["children"]:
+                    if node["type"] == "paragraph":
+                        node["type"] = "block_text"
+        
+        attrs: Dict[str, Any] = {"depth": self.depth, "ordered": ordered}
+        if ordered and start != 1:
+            attrs["start"] = start
+        return {"type": "list", "children": items, "tight": tight, "bullet": bullet, "attrs": attrs}
+    
+    @staticmethod
+    def _sibling(line: str, bullet: str) -> Optional["re.Match[str]"]:
+        """同じ種類のマーカーで始まる次の項目の行なら、その照合結果を返す"""
+        m = _LIST_ITEM_RE.match(line)
+        if m and m.group(2)[-1] == bullet and (m.group(3) is None) == (bullet in "-*+"):
+            return m
+        return None
+
+def parse_subset(text: str) -> Optional[List[Dict[str, Any]]]:
+    """スライドのMarkdownをmistuneと同じ形のASTに変換する
+    
+    Args:
+        text: スライドのMarkdownテキスト（改行は正規化済み）
+    
+    Returns:
+        Optional[List[Dict[str, Any]]]: ASTノードのリスト（扱わない構文を含む場合はNone）
+    """
+    if "\t" in text or "\0" in text or "\r" in text:
+        return None
+    lines = text.split("\n")
+    if "|" in text and any(_TABLE_DELIMITER_RE.match(line) for line in lines if "-" in line):
+        return None
+    try:
+        return _BlockParser(lines).parse()
+    except _Unsupported:
+        return None
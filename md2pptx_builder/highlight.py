@@ -0,0 +1,121 @@
+"""
+md2pptx-builder - Syntax highlighting for code blocks
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 使用するPygmentsのスタイル（明るい背景向け）
+HIGHLIGHT_STYLE = "default"
+
+# ハイライト結果のキャッシュ件数の上限
+HIGHLIGHT_CACHE_SIZE = 1024
+
+# (テキスト, 色（RRGGBB、指定なしはNone）, 太字, 斜体)
+StyledRun = Tuple[str, Optional[str], bool, bool]
+
+_cache: "OrderedDict[str, Tuple[StyledRun, ...]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+def _cache_key(code: str, language: str) -> str:
+    """コードと言語からキャッシュキーを生成する
+    
+    Args:
+        code: ソースコード
+        language: 言語名
+    
+    Returns:
+        str: キャッシュキー
+    """
+    digest = hashlib.sha1(language.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(code.encode("utf-8"))
+    return digest.hexdigest()
+
+def _tokenize(code: str, language: str) -> Optional[List[StyledRun]]:
+    """Pygmentsでコードをトークンに分割し、同じスタイルの隣接トークンを結合する
+    
+    Args:
+        code: ソースコード
+        language: 言語名
+    
+    Returns:
+        Optional[List[StyledRun]]: スタイル付きのランのリスト（ハイライトできない場合はNone）
+    """
+    try:
+        from pygments.lexers import get_lexer_by_name
+        from pygments.styles import get_style_by_name
+        from pygments.util import ClassNotFound
+    except ImportError:
+        logger.debug("Pygmentsがインストールされていないため、コードをハイライトしません")
+        return None
+    
+    try:
+        lexer = get_lexer_by_name(language, stripnl=False, ensurenl=False)
+    except ClassNotFound:
+        logger.debug(f"未対応の言語のため、コードをハイライトしません: {language}")
+        return None
+    
+    style = get_style_by_name(HIGHLIGHT_STYLE)
+    runs: List[List] = []
+    
+    for token_type, text in lexer.get_tokens(code):
+        if not text:
+            continue
+        # 空白は色が見えないため直前のランに含める
+        if runs and text.isspace():
+            runs[-1][0] += text
+            continue
+        
+        token_style = style.style_for_token(token_type)
+        key = (token_style["color"] or None, bool(token_style["bold"]), bool(token_style["italic"]))
+        if runs and tuple(runs[-1][1:]) == key:
+            runs[-1][0] += text
+        else:
+            runs.append([text, *key])
+    
+    return [tuple(run) for run in runs]
+
+def highlight_code(code: str, language: str) -> List[StyledRun]:
+    """コードをハイライトしてスタイル付きのランのリストを返す
+    
+    同じスタイルの隣接トークンは1つのランにまとめる。結果は (コード, 言語) の
+    ハッシュをキーにキャッシュする。
+    
+    Args:
+        code: ソースコード
+        language: 言語名（空の場合はハイライトしない）
+    
+    Returns:
+        List[StyledRun]: スタイル付きのランのリスト
+    """
+    # info文字列の先頭の単語を言語名とする（例: "python title=example.py"）
+    words = (language or "").split()
+    language = words[0].lower() if words else ""
+    if not language or not code:
+        return [(code, None, False, False)]
+    
+    key = _cache_key(code, language)
+    with _cache_lock:
+        runs = _cache.get(key)
+        if runs is not None:
+            _cache.move_to_end(key)
+            return list(runs)
+    
+    runs = tuple(_tokenize(code, language) or [(code, None, False, False)])
+    with _cache_lock:
+        _cache[key] = runs
+        if len(_cache) > HIGHLIGHT_CACHE_SIZE:
+            _cache.popitem(last=False)
+    
+    return list(runs)
+
+def clear_highlight_cache() -> None:
+    """ハイライト結果のキャッシュを消去する"""
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,333 @@
+"""
+md2pptx-builder - Cached validation of image files
+"""
+
+import os
+import json
+import struct
+import hashlib
+import logging
+import tempfile
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union, NamedTuple, BinaryIO
+
+logger = logging.getLogger(__name__)
+
+# キャッシュディレクトリ内の検証結果ファイルの名前
+IMAGE_CHECK_CACHE_NAME = "image-checks.json"
+
+# 検証結果の形式を変えたら更新し、古い結果を使わないようにする
+IMAGE_CHECK_FORMAT_VERSION = 1
+
+# 検証結果ファイルに保存するファイル数の上限（古いものから捨てる）
+IMAGE_CHECK_MAX_ENTRIES = 4096
+
+# JPEGのフレームヘッダー（SOF）のマーカー（DHT・JPG・DACは除く）
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+# JPEGの長さを持たないマーカー（SOI、TEM、RST0-7）
+_JPEG_STANDALONE_MARKERS = frozenset([0xD8, 0x01]) | frozenset(range(0xD0, 0xD8))
+
+class ImageInfo(NamedTuple):
+    """画像の形式とサイズ"""
+    format: str
+    width: int
+    height: int
+
+def sniff_image(f: BinaryIO) -> Optional[ImageInfo]:
+    """ファイルの先頭のヘッダーだけから画像の形式とサイズを読み取る
+    
+    PNG、JPEG、GIF、BMPに対応する。画像データ全体は読まない。
+    
+    Args:
+        f: 先頭に位置するバイナリファイル
+    
+    Returns:
+        Optional[ImageInfo]: 形式とサイズ（対応していない形式や壊れたヘッダーならNone）
+    """
+    header = f.read(26)
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        if len(header) < 24 or header[12:16] != b"IHDR":
+            return None
+        width, height = struct.unpack(">II", header[16:24])
+        info = ImageInfo("PNG", width, height)
+    elif header[:6] in (b"GIF87a", b"GIF89a"):
+        if len(header) < 10:
+            return None
+        width, height = struct.unpack("<HH", header[6:10])
+        info = ImageInfo("GIF", width, height)
+    elif header.startswith(b"BM"):
+        if len(header) < 26:
+            return None
+        if struct.unpack("<I", header[14:18])[0] == 12:
+            width, height = struct.unpack("<HH", header[18:22])
+        else:
+            width, height = struct.unpack("<ii", header[18:26])
+        info = ImageInfo("BMP", width, abs(height))
+    elif header.startswith(b"\xff\xd8"):
+        info = _sniff_jpeg(f)
+    else:
+        return None
+    
+    if info is None or info.width <= 0 or info.height <= 0:
+        return None
+    return info
+
+def _sniff_jpeg(f: BinaryIO) -> Optional[ImageInfo]:
+    """JPEGのセグメントを辿り、フレームヘッダーからサイズを読み取る
+    
+    Args:
+        f: JPEGファイル
+    
+    Returns:
+        Optional[ImageInfo]: 形式とサイズ（フレームヘッダーが見つからなければNone）
+    """
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        if marker[1] == 0xFF:
+            # マーカーの前の埋め草
+            f.seek(-1, os.SEEK_CUR)
+            continue
+        if marker[1] in _JPEG_STANDALONE_MARKERS:
+            continue
+        length = f.read(2)
+        if len(length) < 2:
+            return None
+        size = struct.unpack(">H", length)[0]
+        if marker[1] in _JPEG_SOF_MARKERS:
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">HH", frame[1:5])
+            return ImageInfo("JPEG", width, height)
+        if size < 2:
+            return None
+        f.seek(size - 2, os.SEEK_CUR)
+
+def _verify(path: str) -> ImageInfo:
+    """Pillowで画像全体を検証する
+    
+    Args:
+        path: 画像ファイルパス
+    
+    Returns:
+        ImageInfo: 形式とサイズ
+    
+    Raises:
+        ValueError: 画像として読み込めない場合
+    """
+    # PILは検証時にのみ読み込む（CLI起動を軽くするため）
+    from PIL import Image
+    
+    try:
+        with Image.open(path) as img:
+            info = ImageInfo(img.format or "", img.width, img.height)
+            img.verify()
+    except Exception as e:
+        raise ValueError(str(e)) from e
+    return info
+
+def _file_digest(path: str) -> str:
+    """ファイルの内容のハッシュを計算する
+    
+    Args:
+        path: ファイルパス
+    
+    Returns:
+        str: SHA-1のハッシュ値
+    """
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# このプロセスで検証した結果（(実パス, サイズ, 更新時刻) → 結果）。すべての検証器で共有する
+_checked: Dict[Tuple[str, int, int], Dict] = {}
+
+class ImageValidator:
+    """画像ファイルの検証結果をキャッシュする検証器
+    
+    ヘッダーから形式とサイズを読み取り、verify が有効なら初回だけPillowで全体を検証する。
+    結果は (実パス, サイズ, 更新時刻) をキーにこのプロセス内で共有し、キャッシュディレクトリが
+    あれば次回以降の実行のためにファイルにも保存する。パスや更新時刻が変わっても、同じ
+    サイズの既知のファイルがあれば内容のハッシュで照合する。無効という結果もキャッシュする。
+    """
+    
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None, verify: bool = True):
+        """
+        Args:
+            cache_dir: 検証結果を保存するディレクトリ（省略時はこのプロセス内だけで共有する）
+            verify: 初回にPillowで画像全体を検証するかどうか（Falseならヘッダーだけで判定する）
+        """
+        self.cache_path = Path(cache_dir) / IMAGE_CHECK_CACHE_NAME if cache_dir else None
+        self.verify = verify
+        self._entries: Optional[Dict[str, Dict]] = None
+        self._lock = threading.Lock()
+    
+    def _load(self) -> Dict[str, Dict]:
+        """保存した検証結果を読み込む
+        
+        Returns:
+            Dict[str, Dict]: 実パスと検証結果の対応
+        """
+        if self._entries is None:
+            entries = {}
+            if self.cache_path is not None:
+                try:
+                    with open(self.cache_path, encoding="utf-8") as f:
+                        data = json.load(f)
+                    if data.get("format") == IMAGE_CHECK_FORMAT_VERSION:
+                        entries = data["entries"]
+                except FileNotFoundError:
+                    pass
+                except (OSError, ValueError, KeyError, AttributeError) as e:
+                    logger.debug(f"画像の検証結果を読み込めません: {self.cache_path}, エラー: {e}")
+            self._entries = entries
+        return self._entries
+    
+    def _save(self) -> None:
+        """検証結果をファイルに保存する（書き込めなくても処理は続ける）"""
+        if self.cache_path is None:
+            return
+        entries = self._entries or {}
+        if len(entries) > IMAGE_CHECK_MAX_ENTRIES:
+            # 挿入順（最後に検証した順）で古いものから捨てる
+            for path in list(entries)[:len(entries) - IMAGE_CHECK_MAX_ENTRIES]:
+                del entries[path]
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_path.parent, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump({"format": IMAGE_CHECK_FORMAT_VERSION, "entries": entries}, f, ensure_ascii=False)
+                os.replace(temp_path, self.cache_path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError as e:
+            logger.warning(f"画像の検証結果を保存できません: {self.cache_path}, エラー: {e}")
+    
+    def _lookup(self, real_path: str, size: int, mtime: int) -> Optional[Dict]:
+        """キャッシュから検証結果を探す
+        
+        Args:
+            real_path: 画像ファイルの実パス
+            size: ファイルサイズ
+            mtime: 更新時刻（ナノ秒）
+        
+        Returns:
+            Optional[Dict]: 検証結果（なければNone）
+        """
+        entry = _checked.get((real_path, size, mtime))
+        if entry is not None:
+            return entry
+        
+        entries = self._load()
+        entry = entries.get(real_path)
+        if entry is not None and entry["size"] == size and entry["mtime"] == mtime:
+            return entry
+        
+        # 同じサイズの既知のファイルがある場合だけ内容のハッシュで照合する
+        same_size = [entry for entry in entries.values() if entry["size"] == size]
+        same_size.extend(entry for key, entry in _checked.items() if key[1] == size)
+        if not same_size:
+            return None
+        digest = _file_digest(real_path)
+        return next((dict(entry, mtime=mtime) for entry in same_size if entry["digest"] == digest), None)
+    
+    def inspect(self, file_path: Union[str, Path]) -> ImageInfo:
+        """画像ファイルを検証し、形式とサイズを返す
+        
+        Args:
+            file_path: 画像ファイルパス
+        
+        Returns:
+            ImageInfo: 形式とサイズ
+        
+        Raises:
+            ValueError: 画像として読み込めない場合
+        """
+        try:
+            real_path = os.path.realpath(file_path)
+            stat = os.stat(real_path)
+        except OSError as e:
+            raise ValueError(str(e)) from e
+        key = (real_path, stat.st_size, stat.st_mtime_ns)
+        
+        with self._lock:
+            entry = self._lookup(*key)
+            if entry is None or (self.verify and not entry["verified"] and entry["error"] is None):
+                entry = self._check(real_path, stat.st_size, stat.st_mtime_ns, entry)
+                self._load().pop(real_path, None)
+                self._load()[real_path] = entry
+                self._save()
+            elif self.cache_path is not None and self._load().get(real_path) is not entry:
+                # 他の検証器やハッシュで見つかった結果もこのキャッシュに保存する
+                self._load()[real_path] = entry
+                self._save()
+            _checked[key] = entry
+        
+        if entry["error"] is not None:
+            raise ValueError(entry["error"])
+        return ImageInfo(entry["format"], entry["width"], entry["height"])
+    
+    def _check(self, real_path: str, size: int, mtime: int, entry: Optional[Dict]) -> Dict:
+        """画像ファイルを検証して結果を作成する
+        
+        Args:
+            real_path: 画像ファイルの実パス
+            size: ファイルサイズ
+            mtime: 更新時刻（ナノ秒）
+            entry: ヘッダーだけで判定した以前の結果（なければNone）
+        
+        Returns:
+            Dict: 検証結果
+        """
+        digest = entry["digest"] if entry else _file_digest(real_path)
+        result = {"size": size, "mtime": mtime, "digest": digest, "verified": False,
+                  "format": None, "width": 0, "height": 0, "error": None}
+        try:
+            with open(real_path, "rb") as f:
+                info = sniff_image(f)
+            if self.verify or info is None:
+                info = _verify(real_path)
+                result["verified"] = True
+            result.update(format=info.format, width=info.width, height=info.height)
+        except (OSError, ValueError) as e:
+            result["error"] = str(e) or type(e).__name__
+        logger.debug(f"画像を検証しました: {real_path} ({result['format'] or result['error']})")
+        return result
+    
+    def is_valid(self, file_path: Union[str, Path]) -> bool:
+        """有効な画像ファイルかどうかを確認する
+        
+        Args:
+            file_path: 画像ファイルパス
+        
+        Returns:
+            bool: 有効な画像かどうか
+        """
+        try:
+            self.inspect(file_path)
+            return True
+        except ValueError as e:
+            logger.error(f"無効な画像ファイル: {file_path}, エラー: {e}")
+            return False
+
+@lru_cache(maxsize=None)
+def get_image_validator(cache_dir: Optional[str] = None) -> ImageValidator:
+    """キャッシュディレクトリごとに共有される検証器を返す
+    
+    Args:
+        cache_dir: 検証結果を保存するディレクトリ
+    
+    Returns:
+        ImageValidator: 検証器
+    """
+    return ImageValidator(cache_dir)
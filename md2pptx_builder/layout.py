@@ -0,0 +1,647 @@
+"""
+md2pptx-builder - Text measurement and content layout
+"""
+
+import os
+import sys
+import logging
+import threading
+import unicodedata
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
+
+from md2pptx_builder.utils import TextFlattener
+
+logger = logging.getLogger(__name__)
+
+# 本文・見出し・コードのフォントサイズ（ポイント）
+BODY_FONT_SIZE = 18
+CODE_FONT_SIZE = 14
+TABLE_FONT_SIZE = 14
+HEADING_FONT_SIZES = {
+    2: 28,  # H2
+    3: 24,  # H3
+    4: 20,  # H4
+    5: 18,  # H5
+    6: 16   # H6
+}
+
+# 行の高さ（フォントサイズに対する倍率、PowerPointの行間1.0相当）
+LINE_SPACING = 1.2
+
+# リストのインデント1段あたりの幅（ポイント）
+LIST_INDENT = 36.0
+
+# PowerPointの段落レベルの上限（これより深いリストは同じ位置にそろえる）
+LIST_MAX_LEVEL = 8
+
+# リストの行頭記号・番号の幅（ポイント、項目の本文はこの分右から始まる）
+LIST_MARKER_WIDTH = 27.0
+
+# 深くネストされたリスト項目のフォントサイズの下限
+LIST_MIN_FONT_SIZE = 10
+
+# テキストボックスと表のセルの既定の内側余白（ポイント）
+FRAME_INSET_X = 7.2
+FRAME_INSET_Y = 3.6
+
+# リストの前後と項目の後の余白（ポイント）
+LIST_SPACE_BEFORE = 4.0
+LIST_SPACE_AFTER = 8.0
+LIST_ITEM_SPACE_AFTER = 5.0
+
+# ネストされたリストの後の余白（ポイント）
+NESTED_LIST_SPACE_AFTER = 4.0
+
+# 表の後の余白（ポイント）
+TABLE_SPACE_AFTER = 12.0
+
+# 表の列の最小幅（ポイント）
+TABLE_MIN_COLUMN_WIDTH = 36.0
+
+# これより小さく縮小する必要がある場合は続きのスライドに分割する
+MIN_FONT_SCALE = 0.7
+
+# 1ポイントあたりのEMU
+EMU_PER_POINT = 12700
+
+# 行頭に来てはならない文字（直前の文字と分割しない）
+NO_BREAK_BEFORE = frozenset("、。，．,.)]}）］｝〕〉》」』】〙〗ゝゞーァィゥェォッャュョヮヵヶぁぃぅぇぉっゃゅょゎゕゖ々！？!?：；:;")
+
+# 行末に来てはならない文字（直後の文字と分割しない）
+NO_BREAK_AFTER = frozenset("([{（［｛〔〈《「『【〘〖")
+
+# フォントファミリー名と対応するフォントファイル名の候補
+FONT_FILE_CANDIDATES = {
+    "メイリオ": ["meiryo.ttc", "Meiryo.ttc"],
+    "游ゴシック": ["YuGothM.ttc", "YuGothic-Medium.otf"],
+    "游明朝": ["yumin.ttf", "YuMincho.ttc"],
+    "MS Pゴシック": ["msgothic.ttc"],
+    "MS P明朝": ["msmincho.ttc"],
+    "BIZ UDゴシック": ["BIZ-UDGothicR.ttc"],
+    "BIZ UD明朝": ["BIZ-UDMinchoM.ttc"],
+    "UD デジタル 教科書体": ["UDDigiKyokashoN-R.ttc"],
+    "Noto Sans JP": ["NotoSansJP-Regular.otf", "NotoSansCJK-Regular.ttc", "NotoSansCJKjp-Regular.otf"],
+    "Noto Serif JP": ["NotoSerifJP-Regular.otf", "NotoSerifCJK-Regular.ttc", "NotoSerifCJKjp-Regular.otf"],
+    "Arial": ["arial.ttf", "Arial.ttf", "LiberationSans-Regular.ttf"],
+    "Consolas": ["consola.ttf", "DejaVuSansMono.ttf", "LiberationMono-Regular.ttf"],
+}
+
+def _font_directories() -> List[str]:
+    """OSごとのフォントディレクトリを返す
+    
+    Returns:
+        List[str]: フォントディレクトリのリスト
+    """
+    if sys.platform.startswith("win"):
+        windir = os.environ.get("WINDIR", "C:\\Windows")
+        local = os.environ.get("LOCALAPPDATA", "")
+        return [os.path.join(windir, "Fonts"), os.path.join(local, "Microsoft", "Windows", "Fonts")]
+    if sys.platform == "darwin":
+        return ["/System/Library/Fonts", "/Library/Fonts", os.path.expanduser("~/Library/Fonts")]
+    return ["/usr/share/fonts", "/usr/local/share/fonts", os.path.expanduser("~/.fonts"),
+            os.path.expanduser("~/.local/share/fonts")]
+
+@lru_cache(maxsize=None)
+def find_font_file(font_family: str) -> Optional[str]:
+    """フォントファミリー名からフォントファイルを探す
+    
+    Args:
+        font_family: フォントファミリー名
+    
+    Returns:
+        Optional[str]: フォントファイルのパス（見つからなければNone）
+    """
+    candidates = {name.lower() for name in FONT_FILE_CANDIDATES.get(font_family, [])}
+    if not candidates:
+        return None
+    
+    for directory in _font_directories():
+        if not os.path.isdir(directory):
+            continue
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if name.lower() in candidates:
+                    return os.path.join(root, name)
+    
+    logger.debug(f"フォントファイルが見つかりません: {font_family}")
+    return None
+
+def _estimate_char_width(char: str, monospace: bool) -> float:
+    """フォントファイルがない場合の文字幅（em単位）の推定値を返す
+    
+    Args:
+        char: 文字
+        monospace: 等幅フォントかどうか
+    
+    Returns:
+        float: 文字幅（em単位）
+    """
+    if unicodedata.east_asian_width(char) in ("W", "F", "A") and ord(char) > 0x7f:
+        return 1.0
+    if monospace:
+        return 0.55
+    if char == " ":
+        return 0.28
+    if char in "iIjlt.,:;!|'`()[]{}f":
+        return 0.32
+    if char in "mwMW@%":
+        return 0.9
+    if char.isupper() or char.isdigit():
+        return 0.66
+    return 0.56
+
+class TextMeasurer:
+    """フォントメトリクスを使ってテキストの幅と行数を計測するクラス
+    
+    文字幅はフォントサイズごとに一度だけ計測してキャッシュする。計測器はビルダー間で
+    共有されるため、キャッシュにない文字の計測は複数のスレッドから同時に行わない。
+    """
+    
+    def __init__(self, font_path: Optional[str] = None, monospace: bool = False):
+        """
+        Args:
+            font_path: 計測に使うフォントファイルのパス（Noneの場合は推定値を使う）
+            monospace: 推定値を使う場合に等幅フォントとして扱うかどうか
+        """
+        self.font_path = font_path
+        self.monospace = monospace
+        self._widths: Dict[float, Dict[str, float]] = {}
+        self._fonts: Dict[float, Any] = {}
+        self._lock = threading.Lock()
+    
+    def _load_font(self, size: float):
+        """指定サイズのフォントを読み込む
+        
+        Args:
+            size: フォントサイズ（ポイント）
+        
+        Returns:
+            ImageFont.FreeTypeFont: フォント（読み込めない場合はNone）
+        """
+        if size not in self._fonts:
+            font = None
+            if self.font_path:
+                try:
+                    from PIL import ImageFont
+                    # 小さいサイズのヒンティング誤差を避けるため4倍で計測する
+                    font = ImageFont.truetype(self.font_path, max(1, round(size * 4)))
+                except Exception as e:
+                    logger.warning(f"フォントの読み込みに失敗: {self.font_path}, エラー: {e}")
+                    self.font_path = None
+            self._fonts[size] = font
+        return self._fonts[size]
+    
+    def glyph_widths(self, size: float) -> Dict[str, float]:
+        """指定サイズの文字幅キャッシュを返す
+        
+        Args:
+            size: フォントサイズ（ポイント）
+        
+        Returns:
+            Dict[str, float]: 文字から幅（ポイント）へのキャッシュ
+        """
+        widths = self._widths.get(size)
+        if widths is None:
+            widths = self._widths[size] = {}
+        return widths
+    
+    def _measure_char(self, char: str, size: float, widths: Dict[str, float]) -> float:
+        """文字幅を計測してキャッシュに保存する
+        
+        Args:
+            char: 文字
+            size: フォントサイズ（ポイント）
+            widths: 文字幅キャッシュ
+        
+        Returns:
+            float: 文字幅（ポイント）
+        """
+        with self._lock:
+            font = self._load_font(size)
+            if font is not None:
+                width = font.getlength(char) / 4
+            else:
+                width = _estimate_char_width(char, self.monospace) * size
+            widths[char] = width
+        return width
+    
+    def text_width(self, text: str, size: float) -> float:
+        """1行のテキストの幅を計測する
+        
+        Args:
+            text: テキスト
+            size: フォントサイズ（ポイント）
+        
+        Returns:
+            float: 幅（ポイント）
+        """
+        widths = self.glyph_widths(size)
+        total = 0.0
+        for char in text:
+            width = widths.get(char)
+            if width is None:
+                width = self._measure_char(char, size, widths)
+            total += width
+        return total
+    
+    def count_lines(self, text: str, size: float, max_width: float) -> int:
+        """折り返し後の行数を計測する
+        
+        英単語は空白で、CJK文字は文字ごとに折り返す（禁則文字は考慮する）。
+        
+        Args:
+            text: テキスト（改行を含んでもよい）
+            size: フォントサイズ（ポイント）
+            max_width: 1行の最大幅（ポイント）
+        
+        Returns:
+            int: 行数
+        """
+        if max_width <= 0:
+            return text.count("\n") + 1
+        
+        widths = self.glyph_widths(size)
+        lines = 0
+        
+        for segment in text.split("\n"):
+            lines += 1
+            line_width = 0.0
+            # 直近の折り返し可能位置から現在までの幅
+            tail_width = 0.0
+            prev_breakable = False
+            
+            for char in segment:
+                width = widths.get(char)
+                if width is None:
+                    width = self._measure_char(char, size, widths)
+                
+                if char == " " or char == "\t":
+                    # 空白の後ろで折り返せる（行末の空白ははみ出してよい）
+                    line_width += width
+                    tail_width = 0.0
+                    prev_breakable = False
+                    continue
+                
+                is_cjk = char >= "\u2e80"
+                if (is_cjk or prev_breakable) and char not in NO_BREAK_BEFORE:
+                    tail_width = 0.0
+                prev_breakable = is_cjk and char not in NO_BREAK_AFTER
+                
+                if line_width + width > max_width and line_width > 0:
+                    lines += 1
+                    if tail_width < line_width:
+                        # 折り返し可能位置以降を次の行へ送る
+                        line_width = tail_width
+                    else:
+                        # 折り返し位置がない長い単語は文字単位で分割する
+                        line_width = 0.0
+                        tail_width = 0.0
+                
+                line_width += width
+                tail_width += width
+        
+        return lines
+
+@lru_cache(maxsize=None)
+def get_measurer(font_path: Optional[str] = None, monospace: bool = False) -> TextMeasurer:
+    """フォントごとに共有されるTextMeasurerを返す
+    
+    Args:
+        font_path: フォントファイルのパス
+        monospace: 等幅フォントとして扱うかどうか
+    
+    Returns:
+        TextMeasurer: 計測器
+    """
+    return TextMeasurer(font_path, monospace)
+
+def list_item_geometry(depth: int) -> Tuple[float, float]:
+    """ネストの深さに応じたリスト項目の本文の左端とフォントサイズを返す
+    
+    Args:
+        depth: ネストの深さ
+    
+    Returns:
+        Tuple[float, float]: 本文の左端（ポイント、行頭記号の幅を含む）とフォントサイズ
+    """
+    margin = LIST_INDENT * min(depth, LIST_MAX_LEVEL) + LIST_MARKER_WIDTH
+    return margin, max(BODY_FONT_SIZE - depth, LIST_MIN_FONT_SIZE)
+
+def table_rows(node: Dict[str, Any]) -> List[List[Dict[str, Any]]]:
+    """表ノードからヘッダー行を先頭にした行ごとのセルのリストを取り出す
+    
+    Args:
+        node: 表ノード
+    
+    Returns:
+        List[List[Dict[str, Any]]]: 行ごとのセルノードのリスト
+    """
+    rows = []
+    for child in node.get("children", []):
+        if child.get("type") == "table_head":
+            rows.append(child.get("children", []))
+        elif child.get("type") == "table_body":
+            rows.extend(row.get("children", []) for row in child.get("children", []))
+    return rows
+
+class ContentLayout:
+    """スライドのコンテンツ領域に収まるように縮小率と改ページを決めるクラス"""
+    
+    def __init__(self,
+                 width: float,
+                 height: float,
+                 measurer: TextMeasurer,
+                 code_measurer: Optional[TextMeasurer] = None,
+                 text: Optional[TextFlattener] = None):
+        """
+        Args:
+            width: コンテンツ領域の幅（ポイント）
+            height: コンテンツ領域の高さ（ポイント）
+            measurer: 本文用の計測器
+            code_measurer: コード用の計測器
+            text: ノードのテキストを取得する TextFlattener（描画側と共有する場合に指定）
+        """
+        self.box_width = width
+        self.width = width - 2 * FRAME_INSET_X
+        self.height = height - 2 * FRAME_INSET_Y
+        self.measurer = measurer
+        self.code_measurer = code_measurer or get_measurer(None, True)
+        self.text = text or TextFlattener()
+    
+    def _paragraph_height(self, text: str, size: float, width: float,
+                          measurer: TextMeasurer, scale: float) -> float:
+        """段落1つ分の高さを計算する
+        
+        Args:
+            text: 段落のテキスト
+            size: 縮小前のフォントサイズ（ポイント）
+            width: 段落の幅（ポイント）
+            measurer: 計測器
+            scale: フォントの縮小率
+        
+        Returns:
+            float: 高さ（ポイント）
+        """
+        # 文字幅キャッシュが縮小率ごとに増えすぎないよう0.5pt単位に丸める
+        size = round(size * scale * 2) / 2
+        lines = measurer.count_lines(text, size, width)
+        return lines * size * LINE_SPACING
+    
+    def _list_height(self, node: Dict[str, Any], scale: float) -> float:
+        """リスト全体（ネストを含む）の高さを計算する
+        
+        Args:
+            node: リストノード
+            scale: フォントの縮小率
+        
+        Returns:
+            float: 高さ（ポイント）
+        """
+        height = 0.0
+        stack = [(node, node.get("attrs", {}).get("depth", 0))]
+        
+        while stack:
+            list_node, depth = stack.pop()
+            margin, size = list_item_geometry(depth)
+            width = self.width - margin
+            
+            for item in list_node.get("children", []):
+                text = self.text(item)
+                if text.strip():
+                    height += self._paragraph_height(text, size, width, self.measurer, scale)
+                    height += LIST_ITEM_SPACE_AFTER * scale
+                for child in item.get("children", []):
+                    if child.get("type") == "list":
+                        stack.append((child, depth + 1))
+                        height += NESTED_LIST_SPACE_AFTER * scale
+        
+        return height
+    
+    def table_metrics(self, node: Dict[str, Any], scale: float = 1.0) -> Tuple[List[float], List[float]]:
+        """表の列幅と行の高さを計算する
+        
+        列幅は各列の最も長いセルの幅に比例して配分する。
+        
+        Args:
+            node: 表ノード
+            scale: フォントの縮小率
+        
+        Returns:
+            Tuple[List[float], List[float]]: 列幅と行の高さ（ポイント）
+        """
+        rows = [[self.text(cell) for cell in row] for row in table_rows(node)]
+        columns = max((len(row) for row in rows), default=0)
+        if not columns:
+            return [], []
+        
+        size = round(TABLE_FONT_SIZE * scale * 2) / 2
+        natural = [TABLE_MIN_COLUMN_WIDTH] * columns
+        for row in rows:
+            for index, text in enumerate(row):
+                width = self.measurer.text_width(text, size) + 2 * FRAME_INSET_X
+                if width > natural[index]:
+                    natural[index] = width
+        total = sum(natural)
+        column_widths = [self.box_width * width / total for width in natural]
+        
+        line_height = size * LINE_SPACING
+        row_heights = []
+        for row in rows:
+            lines = max((self.measurer.count_lines(text, size, column_widths[index] - 2 * FRAME_INSET_X)
+                         for index, text in enumerate(row)), default=1)
+            row_heights.append(lines * line_height + 2 * FRAME_INSET_Y)
+        
+        return column_widths, row_heights
+    
+    def node_height(self, node: Dict[str, Any], scale: float = 1.0) -> float:
+        """ASTノードを描画したときの高さを計算する
+        
+        Args:
+            node: ASTノード
+            scale: フォントの縮小率
+        
+        Returns:
+            float: 高さ（ポイント）
+        """
+        node_type = node.get("type", "")
+        empty_line = BODY_FONT_SIZE * LINE_SPACING
+        
+        if node_type == "blank_line":
+            return (empty_line + 8) * scale
+        
+        if node_type == "paragraph":
+            return (self._paragraph_height(self.text(node), BODY_FONT_SIZE, self.width,
+                                           self.measurer, scale)
+                    + 12 * scale)
+        
+        if node_type == "heading":
+            size = HEADING_FONT_SIZES.get(node.get("attrs", {}).get("level", 2), 28)
+            return (self._paragraph_height(self.text(node), size, self.width,
+                                           self.measurer, scale)
+                    + 24 * scale)
+        
+        if node_type == "list":
+            return self._list_height(node, scale) + (LIST_SPACE_BEFORE + LIST_SPACE_AFTER) * scale
+        
+        if node_type == "block_code":
+            text = node.get("raw", "").rstrip("\n")
+            if node.get("attrs", {}).get("info"):
+                text = f"{node['attrs']['info']}:\n{text}"
+            return (self._paragraph_height(text, CODE_FONT_SIZE, self.width,
+                                           self.code_measurer, scale)
+                    + 24 * scale)
+        
+        if node_type == "table":
+            _, row_heights = self.table_metrics(node, scale)
+            return sum(row_heights) + TABLE_SPACE_AFTER * scale
+        
+        return 0.0
+    
+    def content_height(self, nodes: List[Dict[str, Any]], scale: float = 1.0) -> float:
+        """ノード列全体の高さを計算する
+        
+        Args:
+            nodes: ASTノードのリスト
+            scale: フォントの縮小率
+        
+        Returns:
+            float: 高さ（ポイント）
+        """
+        return sum(self.node_height(node, scale) for node in nodes)
+    
+    def fit_scale(self, nodes: List[Dict[str, Any]], height: Optional[float] = None) -> float:
+        """ノード列がコンテンツ領域に収まるフォントの縮小率を求める
+        
+        Args:
+            nodes: ASTノードのリスト
+            height: 縮小率1.0での高さ（計算済みの場合）
+        
+        Returns:
+            float: 縮小率（収まらない場合はMIN_FONT_SCALE未満の値）
+        """
+        if height is None:
+            height = self.content_height(nodes)
+        if height <= self.height:
+            return 1.0
+        
+        # 折り返し位置が変わるため、縮小後の高さを再計算して確かめる
+        scale = self.height / height
+        for _ in range(8):
+            if scale < MIN_FONT_SCALE * 0.5:
+                break
+            if self.content_height(nodes, scale) <= self.height:
+                return round(scale, 3)
+            scale *= 0.95
+        return round(scale, 3)
+    
+    def _split_node(self, node: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """1ページに収まらないノードを分割する
+        
+        リストは項目単位、コードブロックは行単位、表は行単位（ヘッダー行は各ページで繰り返す）で
+        分割する。それ以外は分割しない。
+        
+        Args:
+            node: ASTノード
+        
+        Returns:
+            List[Dict[str, Any]]: 分割されたノードのリスト
+        """
+        node_type = node.get("type", "")
+        
+        if node_type == "list" and len(node.get("children", [])) > 1:
+            attrs = node.get("attrs", {})
+            start = attrs.get("start", 1)
+            overhead = self.node_height(dict(node, children=[]))
+            parts = []
+            items = []
+            height = overhead
+            for item in node["children"]:
+                item_height = self.node_height(dict(node, children=[item])) - overhead
+                if items and height + item_height > self.height:
+                    parts.append(dict(node, children=items, attrs=dict(attrs, start=start)))
+                    start += len(items)
+                    items = []
+                    height = overhead
+                items.append(item)
+                height += item_height
+            parts.append(dict(node, children=items, attrs=dict(attrs, start=start)))
+            return parts
+        
+        if node_type == "table":
+            head = [child for child in node.get("children", []) if child.get("type") == "table_head"]
+            body_rows = [row for child in node.get("children", []) if child.get("type") == "table_body"
+                         for row in child.get("children", [])]
+            _, row_heights = self.table_metrics(node)
+            head_height = sum(row_heights[:len(head)]) + TABLE_SPACE_AFTER
+            
+            parts = []
+            rows: List[Dict[str, Any]] = []
+            height = head_height
+            for row, row_height in zip(body_rows, row_heights[len(head):]):
+                if rows and height + row_height > self.height:
+                    parts.append(rows)
+                    rows = []
+                    height = head_height
+                rows.append(row)
+                height += row_height
+            parts.append(rows)
+            return [dict(node, children=head + [{"type": "table_body", "children": rows}])
+                    for rows in parts]
+        
+        if node_type == "block_code":
+            lines = node.get("raw", "").splitlines(keepends=True)
+            line_height = CODE_FONT_SIZE * LINE_SPACING
+            per_page = max(1, int((self.height - 24 - line_height) // line_height))
+            if len(lines) > per_page:
+                return [dict(node, raw="".join(lines[i:i + per_page]))
+                        for i in range(0, len(lines), per_page)]
+        
+        return [node]
+    
+    def paginate(self, nodes: List[Dict[str, Any]]) -> List[Tuple[List[Dict[str, Any]], float]]:
+        """ノード列をコンテンツ領域に収まるページに分ける
+        
+        縮小率がMIN_FONT_SCALE以上で収まる場合は1ページにまとめ、
+        そうでなければ縮小せずに収まる単位で続きのページに分割する。
+        
+        Args:
+            nodes: ASTノードのリスト
+        
+        Returns:
+            List[Tuple[List[Dict[str, Any]], float]]: ページごとのノードと縮小率
+        """
+        # 前のスライドのノードを保持し続けないようにする
+        self.text.clear()
+        heights = [self.node_height(node) for node in nodes]
+        total = sum(heights)
+        scale = self.fit_scale(nodes, total)
+        if scale >= MIN_FONT_SCALE:
+            return [(nodes, scale)]
+        
+        pages = []
+        page: List[Dict[str, Any]] = []
+        page_height = 0.0
+        
+        for node, height in zip(nodes, heights):
+            parts = self._split_node(node) if height > self.height else [node]
+            for part in parts:
+                part_height = height if len(parts) == 1 else self.node_height(part)
+                if page and page_height + part_height > self.height:
+                    # 空行だけのページは作らない
+                    if any(page_node.get("type") != "blank_line" for page_node in page):
+                        pages.append(page)
+                    page = []
+                    page_height = 0.0
+                # 続きのページの先頭の空行は不要
+                if not page and part.get("type") == "blank_line" and pages:
+                    continue
+                page.append(part)
+                page_height += part_height
+        
+        if page:
+            pages.append(page)
+        
+        logger.debug(f"コンテンツを{len(pages)}ページに分割しました")
+        return [(page_nodes, max(MIN_FONT_SCALE, self.fit_scale(page_nodes)))
+                for page_nodes in pages]
@@ -0,0 +1,180 @@
+"""
+md2pptx-builder - Per-stage memory report
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import platform
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# 段階ごとに報告する割り当て元（ファイルと行）の数
+MEMORY_REPORT_TOP_SITES = 10
+
+# レポートの形式を変えたら更新する
+MEMORY_REPORT_FORMAT_VERSION = 1
+
+# 割り当て元から除外するファイル（tracemalloc 自体に加えて、インポート機構）
+# スナップショットの filter_traces は割り当てごとに照合して遅いため、集計後の統計から除く
+_EXCLUDED_SITES = frozenset([
+    "<frozen importlib._bootstrap>",
+    "<frozen importlib._bootstrap_external>",
+    "<unknown>",
+])
+
+def current_rss() -> Optional[int]:
+    """このプロセスの現在の常駐メモリ（RSS）を返す
+    
+    Returns:
+        Optional[int]: バイト数（/proc のないプラットフォームではNone）
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+def max_rss(children: bool = False) -> Optional[int]:
+    """このプロセス（または終了した子プロセス）の常駐メモリの最大値を返す
+    
+    Args:
+        children: 並列処理のワーカーなど、終了した子プロセスの最大値を返すかどうか
+    
+    Returns:
+        Optional[int]: バイト数（resource モジュールのないプラットフォームではNone）
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # Linuxはキロバイト、macOSはバイト単位
+    return usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+
+class MemoryReport:
+    """変換の段階（分割・パース・構築・保存）ごとのメモリ使用量を記録する
+    
+    tracemalloc で段階中の割り当ての最大値と、段階の前後で増えた割り当ての多い
+    箇所を記録し、RSS の値も合わせて JSON で書き出す。tracemalloc は最初の段階の
+    開始時に読み込んで有効にし、close で元に戻す。並列処理のワーカープロセス内の割り当ては
+    tracemalloc では計測されないため、子プロセスの RSS の最大値だけを記録する。
+    """
+    
+    def __init__(self, top: int = MEMORY_REPORT_TOP_SITES):
+        """
+        Args:
+            top: 段階ごとに報告する割り当て元の数
+        """
+        self.top = top
+        self.stages: List[Dict[str, Any]] = []
+        self._started = False
+    
+    def __enter__(self) -> "MemoryReport":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        """このレポートが有効にした tracemalloc を停止する"""
+        if self._started:
+            import tracemalloc
+            tracemalloc.stop()
+            self._started = False
+    
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """段階のメモリ使用量を記録するコンテキストマネージャー
+        
+        Args:
+            name: 段階の名前（split, parse, build, save など）
+        """
+        import tracemalloc
+        
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started = True
+        
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        traced_before = tracemalloc.get_traced_memory()[0]
+        rss_before = current_rss()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            traced_after, peak = tracemalloc.get_traced_memory()
+            stats = [
+                stat for stat in tracemalloc.take_snapshot().compare_to(before, "lineno")
+                if stat.traceback[0].filename not in _EXCLUDED_SITES
+                and stat.traceback[0].filename != tracemalloc.__file__
+            ]
+            sites = [
+                {
+                    "file": stat.traceback[0].filename,
+                    "line": stat.traceback[0].lineno,
+                    "size_diff": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                    "size": stat.size,
+                }
+                for stat in stats[:self.top]
+                if stat.size_diff > 0
+            ]
+            self.stages.append({
+                "name": name,
+                "seconds": round(seconds, 6),
+                "traced_before": traced_before,
+                "traced_after": traced_after,
+                "traced_peak": peak,
+                "peak_increase": peak - traced_before,
+                "rss_before": rss_before,
+                "rss_after": current_rss(),
+                "max_rss": max_rss(),
+                "top_sites": sites,
+            })
+            logger.debug(f"メモリ使用量を記録しました: {name} (最大 {peak / 1024 / 1024:.1f} MB)")
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """レポートを JSON に変換できる辞書として返す
+        
+        Returns:
+            Dict[str, Any]: 段階ごとの記録と全体の最大値
+        """
+        return {
+            "format": MEMORY_REPORT_FORMAT_VERSION,
+            "python": platform.python_version(),
+            "platform": sys.platform,
+            "traced_peak": max((stage["traced_peak"] for stage in self.stages), default=0),
+            "max_rss": max_rss(),
+            "max_rss_children": max_rss(children=True),
+            "stages": self.stages,
+        }
+    
+    def write(self, path: Union[str, Path]) -> None:
+        """レポートを JSON ファイルに書き出す
+        
+        Args:
+            path: 出力先のパス
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        logger.info(f"メモリレポートを保存しました: {path}")
+
+def memory_stage(report: Optional[MemoryReport], name: str) -> ContextManager[None]:
+    """レポートがあれば段階を記録し、なければ何もしないコンテキストマネージャーを返す
+    
+    Args:
+        report: メモリレポート（Noneなら記録しない）
+        name: 段階の名前
+    
+    Returns:
+        ContextManager[None]: コンテキストマネージャー
+    """
+    return report.stage(name) if report is not None else nullcontext()
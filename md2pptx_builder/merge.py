@@ -0,0 +1,457 @@
+"""
+md2pptx-builder - Merge decks built from parts of a document
+"""
+
+import os
+import re
+import logging
+import posixpath
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple, Union
+
+from md2pptx_builder.package import (
+    CUSTOM_PROPERTIES_PART, RELATIONSHIP_RE, SLIDE_HASHES_PROPERTY, add_default_content_type, copy_raw,
+    get_custom_property, hash_member, parse_relationships, rels_path, set_custom_property, slide_part_names
+)
+
+logger = logging.getLogger(__name__)
+
+# テンプレートが同じことを確認するパートの接頭辞（レイアウト・マスター・テーマ）
+TEMPLATE_PART_PREFIXES = ("ppt/slideLayouts/", "ppt/slideMasters/", "ppt/theme/")
+
+SLIDE_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.slide+xml"
+SLIDE_RELATIONSHIP_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/slide"
+
+# python-pptxがスライドIDに使う最小値
+_FIRST_SLIDE_ID = 256
+
+# スライド番号（_add_slide_number がスライドの最後の図形として書く「番号/総数」）
+_SLIDE_NUMBER_RE = re.compile(rb"<a:t>(\d+)/(\d+)</a:t>")
+
+_TARGET_RE = re.compile(rb'Target="[^"]*"')
+_SLIDE_ID_LIST_RE = re.compile(rb"<p:sldIdLst>.*?</p:sldIdLst>|<p:sldIdLst/>", re.DOTALL)
+_SLIDE_SIZE_RE = re.compile(rb"<p:sldSz\s[^>]*>")
+_SLIDE_OVERRIDE_RE = re.compile(rb'<Override\s[^>]*PartName="/ppt/slides/slide\d+\.xml"[^>]*/>')
+_OVERRIDE_RE = re.compile(rb"<Override\s[^>]*/>")
+_PART_NAME_RE = re.compile(rb'PartName="([^"]+)"')
+_DEFAULT_CONTENT_TYPE_RE = re.compile(rb'<Default\s[^>]*Extension="([^"]+)"[^>]*ContentType="([^"]+)"')
+
+def _slide_number(zf: zipfile.ZipFile, part_name: str) -> Optional[Tuple[int, int]]:
+    """スライドに表示されている番号と総数を読み取る
+    
+    Args:
+        zf: PPTXのZIPファイル
+        part_name: スライドパート名
+    
+    Returns:
+        Optional[Tuple[int, int]]: (番号, 総数)（スライド番号がなければNone）
+    """
+    matches = _SLIDE_NUMBER_RE.findall(zf.read(part_name))
+    if not matches:
+        return None
+    number, total = matches[-1]
+    return int(number), int(total)
+
+def _renumber_slide(data: bytes, number: int, total: int) -> bytes:
+    """スライドの最後の「番号/総数」を書き換える
+    
+    Args:
+        data: スライドXML
+        number: 新しい番号
+        total: 新しい総数
+    
+    Returns:
+        bytes: 書き換えたスライドXML
+    """
+    match = None
+    for match in _SLIDE_NUMBER_RE.finditer(data):
+        pass
+    if match is None:
+        return data
+    return data[:match.start()] + b"<a:t>%d/%d</a:t>" % (number, total) + data[match.end():]
+
+def _template_signature(zf: zipfile.ZipFile) -> Tuple:
+    """テンプレートに由来するパートとスライドサイズの組を返す
+    
+    Args:
+        zf: PPTXのZIPファイル
+    
+    Returns:
+        Tuple: 比較用の値
+    """
+    parts = sorted(
+        (info.filename, info.file_size, info.CRC) for info in zf.infolist()
+        if info.filename.startswith(TEMPLATE_PART_PREFIXES)
+    )
+    size = _SLIDE_SIZE_RE.search(zf.read("ppt/presentation.xml"))
+    return tuple(parts), size.group(0) if size else None
+
+def _relative_target(source_part: str, target_part: str) -> str:
+    """リレーションシップの Target に書く相対パスを返す
+    
+    Args:
+        source_part: リレーションシップの元のパート名
+        target_part: 参照先のパート名
+    
+    Returns:
+        str: 相対パス
+    """
+    return posixpath.relpath(target_part, posixpath.dirname(source_part))
+
+class _MediaIndex:
+    """結合後のパッケージのメディアを内容で引く索引
+    
+    ZIPの中央ディレクトリにあるサイズとCRCが一致するものだけハッシュを計算する。
+    """
+    
+    def __init__(self):
+        # (サイズ, CRC) → [(パス, パート名, ハッシュ)]
+        self._entries: Dict[Tuple[int, int], List[List[Any]]] = {}
+        self.next_number = 1
+    
+    def add(self, path: str, info: zipfile.ZipInfo, name: str, digest: Optional[str] = None) -> None:
+        """結合後のパッケージに含まれるメディアを登録する
+        
+        Args:
+            path: 内容を読み出すPPTXファイル
+            info: そのファイル内のエントリ
+            name: 結合後のパート名
+            digest: 計算済みのハッシュ（なければ必要になったときに計算する）
+        """
+        self._entries.setdefault((info.file_size, info.CRC), []).append([path, info.filename, name, digest])
+        match = re.search(r"(\d+)\.\w+$", name)
+        if match:
+            self.next_number = max(self.next_number, int(match.group(1)) + 1)
+    
+    def find(self, zf: zipfile.ZipFile, path: str, info: zipfile.ZipInfo) -> Tuple[Optional[str], Optional[str]]:
+        """同じ内容のメディアを探す
+        
+        Args:
+            zf: 探すメディアを含むZIPファイル
+            path: そのファイルのパス
+            info: 探すメディアのエントリ
+        
+        Returns:
+            Tuple[Optional[str], Optional[str]]: 結合後のパート名（なければNone）と、計算したハッシュ
+        """
+        candidates = self._entries.get((info.file_size, info.CRC))
+        if not candidates:
+            return None, None
+        digest = hash_member(zf, info.filename)
+        for candidate in candidates:
+            candidate_path, member, name, candidate_digest = candidate
+            if candidate_digest is None:
+                if candidate_path == path:
+                    candidate_digest = hash_member(zf, member)
+                else:
+                    with zipfile.ZipFile(candidate_path) as other:
+                        candidate_digest = hash_member(other, member)
+                candidate[3] = candidate_digest
+            if candidate_digest == digest:
+                return name, digest
+        return None, digest
+
+def _plan_deck(zf: zipfile.ZipFile, path: str, media: _MediaIndex,
+               is_base: bool) -> Dict[str, Any]:
+    """1つのデッキのスライドとメディアを結合後のパート名に対応付ける
+    
+    Args:
+        zf: デッキのZIPファイル
+        path: デッキのパス
+        media: 結合後のメディアの索引
+        is_base: 最初のデッキ（テンプレートのパートをコピーする）かどうか
+    
+    Returns:
+        Dict[str, Any]: スライド、メディアの対応、追加する拡張子、先頭と末尾のスライド番号、ハッシュ
+    
+    Raises:
+        ValueError: スライドがメディアとテンプレート以外のパートを参照している場合
+    """
+    names = set(zf.namelist())
+    slides = slide_part_names(zf)
+    copies: Dict[str, str] = {}
+    content_types = dict(_DEFAULT_CONTENT_TYPE_RE.findall(zf.read("[Content_Types].xml")))
+    extensions: Dict[str, str] = {}
+    
+    for part_name in slides:
+        rels = rels_path(part_name)
+        for attributes in parse_relationships(zf.read(rels), part_name) if rels in names else []:
+            target = attributes.get("Target")
+            if target is None or attributes.get("TargetMode") == "External":
+                continue
+            if target.startswith(TEMPLATE_PART_PREFIXES):
+                continue
+            if not target.startswith("ppt/media/"):
+                raise ValueError(f"スライドが結合できないパートを参照しています: {path}: {target}")
+            if is_base or target in copies:
+                continue
+            info = zf.getinfo(target)
+            name, digest = media.find(zf, path, info)
+            if name is None:
+                extension = posixpath.splitext(target)[1].lstrip(".")
+                name = f"ppt/media/image{media.next_number}.{extension}"
+                media.add(path, info, name, digest)
+                content_type = content_types.get(extension.encode("ascii"))
+                if content_type:
+                    extensions[extension] = content_type.decode("ascii")
+            copies[target] = name
+    
+    numbers = [_slide_number(zf, slides[0]), _slide_number(zf, slides[-1])] if slides else [None, None]
+    custom = zf.read(CUSTOM_PROPERTIES_PART) if CUSTOM_PROPERTIES_PART in names else None
+    hashes = (get_custom_property(custom, SLIDE_HASHES_PROPERTY) or "").split(",")
+    return {
+        "path": path,
+        "slides": slides,
+        "copies": copies,
+        "extensions": extensions,
+        "first": numbers[0],
+        "last": numbers[1],
+        "hashes": hashes if len(hashes) == len(slides) and all(hashes) else None,
+    }
+
+def _is_document_range(decks: List[Dict[str, Any]]) -> bool:
+    """デッキが同じ文書のスライド範囲（--slides）から作られたものかどうか
+    
+    範囲から作ったデッキは文書全体での番号と総数を表示しているため、番号を変えずに結合する。
+    
+    Args:
+        decks: _plan_deck の結果のリスト
+    
+    Returns:
+        bool: すべてのデッキの総数が同じで、番号が前のデッキより大きい場合はTrue
+    """
+    previous = 0
+    totals = set()
+    for deck in decks:
+        if not deck["slides"]:
+            continue
+        if deck["first"] is None or deck["last"] is None:
+            return False
+        if deck["first"][0] <= previous:
+            return False
+        previous = deck["last"][0]
+        totals.update((deck["first"][1], deck["last"][1]))
+    return len(totals) <= 1
+
+def _rewrite_relationships(data: bytes, part_name: str, new_part_name: str, copies: Dict[str, str]) -> bytes:
+    """スライドのリレーションシップの参照先を結合後のパート名に書き換える
+    
+    Args:
+        data: リレーションシップパートの内容
+        part_name: 元のスライドパート名
+        new_part_name: 結合後のスライドパート名
+        copies: 元のメディアのパート名と結合後のパート名の対応
+    
+    Returns:
+        bytes: 書き換えたリレーションシップパート
+    """
+    def replace(match: "re.Match[bytes]") -> bytes:
+        element = match.group(0)
+        attributes = parse_relationships(element, part_name)[0]
+        target = attributes.get("Target")
+        if target is None or attributes.get("TargetMode") == "External":
+            return element
+        target = copies.get(target, target)
+        new_target = _relative_target(new_part_name, target).encode("utf-8")
+        return _TARGET_RE.sub(lambda _: b'Target="' + new_target + b'"', element, count=1)
+    
+    return RELATIONSHIP_RE.sub(replace, data)
+
+def _presentation_parts(base: zipfile.ZipFile, slide_count: int) -> Tuple[bytes, bytes]:
+    """スライドの一覧を書き換えた presentation.xml とそのリレーションシップを作る
+    
+    Args:
+        base: 最初のデッキのZIPファイル
+        slide_count: 結合後のスライド数
+    
+    Returns:
+        Tuple[bytes, bytes]: presentation.xml とリレーションシップパートの内容
+    """
+    rels_name = rels_path("ppt/presentation.xml")
+    rels = base.read(rels_name)
+    kept = []
+    ids = []
+    for match in RELATIONSHIP_RE.finditer(rels):
+        attributes = parse_relationships(match.group(0), "ppt/presentation.xml")[0]
+        if attributes.get("Type") == SLIDE_RELATIONSHIP_TYPE:
+            continue
+        kept.append(match.group(0))
+        id_match = re.fullmatch(r"rId(\d+)", attributes.get("Id", ""))
+        if id_match:
+            ids.append(int(id_match.group(1)))
+    
+    first_id = max(ids, default=0) + 1
+    slide_rels = [
+        f'<Relationship Id="rId{first_id + index}" Type="{SLIDE_RELATIONSHIP_TYPE}" '
+        f'Target="slides/slide{index + 1}.xml"/>'.encode("utf-8")
+        for index in range(slide_count)
+    ]
+    start = rels.index(b">", rels.index(b"<Relationships")) + 1
+    end = rels.rindex(b"</Relationships>")
+    rels = rels[:start] + b"".join(kept + slide_rels) + rels[end:]
+    
+    slide_ids = b"<p:sldIdLst>" + b"".join(
+        b'<p:sldId id="%d" r:id="rId%d"/>' % (_FIRST_SLIDE_ID + index, first_id + index)
+        for index in range(slide_count)
+    ) + b"</p:sldIdLst>"
+    presentation = base.read("ppt/presentation.xml")
+    if _SLIDE_ID_LIST_RE.search(presentation):
+        presentation = _SLIDE_ID_LIST_RE.sub(lambda _: slide_ids, presentation, count=1)
+    else:
+        position = presentation.index(b"<p:sldSz")
+        presentation = presentation[:position] + slide_ids + presentation[position:]
+    return presentation, rels
+
+def merge_presentations(input_paths: List[Union[str, Path]], output_path: Union[str, Path]) -> Dict[str, Any]:
+    """同じテンプレートで作成したデッキを順に結合する
+    
+    最初のデッキのテンプレート（マスター、レイアウト、テーマなど）を使い、各デッキの
+    スライドを結合後の番号のパート名でコピーする。スライドのXMLとメディアは展開・再圧縮
+    せずにそのままコピーし、同じ内容のメディアは1つにまとめる。presentation.xml、
+    リレーションシップ、[Content_Types].xml などの小さなパートだけを書き直すため、
+    デッキ全体をメモリに読み込まない。
+    
+    同じ文書のスライド範囲（--slides）から作ったデッキは文書全体での番号を表示しているので
+    そのまま使い、ページごとのハッシュもつなげて、結合後のファイルを --update で更新できる
+    ようにする。別々の文書から作ったデッキは、スライド番号を通し番号と結合後の総数に
+    書き換える（この場合はハッシュを保存しない）。
+    
+    Args:
+        input_paths: 結合するPPTXファイルのパス（この順に結合する）
+        output_path: 出力するPPTXファイルのパス
+    
+    Returns:
+        Dict[str, Any]: 結合したデッキ数、スライド数、コピーしたメディア数、まとめたメディア数、
+        スライド番号を書き換えたかどうか
+    
+    Raises:
+        ValueError: 入力がない、テンプレートが異なる、結合できないパートがある場合
+    """
+    paths = [str(path) for path in input_paths]
+    if not paths:
+        raise ValueError("結合するPPTXファイルを指定してください")
+    
+    # 1回目: スライドとメディアの対応を決める（スライドXMLは先頭と末尾だけを読む）
+    media = _MediaIndex()
+    decks = []
+    with zipfile.ZipFile(paths[0]) as base:
+        signature = _template_signature(base)
+        for info in base.infolist():
+            if info.filename.startswith("ppt/media/"):
+                media.add(paths[0], info, info.filename)
+        decks.append(_plan_deck(base, paths[0], media, True))
+    for path in paths[1:]:
+        with zipfile.ZipFile(path) as zf:
+            if _template_signature(zf) != signature:
+                raise ValueError(f"テンプレートが異なるため結合できません: {path}")
+            decks.append(_plan_deck(zf, path, media, False))
+    
+    document_range = _is_document_range(decks)
+    slide_count = sum(len(deck["slides"]) for deck in decks)
+    total = 0
+    if not document_range:
+        for deck in decks:
+            if deck["first"] is not None and deck["last"] is not None:
+                deck["offset"] = total - deck["first"][0] + 1
+                total += deck["last"][0] - deck["first"][0] + 1
+    hashes = None
+    if document_range and all(deck["hashes"] is not None for deck in decks):
+        hashes = [value for deck in decks for value in deck["hashes"]]
+    
+    # 2回目: 一時ファイルに書き込んでから置き換える
+    output_path = str(output_path)
+    directory = os.path.dirname(os.path.abspath(output_path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".pptx")
+    os.close(fd)
+    copied = 0
+    try:
+        with zipfile.ZipFile(temp_path, "w", zipfile.ZIP_DEFLATED) as target:
+            with zipfile.ZipFile(paths[0]) as base:
+                # python-pptx と同じくパート名の順に並べ直す
+                content_types = base.read("[Content_Types].xml")
+                overrides = [
+                    match.group(0) for match in _OVERRIDE_RE.finditer(content_types)
+                    if not _SLIDE_OVERRIDE_RE.fullmatch(match.group(0))
+                ]
+                overrides.extend(
+                    b'<Override PartName="/ppt/slides/slide%d.xml" ContentType="%s"/>'
+                    % (index + 1, SLIDE_CONTENT_TYPE.encode("ascii"))
+                    for index in range(slide_count)
+                )
+                overrides.sort(key=lambda element: _PART_NAME_RE.search(element).group(1))
+                content_types = _OVERRIDE_RE.sub(b"", content_types)
+                content_types = content_types.replace(b"</Types>", b"".join(overrides) + b"</Types>", 1)
+                for deck in decks:
+                    for extension, content_type in deck["extensions"].items():
+                        content_types = add_default_content_type(content_types, extension, content_type)
+                presentation, presentation_rels = _presentation_parts(base, slide_count)
+                
+                replace = {
+                    "[Content_Types].xml": content_types,
+                    "ppt/presentation.xml": presentation,
+                    rels_path("ppt/presentation.xml"): presentation_rels,
+                }
+                if CUSTOM_PROPERTIES_PART in base.namelist():
+                    # ハッシュがなければ空にし、次回の --update で全体を作り直させる
+                    replace[CUSTOM_PROPERTIES_PART] = set_custom_property(
+                        base.read(CUSTOM_PROPERTIES_PART), SLIDE_HASHES_PROPERTY, ",".join(hashes or [])
+                    )
+                
+                # テンプレートのパートとメディアは最初のデッキからそのままコピーする
+                skip = set(decks[0]["slides"]) | {rels_path(name) for name in decks[0]["slides"]}
+                for info in base.infolist():
+                    name = info.filename
+                    if name in skip:
+                        continue
+                    if name in replace:
+                        target.writestr(name, replace.pop(name))
+                    else:
+                        copy_raw(base, target, info)
+            
+            number = 0
+            for deck in decks:
+                with zipfile.ZipFile(deck["path"]) as zf:
+                    names = set(zf.namelist())
+                    for part_name in deck["copies"]:
+                        new_name = deck["copies"][part_name]
+                        if new_name.startswith("ppt/media/") and new_name not in target.NameToInfo:
+                            copy_raw(zf, target, zf.getinfo(part_name), new_name)
+                            copied += 1
+                    
+                    for part_name in deck["slides"]:
+                        number += 1
+                        new_name = f"ppt/slides/slide{number}.xml"
+                        if "offset" in deck:
+                            current = _slide_number(zf, part_name)
+                            data = zf.read(part_name)
+                            if current is not None:
+                                data = _renumber_slide(data, deck["offset"] + current[0], total)
+                            target.writestr(new_name, data)
+                        else:
+                            copy_raw(zf, target, zf.getinfo(part_name), new_name)
+                        
+                        rels = rels_path(part_name)
+                        if rels in names:
+                            target.writestr(rels_path(new_name), _rewrite_relationships(
+                                zf.read(rels), part_name, new_name, deck["copies"]
+                            ))
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    
+    deduplicated = sum(len(deck["copies"]) for deck in decks) - copied
+    logger.info(
+        f"{len(decks)}個のデッキの{slide_count}枚のスライドを結合しました: {output_path}"
+        f"（コピーしたメディア {copied}、まとめたメディア {deduplicated}）"
+    )
+    return {
+        "decks": len(decks),
+        "slides": slide_count,
+        "media_copied": copied,
+        "media_deduplicated": deduplicated,
+        "renumbered": not document_range,
+    }
@@ -0,0 +1,314 @@
+"""
+md2pptx-builder - Low-level access to the PPTX zip package
+"""
+
+import os
+import re
+import struct
+import hashlib
+import logging
+import posixpath
+import tempfile
+import zipfile
+from xml.etree import ElementTree
+from typing import List, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# ZIPのローカルファイルヘッダー（zipfileモジュールと同じ形式）
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+_DATA_DESCRIPTOR_FLAG = 0x08
+
+SLIDE_PART_PATTERN = re.compile(r"^ppt/slides/slide(\d+)\.xml$")
+
+# ハッシュ計算時の読み込み単位
+_CHUNK_SIZE = 1024 * 1024
+
+# リレーションシップパートの Relationship 要素
+RELATIONSHIP_RE = re.compile(rb"<Relationship\s[^>]*>")
+_ATTRIBUTE_RE = re.compile(rb'(\w+)="([^"]*)"')
+_SLIDE_ID_RE = re.compile(rb"<p:sldId\s[^>]*?r:id=\"([^\"]+)\"")
+
+CUSTOM_PROPERTIES_NAMESPACE = "http://schemas.openxmlformats.org/officeDocument/2006/custom-properties"
+VT_NAMESPACE = "http://schemas.openxmlformats.org/officeDocument/2006/docPropsVTypes"
+CUSTOM_PROPERTIES_PART = "docProps/custom.xml"
+
+# 出力ファイルに保存するページごとのハッシュのプロパティ名
+SLIDE_HASHES_PROPERTY = "md2pptx-slide-hashes"
+
+# 出力ファイルに保存する設定（テンプレート・画像・フォント・スライドサイズ）のハッシュのプロパティ名
+SETTINGS_FINGERPRINT_PROPERTY = "md2pptx-settings"
+
+# ユーザー定義プロパティの書式ID（PowerPointが使う既定値）
+_CUSTOM_PROPERTY_FMTID = "{D5CDD505-2E9C-101B-9397-08002B2CF9AE}"
+
+def rels_path(part_name: str) -> str:
+    """パートに対応するリレーションシップパートのパスを返す
+    
+    Args:
+        part_name: パート名（例: ppt/slides/slide1.xml）
+    
+    Returns:
+        str: リレーションシップパートのパス
+    """
+    directory, name = posixpath.split(part_name)
+    return posixpath.join(directory, "_rels", f"{name}.rels")
+
+def hash_member(zf: zipfile.ZipFile, name: str) -> str:
+    """ZIP内のパートの内容のハッシュを計算する
+    
+    Args:
+        zf: PPTXのZIPファイル
+        name: パート名
+    
+    Returns:
+        str: SHA-1のハッシュ値
+    """
+    digest = hashlib.sha1()
+    with zf.open(name) as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def parse_relationships(data: bytes, part_name: str) -> List[Dict[str, str]]:
+    """リレーションシップパートを読み込む
+    
+    Args:
+        data: リレーションシップパートの内容
+        part_name: リレーションシップの元のパート名
+    
+    Returns:
+        List[Dict[str, str]]: 属性の辞書のリスト（内部リンクの Target はパッケージ内のパート名に解決済み）
+    """
+    directory = posixpath.dirname(part_name)
+    relationships = []
+    for match in RELATIONSHIP_RE.finditer(data):
+        attributes = {key.decode(): value.decode("utf-8") for key, value in _ATTRIBUTE_RE.findall(match.group(0))}
+        target = attributes.get("Target")
+        if target is not None and attributes.get("TargetMode") != "External":
+            if target.startswith("/"):
+                attributes["Target"] = target[1:]
+            else:
+                attributes["Target"] = posixpath.normpath(posixpath.join(directory, target))
+        relationships.append(attributes)
+    return relationships
+
+def read_relationships(zf: zipfile.ZipFile, part_name: str) -> Dict[str, str]:
+    """パートの内部リレーションシップを読み込む
+    
+    Args:
+        zf: PPTXのZIPファイル
+        part_name: パート名
+    
+    Returns:
+        Dict[str, str]: リレーションシップIDと参照先パート名の対応
+    """
+    try:
+        data = zf.read(rels_path(part_name))
+    except KeyError:
+        return {}
+    
+    return {
+        attributes.get("Id", ""): attributes["Target"]
+        for attributes in parse_relationships(data, part_name)
+        if "Target" in attributes and attributes.get("TargetMode") != "External"
+    }
+
+def slide_part_names(zf: zipfile.ZipFile) -> List[str]:
+    """スライドパートを表示順に並べる
+    
+    presentation.xml のスライド一覧に従い、読み込めない場合はファイル名の番号順にする。
+    
+    Args:
+        zf: PPTXのZIPファイル
+    
+    Returns:
+        List[str]: スライドパート名のリスト
+    """
+    slide_parts = sorted(
+        (name for name in zf.namelist() if SLIDE_PART_PATTERN.match(name)),
+        key=lambda name: int(SLIDE_PART_PATTERN.match(name).group(1))
+    )
+    
+    try:
+        presentation = zf.read("ppt/presentation.xml")
+    except KeyError:
+        return slide_parts
+    
+    relationships = read_relationships(zf, "ppt/presentation.xml")
+    ordered = [relationships.get(rid.decode()) for rid in _SLIDE_ID_RE.findall(presentation)]
+    ordered = [name for name in ordered if name in slide_parts]
+    if len(ordered) != len(slide_parts):
+        return slide_parts
+    return ordered
+
+def referenced_parts(zf: zipfile.ZipFile, replace: Optional[Dict[str, bytes]] = None) -> Set[str]:
+    """パッケージ内のいずれかのリレーションシップから参照されているパートを列挙する
+    
+    Args:
+        zf: PPTXのZIPファイル
+        replace: 書き直す予定のエントリ（リレーションシップパートはこちらの内容を使う）
+    
+    Returns:
+        Set[str]: 参照されているパート名
+    """
+    replace = replace or {}
+    referenced = set()
+    for name in set(zf.namelist()) | set(replace):
+        if not name.endswith(".rels"):
+            continue
+        # ppt/slides/_rels/slide1.xml.rels → ppt/slides/slide1.xml
+        directory, rels_name = posixpath.split(name)
+        part_name = posixpath.join(posixpath.dirname(directory), rels_name[:-len(".rels")])
+        data = replace[name] if name in replace else zf.read(name)
+        referenced.update(
+            attributes["Target"] for attributes in parse_relationships(data, part_name)
+            if "Target" in attributes and attributes.get("TargetMode") != "External"
+        )
+    return referenced
+
+def add_default_content_type(data: bytes, extension: str, content_type: str) -> bytes:
+    """[Content_Types].xml に拡張子の既定のコンテンツタイプがなければ追加する
+    
+    Args:
+        data: [Content_Types].xml の内容
+        extension: 拡張子（ドットなし）
+        content_type: コンテンツタイプ
+    
+    Returns:
+        bytes: 更新した [Content_Types].xml の内容
+    """
+    if re.search(rb'<Default\s[^>]*Extension="%s"' % re.escape(extension.encode("ascii")), data, re.IGNORECASE):
+        return data
+    element = f'<Default Extension="{extension}" ContentType="{content_type}"/>'.encode("ascii")
+    return data.replace(b"</Types>", element + b"</Types>", 1)
+
+def get_custom_property(data: Optional[bytes], name: str) -> Optional[str]:
+    """ユーザー定義プロパティ（docProps/custom.xml）の値を取得する
+    
+    Args:
+        data: custom.xml の内容
+        name: プロパティ名
+    
+    Returns:
+        Optional[str]: 値（存在しなければNone）
+    """
+    if not data:
+        return None
+    try:
+        root = ElementTree.fromstring(data)
+    except ElementTree.ParseError:
+        return None
+    for prop in root.iter(f"{{{CUSTOM_PROPERTIES_NAMESPACE}}}property"):
+        if prop.get("name") == name:
+            value = next(iter(prop), None)
+            return value.text or "" if value is not None else None
+    return None
+
+def set_custom_property(data: Optional[bytes], name: str, value: str) -> bytes:
+    """ユーザー定義プロパティ（docProps/custom.xml）に文字列の値を設定する
+    
+    Args:
+        data: 既存の custom.xml の内容（なければNone）
+        name: プロパティ名
+        value: 値
+    
+    Returns:
+        bytes: 更新した custom.xml の内容
+    """
+    ElementTree.register_namespace("", CUSTOM_PROPERTIES_NAMESPACE)
+    ElementTree.register_namespace("vt", VT_NAMESPACE)
+    root = ElementTree.fromstring(data) if data else ElementTree.Element(f"{{{CUSTOM_PROPERTIES_NAMESPACE}}}Properties")
+    
+    properties = list(root.iter(f"{{{CUSTOM_PROPERTIES_NAMESPACE}}}property"))
+    prop = next((prop for prop in properties if prop.get("name") == name), None)
+    if prop is None:
+        # pidは2以上で一意にする
+        pid = max((int(prop.get("pid", "1")) for prop in properties), default=1) + 1
+        prop = ElementTree.SubElement(root, f"{{{CUSTOM_PROPERTIES_NAMESPACE}}}property", {
+            "fmtid": _CUSTOM_PROPERTY_FMTID, "pid": str(pid), "name": name
+        })
+    for child in list(prop):
+        prop.remove(child)
+    ElementTree.SubElement(prop, f"{{{VT_NAMESPACE}}}lpwstr").text = value
+    
+    return ElementTree.tostring(root, encoding="UTF-8", xml_declaration=True)
+
+def copy_raw(source: zipfile.ZipFile, target: zipfile.ZipFile, info: zipfile.ZipInfo,
+              name: Optional[str] = None) -> None:
+    """ZIPエントリを展開・再圧縮せずにそのままコピーする
+    
+    Args:
+        source: コピー元のZIPファイル
+        target: コピー先のZIPファイル（書き込みモード）
+        info: コピーするエントリ
+        name: コピー先のエントリ名（省略時は元と同じ）
+    """
+    fp = source.fp
+    fp.seek(info.header_offset)
+    header = _LOCAL_HEADER.unpack(fp.read(_LOCAL_HEADER.size))
+    if header[0] != _LOCAL_HEADER_SIGNATURE:
+        raise zipfile.BadZipFile(f"ローカルヘッダーが不正です: {info.filename}")
+    fp.seek(header[-2] + header[-1], os.SEEK_CUR)
+    data = fp.read(info.compress_size)
+    
+    copied = zipfile.ZipInfo(name or info.filename, info.date_time)
+    copied.compress_type = info.compress_type
+    copied.external_attr = info.external_attr
+    copied.create_system = info.create_system
+    copied.extra = info.extra
+    copied.CRC = info.CRC
+    copied.compress_size = info.compress_size
+    copied.file_size = info.file_size
+    # サイズとCRCはローカルヘッダーに書くため、データディスクリプタは使わない
+    copied.flag_bits = info.flag_bits & ~_DATA_DESCRIPTOR_FLAG
+    
+    copied.header_offset = target.fp.tell()
+    target.fp.write(copied.FileHeader())
+    target.fp.write(data)
+    target.filelist.append(copied)
+    target.NameToInfo[copied.filename] = copied
+    target.start_dir = target.fp.tell()
+
+def rewrite_package(source_path: str, target_path: str, replace: Dict[str, bytes],
+                    remove: Optional[Set[str]] = None) -> None:
+    """変更したエントリだけを書き直してパッケージを保存する
+    
+    変更のないエントリは圧縮済みのデータをそのままコピーする。書き込みは一時ファイルに
+    行い、最後に os.replace で置き換える（source_path と target_path は同じでもよい）。
+    
+    Args:
+        source_path: 元のPPTXファイルパス
+        target_path: 出力するPPTXファイルパス
+        replace: 置き換える（または追加する）エントリ名と内容
+        remove: 削除するエントリ名
+    """
+    remove = remove or set()
+    directory = os.path.dirname(os.path.abspath(target_path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".pptx")
+    os.close(fd)
+    
+    try:
+        with zipfile.ZipFile(source_path) as source, \
+             zipfile.ZipFile(temp_path, "w", zipfile.ZIP_DEFLATED) as target:
+            written = set()
+            for info in source.infolist():
+                name = info.filename
+                if name in remove or name in written:
+                    continue
+                if name in replace:
+                    target.writestr(name, replace[name])
+                else:
+                    copy_raw(source, target, info)
+                written.add(name)
+            for name, data in replace.items():
+                if name not in written:
+                    target.writestr(name, data)
+        os.replace(temp_path, target_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    
+    logger.debug(f"{len(replace)}個のエントリを書き直しました: {target_path}")
@@ -0,0 +1,171 @@
+"""
+md2pptx-builder - On-disk cache of parsed slides
+"""
+
+import gc
+import os
+import sys
+import marshal
+import hashlib
+import logging
+import tempfile
+from functools import lru_cache
+from importlib import metadata
+from typing import List, Dict, Any, Optional, Tuple
+
+from md2pptx_builder import __version__
+from md2pptx_builder.slide import SlideRecord
+
+logger = logging.getLogger(__name__)
+
+# キャッシュファイルの形式を変えたら更新する
+PARSE_CACHE_FORMAT_VERSION = 2
+
+# 入力ファイルの隣に置くキャッシュファイルの接尾辞
+PARSE_CACHE_SUFFIX = ".md2pptx-cache"
+
+def parse_cache_path(file_path: str) -> str:
+    """入力ファイルに対応するキャッシュファイルのパスを返す
+    
+    Args:
+        file_path: Markdownファイルパス
+    
+    Returns:
+        str: キャッシュファイルのパス（入力ファイルと同じディレクトリの隠しファイル）
+    """
+    directory, name = os.path.split(os.path.realpath(file_path))
+    return os.path.join(directory, f".{name}{PARSE_CACHE_SUFFIX}")
+
+@lru_cache(maxsize=None)
+def _mistune_version() -> str:
+    """mistuneをインポートせずにバージョンを取得する
+    
+    Returns:
+        str: mistuneのバージョン
+    """
+    try:
+        return metadata.version("mistune")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+def _cache_header(pagebreak: str, sources: List[Tuple[str, str]]) -> Dict[str, Any]:
+    """キャッシュの有効性を判定するヘッダーを作成する
+    
+    Args:
+        pagebreak: スライド区切り文字
+        sources: パースした全ファイルの (実パス, SHA-1) のリスト
+    
+    Returns:
+        Dict[str, Any]: ヘッダー
+    """
+    return {
+        "format": PARSE_CACHE_FORMAT_VERSION,
+        "md2pptx": __version__,
+        "mistune": _mistune_version(),
+        "python": "%d.%d" % sys.version_info[:2],
+        "pagebreak": pagebreak,
+        "sources": sources,
+    }
+
+def _file_digest(path: str) -> str:
+    """ファイルの内容のハッシュを計算する
+    
+    Args:
+        path: ファイルパス
+    
+    Returns:
+        str: SHA-1のハッシュ値
+    """
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def load_parse_cache(file_path: str, pagebreak: str) -> Optional[List[SlideRecord]]:
+    """有効なキャッシュがあればスライド情報のリストを読み込む
+    
+    入力ファイルとインクルードしたファイルの内容のハッシュ、mistuneとmd2pptx-builderの
+    バージョンがすべて一致する場合だけ有効とする。mistuneはインポートしない。
+    キャッシュファイルが第三者に置かれても任意のコードが実行されないよう、pickleではなく
+    marshal形式を使う。
+    
+    Args:
+        file_path: Markdownファイルパス
+        pagebreak: スライド区切り文字
+    
+    Returns:
+        Optional[List[SlideRecord]]: スライド情報のリスト（キャッシュが無効ならNone）
+    """
+    cache_path = parse_cache_path(file_path)
+    try:
+        with open(cache_path, "rb") as f:
+            header = marshal.load(f)
+            if not isinstance(header, dict) or not header.get("sources"):
+                return None
+            expected = _cache_header(pagebreak, header["sources"])
+            if header != expected or header["sources"][0][0] != os.path.realpath(file_path):
+                logger.debug(f"パースキャッシュのバージョンが一致しません: {cache_path}")
+                return None
+            for path, digest in header["sources"]:
+                if _file_digest(path) != digest:
+                    logger.debug(f"パースキャッシュ作成後にファイルが変更されています: {path}")
+                    return None
+            # 大量の小さなオブジェクトを作るため、読み込み中はGCを止める
+            gc_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                # ファイルのバイト列は共有し、スライドはその中の範囲として復元する
+                buffers, records = marshal.loads(f.read())
+                slides_data = [
+                    SlideRecord(title, content, index, total_slides, buffers[buffer], start, end)
+                    for title, content, index, total_slides, buffer, start, end in records
+                ]
+            finally:
+                if gc_enabled:
+                    gc.enable()
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError, ValueError, TypeError) as e:
+        logger.debug(f"パースキャッシュを読み込めません: {cache_path}, エラー: {e}")
+        return None
+    
+    logger.info(f"パースキャッシュを使用: {cache_path}")
+    return slides_data
+
+def save_parse_cache(file_path: str, pagebreak: str, sources: List[Tuple[str, str]],
+                     slides_data: List[SlideRecord]) -> None:
+    """スライド情報のリストをキャッシュファイルに保存する
+    
+    書き込めない場合は警告のみで処理を続ける。
+    
+    Args:
+        file_path: Markdownファイルパス
+        pagebreak: スライド区切り文字
+        sources: パースした全ファイルの (実パス, SHA-1) のリスト（先頭は入力ファイル）
+        slides_data: スライド情報のリスト
+    """
+    buffers: List[bytes] = []
+    buffer_numbers: Dict[int, int] = {}
+    records = []
+    for slide in slides_data:
+        buffer, start, end = slide.span
+        if id(buffer) not in buffer_numbers:
+            buffer_numbers[id(buffer)] = len(buffers)
+            buffers.append(buffer)
+        records.append((slide.title, slide.content, slide.index, slide.total_slides,
+                        buffer_numbers[id(buffer)], start, end))
+    
+    cache_path = parse_cache_path(file_path)
+    try:
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                marshal.dump(_cache_header(pagebreak, sources), f)
+                marshal.dump((buffers, records), f)
+            os.replace(temp_path, cache_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    except (OSError, ValueError) as e:
+        logger.warning(f"パースキャッシュを保存できません: {cache_path}, エラー: {e}")
+        return
+    
+    logger.debug(f"パースキャッシュを保存しました: {cache_path}")
@@ -2,62 +2,139 @@
 md2pptx-builder - Markdown parser
 """
 
-import re
+import os
+import mmap
+import hashlib
 import logging
-from typing import List, Dict, Any, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Tuple, Optional, Union
 import json
 
-import mistune
+from md2pptx_builder.utils import select_slide_indices
+from md2pptx_builder.scanner import split_source, resolve_include
+from md2pptx_builder.slide import SlideRecord
+from md2pptx_builder.fast_parser import PARSER_ENGINES, parse_subset
+from md2pptx_builder.parse_cache import load_parse_cache, save_parse_cache
+from md2pptx_builder.memory import MemoryReport, memory_stage
 
 logger = logging.getLogger(__name__)
 
+# このサイズ以上のファイルは読み込まずにメモリマップする
+MMAP_MIN_BYTES = 8 * 1024 * 1024
+
+# パースが必要なスライドがこの枚数以上のときは複数プロセスで並列にパースする
+PARALLEL_PARSE_MIN_SLIDES = 64
+
+# 並列パースで1つのプロセスに渡すスライド数
+PARSE_BATCH_SIZE = 32
+
+_worker_parser = None
+
+def _parse_slide_batch(pagebreak: str, engine: str,
+                       slide_texts: List[str]) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    """ワーカープロセスでスライドをまとめてパースする
+    
+    Args:
+        pagebreak: スライド区切り文字
+        engine: パーサーエンジン
+        slide_texts: スライドのMarkdownテキストのリスト
+    
+    Returns:
+        List[Tuple[str, List[Dict[str, Any]]]]: スライドごとのタイトルとコンテンツのAST
+    """
+    global _worker_parser
+    if _worker_parser is None or (_worker_parser.pagebreak, _worker_parser.engine) != (pagebreak, engine):
+        _worker_parser = MarkdownParser(pagebreak=pagebreak, engine=engine)
+    return [_worker_parser.get_slide_title(_worker_parser.parse_slide(text)) for text in slide_texts]
+
+def _slide_text(source: Dict[str, Any], span: Tuple[int, int]) -> str:
+    """キャッシュエントリのバイト列からスライドのテキストをデコードする
+    
+    Args:
+        source: キャッシュエントリ
+        span: スライドのバイト範囲
+    
+    Returns:
+        str: スライドのMarkdownテキスト
+    
+    Raises:
+        ValueError: UTF-8として不正なバイト列がある場合（ファイル先頭からのバイト位置を示す）
+    """
+    start, end = span
+    try:
+        return source["buffer"][start:end].decode("utf-8")
+    except UnicodeDecodeError as e:
+        raise ValueError(
+            f"UTF-8として不正なバイト列があります: {source['path'] or '入力'} "
+            f"(バイト位置 {start + e.start}: {e.reason})"
+        ) from e
+
 class MarkdownParser:
     """Markdownをパースし、スライドに分割するクラス"""
     
-    def __init__(self, pagebreak: str = "---"):
+    def __init__(self, pagebreak: str = "---", workers: Optional[int] = 1, engine: str = "mistune"):
         """
         Args:
             pagebreak: スライド区切り文字
+            workers: 並列パースのプロセス数（省略時の1なら並列化しない、NoneならCPU数）
+            engine: パーサーエンジン（PARSER_ENGINES のいずれか）
+        
+        Raises:
+            ValueError: 未知のパーサーエンジンを指定した場合
         """
+        if engine not in PARSER_ENGINES:
+            raise ValueError(f"未知のパーサーエンジンです: {engine}（{', '.join(PARSER_ENGINES)} のいずれか）")
         self.pagebreak = pagebreak
-        self.parser = mistune.create_markdown(renderer='ast')
+        self.workers = workers
+        self.engine = engine
+        self._parser = None
+        # ファイルごとの分割・パース結果（実パス → パス、更新時刻、ハッシュ、スライド）
+        self._source_cache: Dict[str, Dict[str, Any]] = {}
+    
+    @property
+    def parser(self):
+        """mistuneのパーサー（パースキャッシュが有効な場合にmistuneを読み込まないよう遅延生成する）"""
+        if self._parser is None:
+            import mistune
+            self._parser = mistune.create_markdown(renderer='ast', plugins=['table'])
+        return self._parser
     
     def split_to_slides(self, markdown_content: str) -> List[str]:
         """Markdownコンテンツをスライドごとに分割する
         
+        process_markdown_content と同じ規則で分割する。区切り文字か <!-- pagebreak --> だけの
+        行、およびインクルード指令の行で区切り、インクルード先のファイルは読み込まない。
+        
         Args:
             markdown_content: Markdownテキスト
-            
+        
         Returns:
             List[str]: スライドごとに分割されたMarkdownテキストのリスト
         """
-        # <!-- pagebreak --> 形式も対応
-        alt_pagebreak = "<!-- pagebreak -->"
-        
-        # 両方の区切り文字を統一形式に変換
-        normalized_content = markdown_content.replace(alt_pagebreak, self.pagebreak)
-        
-        # 区切り文字で分割
-        pattern = f"(?:^|\n){re.escape(self.pagebreak)}(?:\n|$)"
-        slides = re.split(pattern, normalized_content)
-        
-        # 空のスライドを除去
-        slides = [slide.strip() for slide in slides if slide.strip()]
-        
-        logger.info(f"{len(slides)}枚のスライドに分割しました")
+        buffer = markdown_content.encode("utf-8")
+        slides = []
+        for kind, value in self._split_source(buffer):
+            if kind == "slide":
+                start, end = value
+                slides.append(buffer[start:end].decode("utf-8"))
         return slides
     
     def parse_slide(self, slide_content: str) -> List[Dict[str, Any]]:
         """スライドのMarkdownをパースしてAST（抽象構文木）に変換する
         
+        engine が fast の場合は組み込みのパーサーを先に試し、扱わない構文を含む
+        スライドだけをmistuneでパースする。どちらでも同じ形のASTになる。
+        
         Args:
             slide_content: スライドのMarkdownテキスト
-            
+        
         Returns:
             List[Dict[str, Any]]: ASTノードのリスト
         """
         try:
-            ast = self.parser(slide_content)
+            ast = parse_subset(slide_content) if self.engine == "fast" else None
+            if ast is None:
+                ast = self.parser(slide_content)
             # デバッグ用：ASTログ
             if logger.isEnabledFor(logging.DEBUG):
                 logger.debug(f"ASTパース結果: {json.dumps(ast[:3], ensure_ascii=False)[:200]}...")
@@ -72,7 +149,7 @@ class MarkdownParser:
         
         Args:
             ast: スライドのAST
-            
+        
         Returns:
             Tuple[str, List[Dict[str, Any]]]: タイトルと残りのコンテンツのAST
         """
@@ -94,55 +171,282 @@ class MarkdownParser:
         
         return title, remaining_ast
     
-    def process_markdown_file(self, file_path: str) -> List[Dict[str, Any]]:
+    def process_markdown_file(self, file_path: str,
+                              slides: Optional[List[Tuple[int, Optional[int]]]] = None,
+                              cache: bool = False,
+                              memory_report: Optional[MemoryReport] = None) -> List[SlideRecord]:
         """Markdownファイルを処理し、スライド情報のリストを返す
         
+        インクルードされたファイルを含め、ファイルごとの分割・パース結果はキャッシュし、
+        変更されたファイルだけを再度パースする。cache を指定すると、スライド情報の
+        リストを入力ファイルの隣のキャッシュファイルにも保存し、次回以降の実行で再利用する。
+        
         Args:
             file_path: Markdownファイルパス
-            
+            slides: 処理するスライドの範囲（parse_slide_selection の結果、省略時はすべて）
+            cache: ディスク上のパースキャッシュを使うかどうか
+            memory_report: 分割（split）とパース（parse）のメモリ使用量を記録するレポート
+        
         Returns:
-            List[Dict[str, Any]]: スライド情報（タイトル、コンテンツのAST）のリスト
+            List[SlideRecord]: スライド情報（タイトル、コンテンツのAST）のリスト
         """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-            return self.process_markdown_content(content)
+            path = os.path.realpath(file_path)
+            
+            if cache:
+                with memory_stage(memory_report, "parse"):
+                    slides_data = load_parse_cache(path, self.pagebreak)
+                if slides_data is not None:
+                    if slides is None:
+                        return slides_data
+                    return [slides_data[index] for index in select_slide_indices(slides, len(slides_data))]
+            
+            sources = [path]
+            try:
+                with memory_stage(memory_report, "split"):
+                    slide_refs: List[Tuple[Dict[str, Any], int, Tuple[int, int]]] = []
+                    self._collect_slides(self._load_source(path), os.path.dirname(path), [path],
+                                         slide_refs, sources)
+                with memory_stage(memory_report, "parse"):
+                    slides_data = self._slide_records(slide_refs, slides)
+            finally:
+                # スライド情報は必要な範囲をコピーして持つため、メモリマップは開いたままにしない
+                self._release_buffers()
+            
+            # 一部のスライドだけを処理した場合は保存しない
+            if cache and slides is None:
+                digests = [(source_path, self._source_cache[source_path]["digest"]) for source_path in sources]
+                save_parse_cache(path, self.pagebreak, digests, slides_data)
             
+            return slides_data
+        
         except Exception as e:
             logger.error(f"Markdownファイル処理エラー: {e}")
             raise
     
-    def process_markdown_content(self, content: str) -> List[Dict[str, Any]]:
+    def process_markdown_content(self, content: str,
+                                 slides: Optional[List[Tuple[int, Optional[int]]]] = None,
+                                 base_dir: Optional[str] = None,
+                                 memory_report: Optional[MemoryReport] = None) -> List[SlideRecord]:
         """Markdownコンテンツを処理し、スライド情報のリストを返す
         
+        slides を指定した場合は、選択されたスライドだけをパースする。
+        インデックスとスライドの総数は文書全体での値になる。
+        
         Args:
             content: Markdownテキスト
-            
+            slides: 処理するスライドの範囲（parse_slide_selection の結果、省略時はすべて）
+            base_dir: インクルードの相対パスの基準ディレクトリ（省略時はカレントディレクトリ）
+            memory_report: 分割（split）とパース（parse）のメモリ使用量を記録するレポート
+        
         Returns:
-            List[Dict[str, Any]]: スライド情報（タイトル、コンテンツのAST）のリスト
+            List[SlideRecord]: スライド情報（タイトル、コンテンツのAST）のリスト
         """
-        slides = []
-        slide_texts = self.split_to_slides(content)
+        with memory_stage(memory_report, "split"):
+            buffer = content.encode("utf-8")
+            source = {"path": None, "buffer": buffer, "items": self._split_source(buffer), "parsed": {}}
+            slide_refs: List[Tuple[Dict[str, Any], int, Tuple[int, int]]] = []
+            self._collect_slides(source, base_dir or os.getcwd(), [], slide_refs)
+        with memory_stage(memory_report, "parse"):
+            return self._slide_records(slide_refs, slides)
+    
+    def _split_source(self, buffer: Union[bytes, mmap.mmap]) -> List[Tuple[str, Any]]:
+        """インクルード指令の位置で区切り、スライドに分割する（scanner.split_source を参照）
+        
+        Args:
+            buffer: Markdownのバイト列（UTF-8、mmapも可）
         
-        for index, slide_text in enumerate(slide_texts):
-            ast = self.parse_slide(slide_text)
+        Returns:
+            List[Tuple[str, Any]]: ("slide", (開始, 終了)) または ("include", パス) のリスト
+        """
+        items = split_source(buffer, self.pagebreak)
+        logger.info(f"{sum(kind == 'slide' for kind, _ in items)}枚のスライドに分割しました")
+        return items
+    
+    def _load_source(self, path: str) -> Dict[str, Any]:
+        """ファイルを読み込んで分割する（パス、更新時刻、ハッシュでキャッシュする）
+        
+        Args:
+            path: ファイルの実パス
+        
+        Returns:
+            Dict[str, Any]: 分割結果とパース済みスライドを持つキャッシュエントリ
+        """
+        stat = os.stat(path)
+        source = self._source_cache.get(path)
+        if source and source["mtime"] == stat.st_mtime_ns and source["size"] == stat.st_size:
+            if source["buffer"] is None:
+                # 前回の処理後に閉じたメモリマップを開き直す
+                source["buffer"], _ = self._read_buffer(path, stat.st_size)
+            return source
+        
+        buffer, digest = self._read_buffer(path, stat.st_size)
+        
+        if source and source["digest"] == digest:
+            # 内容が変わっていなければ更新時刻だけ更新する
+            source["mtime"] = stat.st_mtime_ns
+            source["size"] = stat.st_size
+            if source["buffer"] is None:
+                source["buffer"] = buffer
+            elif isinstance(buffer, mmap.mmap):
+                buffer.close()
+            return source
+        
+        if source and isinstance(source["buffer"], mmap.mmap):
+            source["buffer"].close()
+        source = {
+            "path": path,
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "digest": digest,
+            "buffer": buffer,
+            "items": self._split_source(buffer),
+            "parsed": {},
+        }
+        self._source_cache[path] = source
+        logger.debug(f"ファイルを分割しました: {path}")
+        return source
+    
+    @staticmethod
+    def _read_buffer(path: str, size: int) -> Tuple[Union[bytes, mmap.mmap], str]:
+        """ファイルの内容を取得する
+        
+        MMAP_MIN_BYTES 以上のファイルは読み込まずにメモリマップし、分割やデコードを
+        ファイル全体のコピーなしに始められるようにする。改行の正規化が必要なファイルだけは
+        テキストモードでの読み込みと同じく、正規化したバイト列をメモリ上に作る。
+        
+        Args:
+            path: ファイルの実パス
+            size: ファイルサイズ
+        
+        Returns:
+            Tuple[Union[bytes, mmap.mmap], str]: 改行を正規化した内容と、元の内容のSHA-1
+        """
+        with open(path, "rb") as f:
+            data = None
+            if size >= MMAP_MIN_BYTES:
+                try:
+                    data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except (OSError, ValueError) as e:
+                    logger.debug(f"メモリマップできないため読み込みます: {path}, エラー: {e}")
+            if data is None:
+                data = f.read()
+        
+        digest = hashlib.sha1(data).hexdigest()
+        if data.find(b"\r") != -1:
+            normalized = data[:].replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+            if isinstance(data, mmap.mmap):
+                data.close()
+            data = normalized
+        return data, digest
+    
+    def _release_buffers(self) -> None:
+        """メモリマップを閉じる（必要になったら _load_source で開き直す）"""
+        for source in self._source_cache.values():
+            if isinstance(source["buffer"], mmap.mmap):
+                source["buffer"].close()
+                source["buffer"] = None
+    
+    def _collect_slides(self, source: Dict[str, Any], base_dir: str, stack: List[str],
+                        slide_refs: List[Tuple[Dict[str, Any], int, Tuple[int, int]]],
+                        sources: Optional[List[str]] = None) -> None:
+        """インクルードを展開して、文書順にスライドを集める
+        
+        Args:
+            source: キャッシュエントリ
+            base_dir: インクルードの相対パスの基準ディレクトリ
+            stack: インクルード中のファイルの実パス（循環の検出用）
+            slide_refs: (キャッシュエントリ, ファイル内の番号, バイト範囲) を追加するリスト
+            sources: インクルードしたファイルの実パスを追加するリスト
+        """
+        for number, (kind, value) in enumerate(source["items"]):
+            if kind == "slide":
+                slide_refs.append((source, number, value))
+                continue
+            
+            path = resolve_include(base_dir, value, stack)
+            if sources is not None and path not in sources:
+                sources.append(path)
+            self._collect_slides(self._load_source(path), os.path.dirname(path), stack + [path],
+                                 slide_refs, sources)
+    
+    def _parse_pending(self, pending: List[Tuple[Dict[str, Any], int, Tuple[int, int]]]) -> None:
+        """未パースのスライドをパースしてキャッシュエントリに保存する
+        
+        Args:
+            pending: (キャッシュエントリ, ファイル内の番号, バイト範囲) のリスト
+        """
+        workers = self.workers or os.cpu_count() or 1
+        if workers > 1 and len(pending) >= PARALLEL_PARSE_MIN_SLIDES:
+            batches = [pending[i:i + PARSE_BATCH_SIZE] for i in range(0, len(pending), PARSE_BATCH_SIZE)]
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    results = executor.map(
+                        _parse_slide_batch,
+                        [self.pagebreak] * len(batches),
+                        [self.engine] * len(batches),
+                        [[_slide_text(source, span) for source, _, span in batch] for batch in batches]
+                    )
+                    for batch, parsed in zip(batches, results):
+                        for (source, number, _), result in zip(batch, parsed):
+                            source["parsed"][number] = result
+                logger.debug(f"{len(pending)}枚のスライドを並列にパースしました")
+                return
+            except Exception as e:
+                # プロセスを使えない環境ではこのプロセスでパースする
+                logger.warning(f"並列パースに失敗したため順にパースします: {e}")
+        
+        for source, number, span in pending:
+            if number in source["parsed"]:
+                continue
+            ast = self.parse_slide(_slide_text(source, span))
             # デバッグ用：ASTをログ出力
-            self.debug_ast(ast, f"スライド{index+1}")
-            title, content_ast = self.get_slide_title(ast)
+            self.debug_ast(ast, f"スライド{number + 1}")
+            source["parsed"][number] = self.get_slide_title(ast)
+    
+    def _slide_records(self, slide_refs: List[Tuple[Dict[str, Any], int, Tuple[int, int]]],
+                       slides: Optional[List[Tuple[int, Optional[int]]]]) -> List[SlideRecord]:
+        """必要なスライドだけをパースしてスライド情報を作る
+        
+        Args:
+            slide_refs: _collect_slides で集めた文書順のスライド
+            slides: 処理するスライドの範囲
+        
+        Returns:
+            List[SlideRecord]: スライド情報のリスト
+        """
+        total_slides = len(slide_refs)
+        if slides is None:
+            indices = range(total_slides)
+        else:
+            indices = select_slide_indices(slides, total_slides)
+            logger.info(f"{total_slides}枚中{len(indices)}枚のスライドを処理します")
+        
+        self._parse_pending([
+            slide_refs[index] for index in indices
+            if slide_refs[index][1] not in slide_refs[index][0]["parsed"]
+        ])
+        
+        slides_data = []
+        for index in indices:
+            source, number, (start, end) = slide_refs[index]
+            title, content_ast = source["parsed"][number]
             
             if not title:
                 title = f"スライド {index + 1}"
-                
-            slides.append({
-                "title": title,
-                "content": content_ast,
-                "index": index,
-                "raw_text": slide_text
-            })
-        
-        return slides
+            
+            buffer = source["buffer"]
+            if isinstance(buffer, mmap.mmap):
+                # メモリマップは処理後に閉じるため、このスライドの範囲だけをコピーする
+                buffer, start, end = buffer[start:end], 0, end - start
+            
+            # キャッシュされたASTのリストを呼び出し側が変更しても影響しないようにコピーする
+            slides_data.append(SlideRecord(
+                title, list(content_ast), index, total_slides, buffer, start, end
+            ))
         
+        return slides_data
+    
     def debug_ast(self, ast: List[Dict[str, Any]], prefix: str = ""):
         """ASTをデバッグのためにログ出力する
         
@@ -0,0 +1,187 @@
+"""
+md2pptx-builder - Incremental slide preview
+"""
+
+import logging
+from bisect import bisect_left, bisect_right
+from typing import List, Dict, Any, Tuple, Optional
+
+from md2pptx_builder.parser import MarkdownParser
+from md2pptx_builder.scanner import INCLUDE_PATTERN, split_segments, strip_span
+from md2pptx_builder.slide import SlideRecord
+
+logger = logging.getLogger(__name__)
+
+# 前回のテキストとの共通部分をまとめて比較するバイト数
+_COMPARE_BLOCK_SIZE = 64 * 1024
+
+def _common_prefix(old: bytes, new: bytes, limit: int) -> int:
+    """2つのバイト列の先頭の共通部分の長さを返す
+    
+    Args:
+        old: 前回のバイト列
+        new: 今回のバイト列
+        limit: 比較する最大の長さ
+    
+    Returns:
+        int: 共通部分のバイト数
+    """
+    length = 0
+    while length < limit:
+        size = min(_COMPARE_BLOCK_SIZE, limit - length)
+        if old[length:length + size] == new[length:length + size]:
+            length += size
+            continue
+        # 異なるバイトを含むブロックを二分探索で絞り込む
+        low, high = length, length + size
+        while high - low > 1:
+            middle = (low + high) // 2
+            if old[low:middle] == new[low:middle]:
+                low = middle
+            else:
+                high = middle
+        return low
+    return limit
+
+def _common_suffix(old: bytes, new: bytes, limit: int) -> int:
+    """2つのバイト列の末尾の共通部分の長さを返す
+    
+    Args:
+        old: 前回のバイト列
+        new: 今回のバイト列
+        limit: 比較する最大の長さ（先頭の共通部分と重ならないようにする）
+    
+    Returns:
+        int: 共通部分のバイト数
+    """
+    old_end, new_end = len(old), len(new)
+    length = 0
+    while length < limit:
+        size = min(_COMPARE_BLOCK_SIZE, limit - length)
+        if old[old_end - length - size:old_end - length] == new[new_end - length - size:new_end - length]:
+            length += size
+            continue
+        low, high = length, length + size
+        while high - low > 1:
+            middle = (low + high) // 2
+            if old[old_end - middle:old_end - low] == new[new_end - middle:new_end - low]:
+                low = middle
+            else:
+                high = middle
+        return low
+    return limit
+
+class IncrementalPreview:
+    """編集中のMarkdownのうち、変更されたスライドだけをパースし直すプレビュー
+    
+    前回のテキストと先頭・末尾の共通部分を比べて編集された範囲を求め、その範囲に
+    かかるスライドだけを区切り直してパースする。前後のスライドは前回のパース結果を
+    そのまま使うため、パースにかかる時間は文書の長さではなく編集の大きさで決まる。
+    結果は MarkdownParser.process_markdown_content と同じになる。インクルード指令を
+    含む場合は、インクルード先の変更を検出できないため毎回全体を処理する。
+    """
+    
+    def __init__(self, pagebreak: str = "---", engine: str = "mistune"):
+        """
+        Args:
+            pagebreak: スライド区切り文字
+            engine: パーサーエンジン（PARSER_ENGINES のいずれか）
+        """
+        self.parser = MarkdownParser(pagebreak=pagebreak, workers=1, engine=engine)
+        self.text = ""
+        self.slides: List[SlideRecord] = []
+        self._reset()
+    
+    def _reset(self) -> None:
+        """区切りとパース結果を捨て、次の更新で全体を処理させる"""
+        self._buffer = b""
+        # 区切り行の間の範囲（split_segments の結果）と、範囲ごとのパース結果
+        # （範囲の開始位置からの相対的なスライドの範囲、タイトル、AST。空の範囲はNone）
+        self._starts: List[int] = [0]
+        self._ends: List[int] = [0]
+        self._parsed: List[Optional[Tuple[int, int, str, List[Dict[str, Any]]]]] = [None]
+    
+    def _parse_segment(self, buffer: bytes, start: int, end: int) -> Optional[Tuple[int, int, str, List[Dict[str, Any]]]]:
+        """区切り行の間の範囲をパースする
+        
+        Args:
+            buffer: Markdownのバイト列
+            start: 範囲の開始バイト位置
+            end: 範囲の終了バイト位置
+        
+        Returns:
+            Optional[Tuple[int, int, str, List[Dict[str, Any]]]]: 相対的なスライドの範囲、タイトル、
+            タイトルを除いたAST（空白だけの範囲ならNone）
+        """
+        slide_start, slide_end = strip_span(buffer, start, end)
+        if slide_start >= slide_end:
+            return None
+        ast = self.parser.parse_slide(buffer[slide_start:slide_end].decode("utf-8"))
+        title, content_ast = self.parser.get_slide_title(ast)
+        return slide_start - start, slide_end - start, title, content_ast
+    
+    def update(self, text: str) -> List[int]:
+        """テキストの変更を反映する
+        
+        Args:
+            text: 編集後のMarkdownテキスト
+        
+        Returns:
+            List[int]: パースし直したスライドのインデックス（変更がなければ空）
+        """
+        if text == self.text:
+            return []
+        buffer = text.encode("utf-8")
+        if b"include:" in buffer and INCLUDE_PATTERN.search(buffer):
+            self.slides = self.parser.process_markdown_content(text)
+            self.text = text
+            self._reset()
+            return list(range(len(self.slides)))
+        
+        old = self._buffer
+        limit = min(len(old), len(buffer))
+        prefix = _common_prefix(old, buffer, limit)
+        suffix = _common_suffix(old, buffer, limit - prefix)
+        delta = len(buffer) - len(old)
+        starts, ends = self._starts, self._ends
+        
+        # 直前の区切り行が共通部分に収まる範囲から、直後の区切り行が共通部分に収まる範囲まで区切り直す
+        first = max(bisect_right(starts, prefix - 1) - 1, 0)
+        last = bisect_left(ends, len(old) - suffix)
+        while True:
+            if last + 1 == len(starts):
+                segments = split_segments(buffer, self.parser.pagebreak, starts[first])
+                break
+            window_end = starts[last + 1] + delta
+            segments = split_segments(buffer, self.parser.pagebreak, starts[first], window_end)
+            # 次の範囲の前の区切り行が同じ位置で見つかれば、それ以降の区切りは変わらない
+            if segments[-1] == (window_end, window_end):
+                segments.pop()
+                break
+            last += 1
+        
+        self._starts[first:] = [start for start, _ in segments] + [start + delta for start in starts[last + 1:]]
+        self._ends[first:] = [end for _, end in segments] + [end + delta for end in ends[last + 1:]]
+        self._parsed[first:last + 1] = [self._parse_segment(buffer, start, end) for start, end in segments]
+        self._buffer = buffer
+        self.text = text
+        
+        total_slides = sum(parsed is not None for parsed in self._parsed)
+        slides_data = []
+        changed = []
+        for number, (start, parsed) in enumerate(zip(self._starts, self._parsed)):
+            if parsed is None:
+                continue
+            index = len(slides_data)
+            relative_start, relative_end, title, content_ast = parsed
+            if first <= number < first + len(segments):
+                changed.append(index)
+            # キャッシュしたASTのリストを呼び出し側が変更しても影響しないようにコピーする
+            slides_data.append(SlideRecord(
+                title or f"スライド {index + 1}", list(content_ast), index, total_slides,
+                buffer, start + relative_start, start + relative_end
+            ))
+        self.slides = slides_data
+        
+        logger.debug(f"{total_slides}枚中{len(changed)}枚のスライドをパースし直しました")
+        return changed
@@ -0,0 +1,459 @@
+"""
+md2pptx-builder - Lightweight slide scanner
+"""
+
+import os
+import re
+import logging
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple, Union
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# 代替の区切り文字（区切り文字と同じく、この文字だけの行でスライドを区切る）
+ALT_PAGEBREAK = "<!-- pagebreak -->"
+
+# str.strip() が除去する空白文字のうち、UTF-8で複数バイトになるもの
+# （インポート時に全コードポイントを調べると遅いため、str.isspace() の結果を列挙しておく）
+_EXTRA_SPACES = tuple(char.encode("utf-8") for char in (
+    "\u0085", "\u00a0", "\u1680",
+    "\u2000", "\u2001", "\u2002", "\u2003", "\u2004", "\u2005",
+    "\u2006", "\u2007", "\u2008", "\u2009", "\u200a",
+    "\u2028", "\u2029", "\u202f", "\u205f", "\u3000",
+))
+
+# str.strip() が除去する1バイトの空白文字
+_ASCII_SPACES = frozenset(code for code in range(0x80) if chr(code).isspace())
+
+# インクルード指令（行全体が <!-- include: chapter.md --> の場合のみ）
+INCLUDE_PATTERN = re.compile(rb"^<!--[ \t\f\v]*include:[ \t\f\v]*(.+?)[ \t\f\v]*-->[ \t]*$", re.MULTILINE)
+
+# インクルード指令、またはコードブロックのフェンスになりうる行（インデント、フェンス、パス）
+_DIRECTIVE_PATTERN = re.compile(
+    rb"^(?:( *)(`{3,}|~{3,})|" + INCLUDE_PATTERN.pattern[1:] + rb")", re.MULTILINE
+)
+
+_FENCE_RE = re.compile(rb"^ {0,3}(`{3,}|~{3,})")
+_ATX_RE = re.compile(rb"^ {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$")
+_LIST_ITEM_RE = re.compile(rb"^[ \t]*(?:[-*+]|\d{1,9}[.)])(?:[ \t]|$)")
+_TABLE_DELIMITER_RE = re.compile(rb"^[ \t]*\|?[ \t]*:?-+:?[ \t]*(?:\|[ \t]*:?-+:?[ \t]*)+\|?[ \t]*$")
+_IMAGE_RE = re.compile(rb"!\[[^\]\n]*\]\([ \t]*(?:<([^>\n]+)>|([^\s)]+))")
+
+# マニフェストの形式を変えたら更新する
+MANIFEST_FORMAT_VERSION = 2
+
+# 描画コストの見積もりの重み（要素1つあたり、基準環境での描画時間のミリ秒の目安）
+# slide は背景・ロゴ・ページ番号の固定費、kilobytes は文字幅の計測の費用（タイトルは見出しに含む）。
+# 画像は代替テキストとして描画するため費用はない。絶対的な時間ではなく、スライドやデッキを
+# 比べる相対値として使う
+BUILD_COST_WEIGHTS = {
+    "slide": 2.0,
+    "kilobytes": 1.5,
+    "headings": 0.8,
+    "paragraphs": 0.5,
+    "list_items": 0.33,
+    "code_blocks": 0.0,
+    "code_lines": 0.8,
+    "tables": 0.5,
+    "table_rows": 0.15,
+    "images": 0.0,
+}
+
+@lru_cache(maxsize=8)
+def _pagebreak_patterns(pagebreak: str) -> Tuple["re.Pattern[bytes]", "re.Pattern[bytes]"]:
+    """スライド区切り行を検出する正規表現を生成する
+    
+    (?:^|\n) で始まるパターンは正規表現エンジンのリテラル検索が効かず遅いため、
+    先頭行の区切りと2行目以降の区切りを別のパターンにする。
+    
+    Args:
+        pagebreak: スライド区切り文字
+    
+    Returns:
+        Tuple[re.Pattern[bytes], re.Pattern[bytes]]: 先頭行用と2行目以降用の正規表現
+    """
+    markers = b"|".join(re.escape(marker.encode("utf-8")) for marker in (pagebreak, ALT_PAGEBREAK))
+    return (
+        re.compile(rb"(?:" + markers + rb")(?:\n|$)"),
+        re.compile(rb"\n(?:" + markers + rb")(?:\n|$)"),
+    )
+
+def strip_span(data: bytes, start: int, end: int) -> Tuple[int, int]:
+    """str.strip() と同じ規則で範囲の前後の空白を除いた範囲を返す
+    
+    Args:
+        data: Markdownのバイト列（mmapも可）
+        start: 開始バイト位置
+        end: 終了バイト位置
+    
+    Returns:
+        Tuple[int, int]: 空白を除いた範囲
+    """
+    # ASCIIの空白以外で始まる（終わる）場合は、多バイトの空白と照合せずに終える
+    while start < end:
+        byte = data[start]
+        if byte in _ASCII_SPACES:
+            start += 1
+            continue
+        if byte < 0x80:
+            break
+        for space in _EXTRA_SPACES:
+            if start + len(space) <= end and data[start:start + len(space)] == space:
+                start += len(space)
+                break
+        else:
+            break
+    
+    while end > start:
+        byte = data[end - 1]
+        if byte in _ASCII_SPACES:
+            end -= 1
+            continue
+        if byte < 0x80:
+            break
+        for space in _EXTRA_SPACES:
+            if end - len(space) >= start and data[end - len(space):end] == space:
+                end -= len(space)
+                break
+        else:
+            break
+    
+    return start, end
+
+def split_segments(data: bytes, pagebreak: str = "---", start: int = 0,
+                   end: Optional[int] = None) -> List[Tuple[int, int]]:
+    """スライド区切り行の間の範囲を求める
+    
+    前後の空白を除く前の範囲を返し、空の範囲も除外しない。区切り行はどの範囲にも
+    含まれないため、範囲 i の終了位置から範囲 i+1 の開始位置までが区切り行になる。
+    start は文書の先頭か区切り行の直後でなければならない。
+    
+    Args:
+        data: Markdownのバイト列（mmapも可）
+        pagebreak: スライド区切り文字
+        start: 分割する範囲の開始バイト位置
+        end: 分割する範囲の終了バイト位置（省略時は末尾）
+    
+    Returns:
+        List[Tuple[int, int]]: 区切り行の間の (開始, 終了) バイト位置のリスト
+    """
+    end = len(data) if end is None else end
+    segments = []
+    position = start
+    leading, pattern = _pagebreak_patterns(pagebreak)
+    
+    # 区切りの前の改行はデータの先頭でだけ省略できる
+    match = leading.match(data, start, end) if start == 0 else None
+    if match:
+        segments.append((0, 0))
+        position = match.end()
+    
+    for match in pattern.finditer(data, position, end):
+        segments.append((position, match.start()))
+        position = match.end()
+    segments.append((position, end))
+    
+    return segments
+
+def iter_slide_spans(data: bytes, pagebreak: str = "---", start: int = 0,
+                     end: Optional[int] = None) -> List[Tuple[int, int]]:
+    """スライドごとのバイト範囲を求める
+    
+    区切り文字か ALT_PAGEBREAK だけの行で分割し、前後の空白を除いて空のスライドは除外する。
+    インクルード指令での区切りは split_source で扱う。
+    
+    Args:
+        data: Markdownのバイト列（mmapも可）
+        pagebreak: スライド区切り文字
+        start: 分割する範囲の開始バイト位置
+        end: 分割する範囲の終了バイト位置（省略時は末尾）
+    
+    Returns:
+        List[Tuple[int, int]]: 空白を除いたスライドの (開始, 終了) バイト位置のリスト
+    """
+    spans = (strip_span(data, *segment) for segment in split_segments(data, pagebreak, start, end))
+    return [(span_start, span_end) for span_start, span_end in spans if span_start < span_end]
+
+def split_source(data: bytes, pagebreak: str = "---") -> List[Tuple[str, Any]]:
+    """インクルード指令の位置で区切り、スライドに分割する
+    
+    インクルード指令はスライドの区切りとしても扱う。コードブロック内の指令は無視する。
+    スライドのテキストはコピーせず、バイト列の中の範囲として返す。
+    
+    Args:
+        data: Markdownのバイト列（UTF-8、mmapも可）
+        pagebreak: スライド区切り文字
+    
+    Returns:
+        List[Tuple[str, Any]]: ("slide", (開始, 終了)) または ("include", パス) のリスト
+    """
+    includes = []
+    if data.find(b"include:") != -1:
+        fence = b""
+        for match in _DIRECTIVE_PATTERN.finditer(data):
+            indent, marker, include_path = match.groups()
+            if fence:
+                # 閉じフェンスはインデントによらず、開きフェンスと同じ文字が同じ数以上並ぶ行
+                if marker and marker.startswith(fence):
+                    fence = b""
+            elif marker:
+                if len(indent) <= 3:
+                    fence = marker
+            else:
+                includes.append((match.start(), match.end(), include_path.decode("utf-8")))
+    
+    items: List[Tuple[str, Any]] = []
+    position = 0
+    for start, end, include_path in includes:
+        items.extend(("slide", span) for span in iter_slide_spans(data, pagebreak, position, start))
+        items.append(("include", include_path))
+        position = end
+    items.extend(("slide", span) for span in iter_slide_spans(data, pagebreak, position))
+    return items
+
+def resolve_include(base_dir: str, include_path: str, stack: List[str]) -> str:
+    """インクルード先の実パスを求める
+    
+    Args:
+        base_dir: インクルードの相対パスの基準ディレクトリ
+        include_path: インクルード指令に書かれたパス
+        stack: インクルード中のファイルの実パス（循環の検出用）
+    
+    Returns:
+        str: インクルード先の実パス
+    
+    Raises:
+        ValueError: インクルードが循環している場合
+        FileNotFoundError: インクルード先のファイルがない場合
+    """
+    path = os.path.realpath(os.path.join(base_dir, include_path))
+    if path in stack:
+        chain = " -> ".join(stack[stack.index(path):] + [path])
+        raise ValueError(f"インクルードが循環しています: {chain}")
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"インクルードファイルが見つかりません: {include_path}")
+    return path
+
+def _scan_slide(data: bytes, start: int, end: int) -> Tuple[str, Dict[str, int], List[str]]:
+    """スライド1枚分の行を走査してタイトル、要素数、画像の参照を求める
+    
+    Args:
+        data: Markdownのバイト列
+        start: 開始バイト位置
+        end: 終了バイト位置
+    
+    Returns:
+        Tuple[str, Dict[str, int], List[str]]: タイトル（見つからなければ空文字）、要素数、
+        画像の参照先のリスト
+    """
+    counts = {
+        "headings": 0,
+        "paragraphs": 0,
+        "list_items": 0,
+        "code_blocks": 0,
+        "code_lines": 0,
+        "tables": 0,
+        "table_rows": 0,
+        "images": 0,
+    }
+    images = []
+    title = ""
+    fence = b""
+    in_paragraph = False
+    in_table = False
+    text = data[start:end]
+    # 画像の参照はまれなので、スライドに含まれる場合だけ行ごとに探す
+    has_images = b"![" in text
+    
+    for line in text.split(b"\n"):
+        line = line.rstrip(b"\r")
+        
+        # コードブロック内は閉じフェンスだけを探す
+        if fence:
+            if line.lstrip(b" ").startswith(fence):
+                fence = b""
+            else:
+                counts["code_lines"] += 1
+            continue
+        
+        if has_images and b"![" in line:
+            for match in _IMAGE_RE.finditer(line):
+                images.append((match.group(1) or match.group(2)).decode("utf-8", errors="replace"))
+        
+        fence_match = _FENCE_RE.match(line)
+        if fence_match:
+            fence = fence_match.group(1)
+            counts["code_blocks"] += 1
+            in_paragraph = in_table = False
+            continue
+        
+        if not line.strip():
+            in_paragraph = in_table = False
+            continue
+        
+        heading_match = _ATX_RE.match(line)
+        if heading_match:
+            counts["headings"] += 1
+            if not title and len(heading_match.group(1)) == 1:
+                title = (heading_match.group(2) or b"").decode("utf-8", errors="replace").strip()
+            in_paragraph = in_table = False
+            continue
+        
+        if _LIST_ITEM_RE.match(line):
+            counts["list_items"] += 1
+            in_paragraph = in_table = False
+            continue
+        
+        if _TABLE_DELIMITER_RE.match(line) and in_paragraph:
+            # 直前の行はヘッダー行なので段落ではなく表として数え直す（空行までの行は表の行）
+            counts["paragraphs"] -= 1
+            counts["tables"] += 1
+            counts["table_rows"] += 1
+            in_paragraph = False
+            in_table = True
+            continue
+        
+        if in_table:
+            counts["table_rows"] += 1
+            continue
+        
+        if not in_paragraph:
+            counts["paragraphs"] += 1
+            in_paragraph = True
+    
+    counts["images"] = len(images)
+    return title, counts, images
+
+def estimate_build_cost(counts: Dict[str, int], size: int) -> float:
+    """スライドの要素数から描画コストを見積もる
+    
+    Args:
+        counts: _scan_slide が求めた要素数
+        size: スライドのバイト数
+    
+    Returns:
+        float: BUILD_COST_WEIGHTS による見積もり（基準環境でのミリ秒の目安）
+    """
+    cost = BUILD_COST_WEIGHTS["slide"] + BUILD_COST_WEIGHTS["kilobytes"] * size / 1024
+    for name, count in counts.items():
+        cost += BUILD_COST_WEIGHTS.get(name, 0.0) * count
+    return round(cost, 2)
+
+def _scan_source(data: bytes, source: Optional[str], pagebreak: str, base_dir: str,
+                 stack: List[str], manifest: List[Dict[str, Any]]) -> None:
+    """インクルードを展開して、文書順にスライドを走査する
+    
+    Args:
+        data: Markdownのバイト列
+        source: data のファイルの実パス（最上位の文書ならNone）
+        pagebreak: スライド区切り文字
+        base_dir: インクルードの相対パスの基準ディレクトリ
+        stack: インクルード中のファイルの実パス（循環の検出用）
+        manifest: スライド情報を追加するリスト
+    """
+    # パーサーと同じく改行を正規化してから区切る（バイト範囲は正規化後の位置になる）
+    if data.find(b"\r") != -1:
+        data = data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+    
+    for kind, value in split_source(data, pagebreak):
+        if kind == "include":
+            path = resolve_include(base_dir, value, stack)
+            with open(path, "rb") as f:
+                included = f.read()
+            _scan_source(included, path, pagebreak, os.path.dirname(path), stack + [path], manifest)
+            continue
+        
+        start, end = value
+        index = len(manifest)
+        title, counts, images = _scan_slide(data, start, end)
+        manifest.append({
+            "index": index,
+            "title": title or f"スライド {index + 1}",
+            "source": source,
+            "start": start,
+            "end": end,
+            "bytes": end - start,
+            "counts": counts,
+            "images": images,
+            "estimated_cost": estimate_build_cost(counts, end - start)
+        })
+
+def scan_markdown(data: Union[bytes, str], pagebreak: str = "---",
+                  base_dir: Optional[str] = None) -> List[Dict[str, Any]]:
+    """ASTを構築せずにスライドの一覧（マニフェスト）を作成する
+    
+    インクルード指令は MarkdownParser と同じく展開し、インクルードしたファイルの
+    スライドのバイト範囲はそのファイルの中での位置（source にファイルの実パス）になる。
+    CRLFとCRの改行はLFに正規化して走査するため、バイト範囲は正規化後の位置になる。
+    
+    Args:
+        data: Markdownのバイト列（またはテキスト）
+        pagebreak: スライド区切り文字
+        base_dir: インクルードの相対パスの基準ディレクトリ（省略時はカレントディレクトリ）
+    
+    Returns:
+        List[Dict[str, Any]]: スライド情報（インデックス、タイトル、ファイル、バイト範囲、
+        バイト数、要素数、画像の参照、描画コストの見積もり）のリスト
+    
+    Raises:
+        ValueError: インクルードが循環している場合
+        FileNotFoundError: インクルード先のファイルがない場合
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    
+    manifest: List[Dict[str, Any]] = []
+    _scan_source(data, None, pagebreak, base_dir or os.getcwd(), [], manifest)
+    
+    logger.debug(f"{len(manifest)}枚のスライドを走査しました")
+    return manifest
+
+def scan_markdown_file(file_path: Union[str, Path], pagebreak: str = "---") -> List[Dict[str, Any]]:
+    """Markdownファイルを走査してスライドの一覧（マニフェスト）を作成する
+    
+    Args:
+        file_path: Markdownファイルパス
+        pagebreak: スライド区切り文字
+    
+    Returns:
+        List[Dict[str, Any]]: スライド情報のリスト（このファイルのスライドの source はNone）
+    
+    Raises:
+        ValueError: インクルードが循環している場合
+        FileNotFoundError: インクルード先のファイルがない場合
+    """
+    path = os.path.realpath(file_path)
+    with open(path, "rb") as f:
+        data = f.read()
+    
+    manifest: List[Dict[str, Any]] = []
+    _scan_source(data, None, pagebreak, os.path.dirname(path), [path], manifest)
+    
+    logger.debug(f"{len(manifest)}枚のスライドを走査しました")
+    return manifest
+
+def manifest_document(manifest: List[Dict[str, Any]], total_slides: int,
+                      source: Optional[str] = None, pagebreak: str = "---") -> Dict[str, Any]:
+    """スケジューラーなどに渡すJSONのマニフェストを作成する
+    
+    Args:
+        manifest: scan_markdown の結果（選択したスライドだけでもよい）
+        total_slides: 文書全体のスライド数
+        source: 入力ファイルのパス（標準入力ならNone）
+        pagebreak: スライド区切り文字
+    
+    Returns:
+        Dict[str, Any]: スライドの一覧と合計値
+    """
+    return {
+        "format": MANIFEST_FORMAT_VERSION,
+        "source": source,
+        "pagebreak": pagebreak,
+        "total_slides": total_slides,
+        "slide_count": len(manifest),
+        "bytes": sum(entry["bytes"] for entry in manifest),
+        "images": sorted({image for entry in manifest for image in entry["images"]}),
+        "estimated_cost": round(sum(entry["estimated_cost"] for entry in manifest), 2),
+        "slides": manifest,
+    }
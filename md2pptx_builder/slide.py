@@ -0,0 +1,66 @@
+"""
+md2pptx-builder - Compact slide record
+"""
+
+from collections.abc import Mapping
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+class SlideRecord(Mapping):
+    """パース済みのスライド1枚分の情報
+    
+    これまでのスライド情報の辞書と同じキー（title、content、index、total_slides、raw_text）で
+    参照できる。Markdownのテキストはコピーせず、ファイル全体のバイト列の中の範囲として持ち、
+    raw_text を参照したときに初めてデコードする。
+    """
+    
+    __slots__ = ("title", "content", "index", "total_slides", "_buffer", "_start", "_end")
+    
+    _KEYS = ("title", "content", "index", "total_slides", "raw_text")
+    
+    def __init__(self, title: str, content: Optional[List[Dict[str, Any]]], index: int, total_slides: int,
+                 buffer: bytes, start: int, end: int):
+        """
+        Args:
+            title: スライドのタイトル
+            content: タイトルを除いたコンテンツのAST
+            index: 文書全体でのスライドのインデックス（0始まり）
+            total_slides: 文書全体でのスライドの総数
+            buffer: スライドを含むファイル全体のバイト列（UTF-8、改行は正規化済み）
+            start: スライドの開始バイト位置
+            end: スライドの終了バイト位置
+        """
+        self.title = title
+        self.content = content
+        self.index = index
+        self.total_slides = total_slides
+        self._buffer = buffer
+        self._start = start
+        self._end = end
+    
+    @property
+    def raw_text(self) -> str:
+        """スライドのMarkdownテキスト"""
+        return self._buffer[self._start:self._end].decode("utf-8")
+    
+    @property
+    def span(self) -> Tuple[bytes, int, int]:
+        """ファイル全体のバイト列と、その中のスライドの (開始, 終了) バイト位置"""
+        return self._buffer, self._start, self._end
+    
+    def drop_content(self) -> None:
+        """コンテンツのASTを解放する（スライドを作成した後に、タイトルとテキストだけを残す場合に使う）"""
+        self.content = None
+    
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._KEYS)
+    
+    def __len__(self) -> int:
+        return len(self._KEYS)
+    
+    def __repr__(self) -> str:
+        return f"SlideRecord(index={self.index}, title={self.title!r})"
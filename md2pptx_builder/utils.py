@@ -6,9 +6,9 @@ import os
 import tempfile
 import logging
 from pathlib import Path
-from typing import Optional, Union, Tuple
+from typing import List, Dict, Any, Optional, Union, Tuple
 
-from PIL import Image
+from md2pptx_builder.image_check import get_image_validator
 
 # ロギング設定
 logger = logging.getLogger(__name__)
@@ -35,21 +35,19 @@ def setup_logging(verbose: bool = False) -> None:
         logging.getLogger('mistune').setLevel(logging.WARNING)
         logging.getLogger('pptx').setLevel(logging.WARNING)
 
-def is_valid_image(file_path: Union[str, Path]) -> bool:
+def is_valid_image(file_path: Union[str, Path], cache_dir: Optional[str] = None) -> bool:
     """有効な画像ファイルかどうかを確認する
     
+    同じファイルの検証結果はキャッシュされるため、2回目以降はほぼ時間がかからない。
+    
     Args:
         file_path: 画像ファイルパス
+        cache_dir: 次回以降の実行のために検証結果を保存するディレクトリ
         
     Returns:
         bool: 有効な画像かどうか
     """
-    try:
-        Image.open(file_path).verify()
-        return True
-    except Exception as e:
-        logger.error(f"無効な画像ファイル: {file_path}, エラー: {e}")
-        return False
+    return get_image_validator(cache_dir).is_valid(file_path)
 
 def get_image_dimensions(file_path: Union[str, Path]) -> Tuple[int, int]:
     """画像のサイズを取得する
@@ -59,9 +57,12 @@ def get_image_dimensions(file_path: Union[str, Path]) -> Tuple[int, int]:
         
     Returns:
         Tuple[int, int]: 幅と高さのタプル
+    
+    Raises:
+        ValueError: 画像として読み込めない場合
     """
-    with Image.open(file_path) as img:
-        return img.size
+    info = get_image_validator().inspect(file_path)
+    return info.width, info.height
 
 def create_temp_file(content: str, suffix: str = '.md') -> str:
     """一時ファイルを作成する
@@ -118,4 +119,113 @@ def get_file_extension(file_path: Union[str, Path]) -> str:
     Returns:
         str: 拡張子（ドット付き）
     """
-    return os.path.splitext(str(file_path))[1].lower() 
\ No newline at end of file
+    return os.path.splitext(str(file_path))[1].lower()
+
+def parse_slide_selection(spec: str) -> List[Tuple[int, Optional[int]]]:
+    """スライドの選択指定（例: "300-320,5"）をパースする
+    
+    Args:
+        spec: カンマ区切りのスライド番号または範囲（1始まり、"10-" は10枚目以降）
+        
+    Returns:
+        List[Tuple[int, Optional[int]]]: (開始, 終了) の範囲のリスト（終了がNoneなら最後まで）
+        
+    Raises:
+        ValueError: 指定が不正な場合
+    """
+    ranges = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, separator, end = part.partition("-")
+        try:
+            first = int(start)
+            last = (int(end) if end.strip() else None) if separator else first
+        except ValueError:
+            raise ValueError(f"不正なスライド指定です: {part}")
+        if first < 1 or (last is not None and last < first):
+            raise ValueError(f"不正なスライド範囲です: {part}")
+        ranges.append((first, last))
+    
+    if not ranges:
+        raise ValueError(f"スライドが指定されていません: {spec!r}")
+    return ranges
+
+def select_slide_indices(ranges: List[Tuple[int, Optional[int]]], total: int) -> List[int]:
+    """スライドの選択範囲に含まれるスライドのインデックスを返す
+    
+    Args:
+        ranges: parse_slide_selection の結果
+        total: スライドの総数
+        
+    Returns:
+        List[int]: 0始まりのインデックス（文書順、重複なし、範囲外は除く）
+    """
+    selected = set()
+    for first, last in ranges:
+        last = total if last is None else min(last, total)
+        selected.update(range(first - 1, last))
+    return sorted(selected)
+
+def flatten_text(node: Dict[str, Any]) -> str:
+    """ノード配下のテキストを文書順に連結する（ネストされたリストは除く）
+    
+    再帰を使わずにスタックでたどるため、入れ子がどれだけ深くても扱える。
+    raw を持つノード（テキスト、コードスパン、コードブロック）はその値を使い、
+    それ以外は子ノードをたどる。
+    
+    Args:
+        node: ASTノード
+    
+    Returns:
+        str: テキスト
+    """
+    raw = node.get("raw")
+    if raw is not None:
+        return raw
+    
+    parts = []
+    stack = list(reversed(node.get("children") or ()))
+    while stack:
+        current = stack.pop()
+        raw = current.get("raw")
+        if raw is not None:
+            parts.append(raw)
+            continue
+        children = current.get("children")
+        if children and current.get("type") != "list":
+            stack.extend(reversed(children))
+    return "".join(parts)
+
+class TextFlattener:
+    """flatten_text の結果をノードごとに記憶する
+    
+    同じノードのテキストは高さの計算（縮小率の探索で何度も行う）と描画で繰り返し
+    必要になる。ASTはパース結果としてキャッシュやハッシュ計算に使われるため、
+    ノードには書き込まず、ノードのidをキーにした表に記憶する（表がノードへの参照を
+    持つため、記憶している間にidが再利用されることはない）。
+    """
+    
+    def __init__(self):
+        self._memo: Dict[int, Tuple[Dict[str, Any], str]] = {}
+    
+    def __call__(self, node: Dict[str, Any]) -> str:
+        """ノード配下のテキストを返す
+        
+        Args:
+            node: ASTノード
+        
+        Returns:
+            str: テキスト（ネストされたリストは除く）
+        """
+        entry = self._memo.get(id(node))
+        if entry is not None:
+            return entry[1]
+        text = flatten_text(node)
+        self._memo[id(node)] = (node, text)
+        return text
+    
+    def clear(self) -> None:
+        """記憶した結果を破棄する（スライドごとに呼び、ノードを保持し続けないようにする）"""
+        self._memo.clear()
@@ -0,0 +1,80 @@
+"""
+md2pptx-builder - PPTXサイズ解析のテスト
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+from PIL import Image
+
+from md2pptx_builder.parser import MarkdownParser
+from md2pptx_builder.builder import PPTXBuilder
+from md2pptx_builder.analyzer import analyze_pptx, format_report
+
+class TestAnalyzer(unittest.TestCase):
+    """PPTXサイズ解析のテスト"""
+    
+    def setUp(self):
+        """テスト開始前の準備"""
+        self.temp_dir = tempfile.mkdtemp()
+        background_path = os.path.join(self.temp_dir, "background.png")
+        logo_path = os.path.join(self.temp_dir, "logo.png")
+        self.output_path = os.path.join(self.temp_dir, "output.pptx")
+        Image.new("RGB", (160, 90), (220, 230, 255)).save(background_path)
+        Image.new("RGBA", (40, 20), (255, 0, 0, 255)).save(logo_path)
+        
+        items = "\n".join(f"- 項目{i}" for i in range(8))
+        markdown = f"# 短い\n\n段落です。\n\n---\n\n# 長い\n\n{items}\n\n**太字**と*斜体*の段落。"
+        slides_data = MarkdownParser().process_markdown_content(markdown)
+        builder = PPTXBuilder(background_path, logo_path)
+        builder.build_presentation(slides_data, self.output_path)
+    
+    def tearDown(self):
+        """テスト終了後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_slides(self):
+        """スライドごとのXMLサイズと要素数を報告すること"""
+        report = analyze_pptx(self.output_path)
+        
+        slides = report["slides"]
+        self.assertEqual([slide["number"] for slide in slides], [1, 2])
+        self.assertEqual(slides[0]["part"], "ppt/slides/slide1.xml")
+        self.assertGreater(slides[1]["xml_bytes"], slides[0]["xml_bytes"])
+        self.assertGreater(slides[1]["paragraphs"], slides[0]["paragraphs"])
+        self.assertGreaterEqual(slides[1]["runs"], 10)
+        # 背景、ロゴ、タイトル、本文、スライド番号
+        self.assertEqual(slides[0]["shapes"], 5)
+        self.assertEqual(len(slides[0]["media"]), 2)
+        
+        self.assertEqual(report["slide_xml_bytes"], sum(slide["xml_bytes"] for slide in slides))
+        self.assertEqual(len(report["media"]), 2)
+        self.assertTrue(all(part["slides"] == [1, 2] for part in report["media"]))
+        self.assertEqual(report["duplicates"], [])
+    
+    def test_duplicate_media(self):
+        """同じ内容のメディアを重複として検出すること"""
+        duplicated_path = os.path.join(self.temp_dir, "duplicated.pptx")
+        with zipfile.ZipFile(self.output_path) as source, \
+             zipfile.ZipFile(duplicated_path, "w", zipfile.ZIP_DEFLATED) as target:
+            for info in source.infolist():
+                target.writestr(info, source.read(info))
+            media = sorted(name for name in source.namelist() if name.startswith("ppt/media/"))
+            target.writestr("ppt/media/copy.png", source.read(media[0]))
+        
+        report = analyze_pptx(duplicated_path)
+        
+        self.assertEqual(len(report["duplicates"]), 1)
+        group = report["duplicates"][0]
+        self.assertEqual(group["parts"], sorted([media[0], "ppt/media/copy.png"]))
+        self.assertEqual(group["wasted_bytes"], group["bytes"])
+        
+        text = format_report(report, top=1)
+        self.assertIn("重複メディア: 1組", text)
+        self.assertIn("ppt/media/copy.png", text)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+md2pptx-builder - 前処理済み画像キャッシュのテスト
+"""
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+
+from PIL import Image
+
+from md2pptx_builder import assets
+from md2pptx_builder.assets import AssetStore
+
+def _prepare_in_worker(cache_dir: str, image_path: str) -> bytes:
+    """別プロセスから画像を前処理する"""
+    return AssetStore(cache_dir).prepare(image_path, 100, 50)
+
+class TestAssetStore(unittest.TestCase):
+    """前処理済み画像キャッシュのテスト"""
+    
+    def setUp(self):
+        """テスト開始前の準備"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.temp_dir, "cache")
+        self.image_path = os.path.join(self.temp_dir, "background.png")
+        Image.new("RGB", (800, 400), (10, 120, 200)).save(self.image_path)
+    
+    def tearDown(self):
+        """テスト終了後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_resize_and_reuse(self):
+        """縮小した画像を保存し、2回目以降はキャッシュを使うこと"""
+        store = AssetStore(self.cache_dir)
+        data = store.prepare(self.image_path, 100, 100)
+        
+        with Image.open(io.BytesIO(data)) as img:
+            self.assertEqual(img.size, (100, 50))
+        
+        # 別のインスタンス（別の実行）からも前処理なしで再利用できる
+        other = AssetStore(self.cache_dir)
+        with patch.object(assets, "_preprocess") as mock_preprocess:
+            self.assertEqual(other.prepare(self.image_path, 100, 100), data)
+            mock_preprocess.assert_not_called()
+        self.assertEqual((other.hits, other.misses), (1, 0))
+        
+        # 埋め込みサイズが違えば別のエントリになる
+        with Image.open(io.BytesIO(other.prepare(self.image_path, 40))) as img:
+            self.assertEqual(img.size, (40, 20))
+        self.assertEqual(other.misses, 1)
+    
+    def test_small_image_unchanged(self):
+        """縮小不要な画像は再圧縮しても小さくならなければそのまま使うこと"""
+        with open(self.image_path, "rb") as f:
+            original = f.read()
+        data = AssetStore(self.cache_dir).prepare(self.image_path, 2000, 2000)
+        
+        self.assertLessEqual(len(data), len(original))
+        with Image.open(io.BytesIO(data)) as img:
+            self.assertEqual(img.size, (800, 400))
+    
+    def test_invalid_image(self):
+        """無効な画像はValueErrorとなり、キャッシュされないこと"""
+        invalid_path = os.path.join(self.temp_dir, "invalid.png")
+        with open(invalid_path, "wb") as f:
+            f.write(b"not an image")
+        store = AssetStore(self.cache_dir)
+        
+        with self.assertRaises(ValueError):
+            store.prepare(invalid_path, 100)
+        self.assertEqual(store._entries(), [])
+    
+    def test_eviction(self):
+        """容量の上限を超えたら最終アクセスの古いものから削除すること"""
+        store = AssetStore(self.cache_dir)
+        first = store.prepare(self.image_path, 300)
+        second = store.prepare(self.image_path, 200)
+        oldest = min(store._entries(), key=lambda entry: entry[0])[2]
+        for _, _, path in store._entries():
+            os.utime(path, (1, 1 if path == oldest else 2))
+        
+        store.max_bytes = len(first) + len(second) - 1
+        self.assertEqual(store.evict(), 1)
+        remaining = store._entries()
+        self.assertEqual(len(remaining), 1)
+        self.assertNotEqual(remaining[0][2], oldest)
+    
+    def test_concurrent_processes(self):
+        """複数のプロセスから同時に使っても同じ内容が得られること"""
+        with ProcessPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(_prepare_in_worker, [self.cache_dir] * 8, [self.image_path] * 8))
+        
+        self.assertEqual(len(set(results)), 1)
+        entries = AssetStore(self.cache_dir)._entries()
+        self.assertEqual(len(entries), 1)
+        # 書き込み途中の一時ファイルが残らない
+        shard = entries[0][2].parent
+        self.assertEqual(os.listdir(shard), [entries[0][2].name])
+
+if __name__ == "__main__":
+    unittest.main()
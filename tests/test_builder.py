@@ -0,0 +1,335 @@
+"""
+md2pptx-builder - PowerPointビルダーのテスト
+"""
+
+import io
+import os
+import copy
+import shutil
+import tempfile
+import unittest
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+from pptx import Presentation
+from pptx.enum.text import MSO_AUTO_SIZE
+from pptx.oxml.ns import qn
+from pptx.util import Inches
+
+from md2pptx_builder.parser import MarkdownParser
+from md2pptx_builder.builder import PPTXBuilder
+
+class TestPPTXBuilder(unittest.TestCase):
+    """PowerPointビルダーのテスト"""
+    
+    def setUp(self):
+        """テスト開始前の準備"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.background_path = os.path.join(self.temp_dir, "background.png")
+        self.logo_path = os.path.join(self.temp_dir, "logo.png")
+        self.output_path = os.path.join(self.temp_dir, "output.pptx")
+        Image.new("RGB", (160, 90), (220, 230, 255)).save(self.background_path)
+        Image.new("RGBA", (40, 20), (255, 0, 0, 255)).save(self.logo_path)
+        
+        self.parser = MarkdownParser()
+    
+    def tearDown(self):
+        """テスト終了後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _build(self, markdown: str) -> Presentation:
+        """Markdownからプレゼンテーションを作成して読み込む"""
+        slides_data = self.parser.process_markdown_content(markdown)
+        builder = PPTXBuilder(self.background_path, self.logo_path)
+        builder.build_presentation(slides_data, self.output_path)
+        return Presentation(self.output_path)
+    
+    def _texts(self, slide) -> list:
+        """スライド内のテキストを図形の順に返す"""
+        return [shape.text_frame.text for shape in slide.shapes if shape.has_text_frame]
+    
+    def test_build_presentation(self):
+        """スライドごとにタイトル、コンテンツ、スライド番号が作成されること"""
+        prs = self._build("# スライド1\n\n段落です。\n\n---\n\n# スライド2\n\n- 項目")
+        
+        self.assertEqual(len(prs.slides), 2)
+        texts = self._texts(prs.slides[0])
+        self.assertEqual(texts[0], "スライド1")
+        self.assertIn("段落です。", texts[1])
+        self.assertEqual(texts[-1], "1/2")
+        self.assertEqual(self._texts(prs.slides[1])[-1], "2/2")
+    
+    def test_overflow_continuation_slides(self):
+        """収まらないコンテンツは続きのスライドに分割されること"""
+        items = "\n".join(f"- 項目{i}" for i in range(60))
+        prs = self._build(f"# 長いリスト\n\n{items}\n\n---\n\n# 次のスライド")
+        
+        self.assertGreater(len(prs.slides), 2)
+        slides = list(prs.slides)
+        titles = [self._texts(slide)[0] for slide in slides]
+        self.assertEqual(titles[0], "長いリスト")
+        self.assertTrue(all(title == "長いリスト（続き）" for title in titles[1:-1]))
+        self.assertEqual(titles[-1], "次のスライド")
+        
+        # 続きのスライドは元のスライドの番号を表示する
+        numbers = [self._texts(slide)[-1] for slide in slides]
+        self.assertTrue(all(number == "1/2" for number in numbers[:-1]))
+        self.assertEqual(numbers[-1], "2/2")
+        
+        # すべての項目が失われずに出力される
+        content = "\n".join(self._texts(slide)[1] for slide in slides[:-1])
+        for i in range(60):
+            self.assertIn(f"項目{i}\n", content + "\n")
+    
+    def test_font_scale(self):
+        """少しはみ出すコンテンツはフォントを縮小して1枚に収めること"""
+        items = "\n".join(f"- 項目{i}" for i in range(9))
+        prs = self._build(f"# タイトル\n\n段落です。\n\n{items}")
+        
+        self.assertEqual(len(prs.slides), 1)
+        content_box = prs.slides[0].shapes[3]
+        sizes = {run.font.size.pt for p in content_box.text_frame.paragraphs for run in p.runs}
+        self.assertTrue(all(size < 18 for size in sizes))
+        # PowerPointに自動調整させない
+        self.assertEqual(content_box.text_frame.auto_size, MSO_AUTO_SIZE.NONE)
+    
+    def test_no_spacer_paragraphs(self):
+        """余白は空の段落ではなく段落間隔で表し、同じ書式のランはまとめること"""
+        prs = self._build("# 余白\n\n**太字1`太字2`**と*斜体*\n\n- 項目1\n  - 子項目\n- 項目2\n\n最後の段落")
+        
+        paragraphs = prs.slides[0].shapes[3].text_frame.paragraphs
+        self.assertEqual([p.text for p in paragraphs], ["太字1太字2と斜体", "項目1", "子項目", "項目2", "最後の段落"])
+        self.assertEqual([run.text for run in paragraphs[0].runs], ["太字1太字2", "と", "斜体"])
+        
+        # 空行とリストの前後の余白は段落間隔になる
+        self.assertGreater(paragraphs[1].space_before.pt, 4)
+        self.assertEqual(paragraphs[2].space_after.pt, 9)
+        self.assertEqual(paragraphs[3].space_after.pt, 13)
+    
+    def test_selected_slides(self):
+        """一部のスライドだけを作成しても文書全体でのスライド番号を表示すること"""
+        markdown = "\n\n---\n\n".join(f"# スライド{i}" for i in range(1, 11))
+        slides_data = self.parser.process_markdown_content(markdown, slides=[(9, 10), (2, 2)])
+        builder = PPTXBuilder(self.background_path, self.logo_path)
+        builder.build_presentation(slides_data, self.output_path)
+        
+        slides = list(Presentation(self.output_path).slides)
+        self.assertEqual([self._texts(slide)[0] for slide in slides], ["スライド2", "スライド9", "スライド10"])
+        self.assertEqual([self._texts(slide)[-1] for slide in slides], ["2/10", "9/10", "10/10"])
+    
+    def test_asset_store(self):
+        """画像キャッシュを使うと縮小済みの画像が埋め込まれること"""
+        from md2pptx_builder.assets import AssetStore
+        
+        Image.new("RGB", (6000, 3000), (220, 230, 255)).save(self.background_path)
+        store = AssetStore(os.path.join(self.temp_dir, "cache"))
+        slides_data = self.parser.process_markdown_content("# スライド1\n\n---\n\n# スライド2")
+        for _ in range(2):
+            builder = PPTXBuilder(self.background_path, self.logo_path, asset_store=store)
+            builder.build_presentation(slides_data, self.output_path)
+        
+        self.assertEqual((store.hits, store.misses), (2, 2))
+        background = Presentation(self.output_path).slides[0].shapes[0]
+        self.assertEqual(background.width, builder.prs.slide_width)
+        self.assertEqual(background.image.size, (2400, 1200))
+    
+    def test_no_ast_dump_at_info(self):
+        """INFO レベルではコンテンツのASTをシリアライズしてログに出力しないこと"""
+        with self.assertLogs("md2pptx_builder.builder", level="INFO") as logs:
+            self._build("# スライド1\n\n段落です。")
+        self.assertFalse([line for line in logs.output if "コンテンツAST" in line])
+    
+    def test_update_presentation(self):
+        """更新モードでは変更されたスライドだけが書き直され、他のエントリはそのまま残ること"""
+        markdown = "\n\n---\n\n".join(f"# スライド{i}\n\n本文{i}" for i in range(1, 6))
+        PPTXBuilder(self.background_path, self.logo_path).build_presentation(
+            self.parser.process_markdown_content(markdown), self.output_path
+        )
+        with zipfile.ZipFile(self.output_path) as zf:
+            before = {info.filename: info.CRC for info in zf.infolist()}
+        
+        # 変更がなければファイルは書き換えない
+        mtime = os.stat(self.output_path).st_mtime_ns
+        builder = PPTXBuilder(self.background_path, self.logo_path)
+        self.assertTrue(builder.update_presentation(self.parser.process_markdown_content(markdown), self.output_path))
+        self.assertEqual(os.stat(self.output_path).st_mtime_ns, mtime)
+        
+        builder = PPTXBuilder(self.background_path, self.logo_path)
+        slides_data = self.parser.process_markdown_content(markdown.replace("本文3", "変更した本文"))
+        self.assertTrue(builder.update_presentation(slides_data, self.output_path))
+        
+        with zipfile.ZipFile(self.output_path) as zf:
+            after = {info.filename: info.CRC for info in zf.infolist()}
+        changed = sorted(name for name in after if before.get(name) != after[name])
+        self.assertEqual(changed, ["docProps/custom.xml", "ppt/slides/slide3.xml"])
+        
+        slides = list(Presentation(self.output_path).slides)
+        self.assertEqual(self._texts(slides[2])[1], "変更した本文")
+        self.assertEqual(self._texts(slides[3])[1], "本文4")
+        self.assertEqual(slides[2].shapes[0].image.blob, slides[0].shapes[0].image.blob)
+        
+        # スライドの枚数が変わった場合は全体を作成し直す
+        builder = PPTXBuilder(self.background_path, self.logo_path)
+        slides_data = self.parser.process_markdown_content(markdown + "\n\n---\n\n# スライド6")
+        self.assertFalse(builder.update_presentation(slides_data, self.output_path))
+        self.assertEqual(len(Presentation(self.output_path).slides), 6)
+    
+    def test_update_presentation_template_changed(self):
+        """テンプレートが変わった場合は、スライドサイズやレイアウトも含めて全体を作成し直すこと"""
+        wide_path = os.path.join(self.temp_dir, "wide.pptx")
+        narrow_path = os.path.join(self.temp_dir, "narrow.pptx")
+        wide = Presentation()
+        wide.slide_width = Inches(12)
+        wide.save(wide_path)
+        narrow = Presentation()
+        narrow.slide_layouts[6].name = "Narrow Blank"
+        narrow.save(narrow_path)
+        
+        slides_data = self.parser.process_markdown_content("# スライド1\n\n本文\n\n---\n\n# スライド2\n\n本文")
+        PPTXBuilder(self.background_path, self.logo_path, template_path=wide_path).build_presentation(
+            slides_data, self.output_path
+        )
+        builder = PPTXBuilder(self.background_path, self.logo_path, template_path=narrow_path)
+        self.assertFalse(builder.update_presentation(slides_data, self.output_path))
+        
+        prs = Presentation(self.output_path)
+        self.assertEqual(prs.slide_width, Inches(10))
+        self.assertEqual(prs.slides[0].shapes[0].width, Inches(10))
+        self.assertEqual(prs.slides[0].slide_layout.name, "Narrow Blank")
+        
+        # 同じテンプレートなら差分で更新する
+        builder = PPTXBuilder(self.background_path, self.logo_path, template_path=narrow_path)
+        self.assertTrue(builder.update_presentation(slides_data, self.output_path))
+    
+    def test_code_highlighting(self):
+        """コードブロックがハイライトされたランとして出力されること"""
+        prs = self._build('# コード\n\n```python\ndef f(x):\n    return "a" + x\n```')
+        
+        content_box = prs.slides[0].shapes[3]
+        runs = [run for p in content_box.text_frame.paragraphs for run in p.runs]
+        code_runs = [run for run in runs if run.font.name == "Consolas"]
+        
+        self.assertEqual("".join(run.text for run in code_runs), 'def f(x):\n    return "a" + x\n')
+        self.assertGreater(len(code_runs), 1)
+        self.assertTrue(any(run.font.color.type is not None for run in code_runs))
+    
+    def test_table(self):
+        """表がネイティブの表として前後のテキストの間に配置されること"""
+        prs = self._build(
+            "# 表\n\n前の段落\n\n| 名前 | 値 |\n|:--|--:|\n| a & b | 1 |\n| <c> | 2 |\n\n後の段落"
+        )
+        
+        shapes = list(prs.slides[0].shapes)
+        tables = [shape for shape in shapes if shape.has_table]
+        self.assertEqual(len(tables), 1)
+        
+        table = tables[0].table
+        cells = [[cell.text for cell in row.cells] for row in table.rows]
+        self.assertEqual(cells, [["名前", "値"], ["a & b", "1"], ["<c>", "2"]])
+        self.assertTrue(table.first_row)
+        
+        # 表の上下にテキストが配置される
+        texts = [shape for shape in shapes if shape.has_text_frame]
+        above = [shape for shape in texts if "前の段落" in shape.text_frame.text][0]
+        below = [shape for shape in texts if "後の段落" in shape.text_frame.text][0]
+        self.assertLessEqual(above.top + above.height, tables[0].top)
+        self.assertGreaterEqual(below.top, tables[0].top + tables[0].height)
+    
+    def test_list_bullets(self):
+        """リストの行頭記号と番号はPowerPointの箇条書きで表すこと"""
+        prs = self._build("# リスト\n\n3) 三\n   - 子\n4) \n5) 五")
+        
+        paragraphs = prs.slides[0].shapes[3].text_frame.paragraphs
+        self.assertEqual([p.text for p in paragraphs], ["三", "子", "五"])
+        self.assertEqual([p.level for p in paragraphs], [0, 1, 0])
+        numbers = [p._p.pPr.find(qn("a:buAutoNum")) for p in paragraphs]
+        self.assertEqual(numbers[0].get("type"), "arabicParenR")
+        self.assertEqual(numbers[0].get("startAt"), "3")
+        self.assertEqual(paragraphs[1]._p.pPr.find(qn("a:buChar")).get("char"), "•")
+        # 空の項目を飛ばした後は番号を明示する
+        self.assertEqual(numbers[2].get("startAt"), "5")
+    
+    def test_deep_list(self):
+        """深くネストされたリストも描画でき、ASTを書き換えないこと"""
+        # mistuneはネストを6段までしか解釈しないため、ASTを直接組み立てる
+        node = None
+        for depth in reversed(range(20)):
+            children = [{"type": "block_text", "children": [{"type": "text", "raw": f"深さ{depth}"}]}]
+            if node is not None:
+                children.append(node)
+            node = {"type": "list", "attrs": {"depth": depth, "ordered": depth % 2 == 1},
+                    "children": [{"type": "list_item", "children": children}]}
+        slides_data = [{"title": "深いリスト", "content": [node], "index": 0}]
+        original = copy.deepcopy(slides_data)
+        
+        xml = []
+        for _ in range(2):
+            builder = PPTXBuilder(self.background_path, self.logo_path)
+            builder.build_presentation(slides_data, self.output_path)
+            paragraphs = Presentation(self.output_path).slides[0].shapes[3].text_frame.paragraphs
+            xml.append([p._p.xml for p in paragraphs])
+            self.assertEqual([p.text for p in paragraphs], [f"深さ{depth}" for depth in range(20)])
+            self.assertEqual(paragraphs[-1].level, 8)
+        
+        self.assertEqual(xml[0], xml[1])
+        self.assertEqual(slides_data, original)
+    
+    def test_parallel_render(self):
+        """並列描画は順に描画した場合と同じパッケージになること"""
+        markdown = "\n\n---\n\n".join(
+            f"# スライド{i}\n\n段落 **太字**\n\n1. 項目\n   - 子項目" + ("\n\n| a | b |\n|---|---|\n| 1 | 2 |" if i % 3 == 0 else "")
+            for i in range(20)
+        )
+        slides_data = self.parser.process_markdown_content(markdown)
+        outputs = []
+        for workers in (1, 2):
+            path = os.path.join(self.temp_dir, f"workers{workers}.pptx")
+            PPTXBuilder(self.background_path, self.logo_path, workers=workers).build_presentation(slides_data, path)
+            with zipfile.ZipFile(path) as zf:
+                outputs.append({name: zf.read(name) for name in zf.namelist()})
+        
+        self.assertEqual(list(outputs[0]), list(outputs[1]))
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual(len(Presentation(path).slides), 20)
+    
+    def _entries(self, data: bytes) -> dict:
+        """PPTXのバイト列からエントリ名と内容の対応を返す"""
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            return {name: zf.read(name) for name in zf.namelist()}
+    
+    def test_reusable_builder(self):
+        """1つのビルダーで何度でも、複数のスレッドから同時にでも構築できること"""
+        documents = [
+            self.parser.process_markdown_content(f"# 文書{i}\n\n- 項目\n\n---\n\n# 2枚目\n\n| a |\n|---|\n| {i} |")
+            for i in range(3)
+        ]
+        builder = PPTXBuilder(self.background_path, self.logo_path)
+        expected = [self._entries(builder.build(slides_data)) for slides_data in documents]
+        
+        # 前回のビルドのスライドは残らない
+        self.assertEqual(self._entries(builder.build(documents[0])), expected[0])
+        self.assertEqual(len(Presentation(io.BytesIO(builder.build(documents[1]))).slides), 2)
+        
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(builder.build, documents * 4))
+        for index, data in enumerate(results):
+            self.assertEqual(self._entries(data), expected[index % len(documents)])
+    
+    def test_table_pagination(self):
+        """大きな表はヘッダー行を繰り返して続きのスライドに分割されること"""
+        rows = "\n".join(f"| 行{i} | {i} |" for i in range(200))
+        prs = self._build(f"# 大きな表\n\n| 名前 | 値 |\n|---|---|\n{rows}")
+        
+        self.assertGreater(len(prs.slides), 1)
+        body_rows = []
+        for slide in prs.slides:
+            table = [shape for shape in slide.shapes if shape.has_table][0].table
+            cells = [[cell.text for cell in row.cells] for row in table.rows]
+            self.assertEqual(cells[0], ["名前", "値"])
+            body_rows.extend(cells[1:])
+        
+        self.assertEqual(body_rows, [[f"行{i}", str(i)] for i in range(200)])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,13 +2,57 @@
 md2pptx-builder - CLIモジュールのテスト
 """
 
+import io
 import os
+import sys
+import json
+import shutil
+import subprocess
 import tempfile
 import unittest
+import zipfile
 from unittest.mock import patch, MagicMock
 from pathlib import Path
+from typing import Dict, Tuple
 
-from md2pptx_builder.cli import validate_inputs, run
+from md2pptx_builder.cli import validate_inputs, run, run_analyze
+
+# CLI起動時に読み込まれてはならない重い依存モジュール
+HEAVY_MODULES = ("pptx", "mistune", "PIL", "lxml")
+
+# CLIの起動時に md2pptx_builder のモジュール自体の実行にかけてよい時間の合計（マイクロ秒）
+# （依存モジュールの読み込みは含まない。現在は20ms程度で、インポート時の重い処理を検出するための上限）
+PACKAGE_IMPORT_SELF_TIME_LIMIT = 50000
+
+def _run_importtime(*args: str) -> Tuple[subprocess.CompletedProcess, Dict[str, int]]:
+    """python -X importtime でコマンドを実行し、モジュールごとのインポート時間を収集する
+    
+    Returns:
+        Tuple[subprocess.CompletedProcess, Dict[str, int]]: 実行結果と、モジュール名と
+        そのモジュール自体の実行時間（マイクロ秒、依存モジュールを除く）の対応
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        encoding="utf-8",
+        cwd=Path(__file__).parent.parent
+    )
+    self_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, _, name = line[len("import time:"):].split("|")
+        self_times[name.strip()] = int(self_time)
+    return result, self_times
+
+def _top_level_modules(self_times: Dict[str, int]) -> set:
+    """_run_importtime が集めたモジュール名をトップレベルのパッケージ名にまとめる"""
+    return {name.split(".")[0] for name in self_times}
+
+def _imported_modules(*args: str) -> set:
+    """python -X importtime の出力からインポートされたモジュール名を収集する"""
+    _, self_times = _run_importtime(*args)
+    return _top_level_modules(self_times)
 
 class TestCLI(unittest.TestCase):
     """CLIモジュールのテスト"""
@@ -38,8 +82,7 @@ class TestCLI(unittest.TestCase):
             if os.path.exists(temp_file.name):
                 os.unlink(temp_file.name)
         
-        if os.path.exists(self.output_file):
-            os.unlink(self.output_file)
+        shutil.rmtree(self.output_dir, ignore_errors=True)
     
     @patch("md2pptx_builder.cli.is_valid_image")
     def test_validate_inputs_valid(self, mock_is_valid_image):
@@ -123,7 +166,11 @@ class TestCLI(unittest.TestCase):
         # 検証
         self.assertEqual(result, 0, "成功した実行は0を返すべき")
         mock_validate.assert_called_once_with(args)
-        mock_parser_instance.process_markdown_file.assert_called_once_with(self.temp_md.name)
+        # --parse-workers を指定しなければ順にパースする
+        self.assertEqual(mock_parser.call_args.kwargs["workers"], 1)
+        mock_parser_instance.process_markdown_file.assert_called_once_with(
+            self.temp_md.name, slides=None, cache=False, memory_report=None
+        )
         mock_builder.assert_called_once()
         mock_builder_instance.build_presentation.assert_called_once()
     
@@ -154,17 +201,12 @@ class TestCLI(unittest.TestCase):
     
     @patch("md2pptx_builder.cli.validate_inputs")
     @patch("md2pptx_builder.cli.MarkdownParser")
-    def test_run_dry_run(self, mock_parser, mock_validate):
+    @patch("md2pptx_builder.cli.PPTXBuilder")
+    def test_run_dry_run(self, mock_builder, mock_parser, mock_validate):
         """ドライラン実行のテスト"""
         # モックの設定
         mock_validate.return_value = True
         
-        mock_parser_instance = MagicMock()
-        mock_parser_instance.process_markdown_file.return_value = [
-            {"title": "Slide 1", "content": [], "index": 0, "raw_text": "# Slide 1"}
-        ]
-        mock_parser.return_value = mock_parser_instance
-        
         # テスト用の引数
         args = {
             "input_md": self.temp_md.name,
@@ -183,8 +225,171 @@ class TestCLI(unittest.TestCase):
         # 検証
         self.assertEqual(result, 0, "ドライランは0を返すべき")
         mock_validate.assert_called_once_with(args)
-        mock_parser_instance.process_markdown_file.assert_called_once_with(self.temp_md.name)
-        # PPTXビルダーは呼ばれないはず
+        # ドライランではMarkdownパーサーもPPTXビルダーも使われないはず
+        mock_parser.assert_not_called()
+        mock_builder.assert_not_called()
+    
+    def test_stdin_stdout(self):
+        """- を指定すると標準入力から読み込み、標準出力にPPTXを書き出すこと"""
+        from PIL import Image
+        
+        Image.new("RGB", (16, 9)).save(self.temp_bg.name)
+        Image.new("RGB", (4, 2)).save(self.temp_logo.name)
+        
+        result = subprocess.run(
+            [sys.executable, "-m", "md2pptx_builder.cli", "-", "-b", self.temp_bg.name,
+             "-l", self.temp_logo.name, "-o", "-"],
+            input="# 標準入力\r\n\r\n---\r\n\r\n# 2枚目\r\n".encode("utf-8"),
+            capture_output=True,
+            cwd=self.output_dir
+        )
+        
+        self.assertEqual(result.returncode, 0, result.stderr.decode("utf-8", errors="replace"))
+        self.assertEqual(os.listdir(self.output_dir), [])
+        with zipfile.ZipFile(io.BytesIO(result.stdout)) as zf:
+            slides = sorted(name for name in zf.namelist() if name.startswith("ppt/slides/slide"))
+            self.assertEqual(len(slides), 2)
+            self.assertIn("標準入力", zf.read("ppt/slides/slide1.xml").decode("utf-8"))
+    
+    @patch("md2pptx_builder.cli.is_valid_image")
+    def test_validate_update_to_stdout(self, mock_is_valid_image):
+        """--update と標準出力は同時に指定できないこと"""
+        mock_is_valid_image.return_value = True
+        args = {
+            "input_md": "-",
+            "background": self.temp_bg.name,
+            "logo": self.temp_logo.name,
+            "template": None,
+            "output": "-",
+            "update": True,
+        }
+        self.assertFalse(validate_inputs(args))
+        args["update"] = False
+        self.assertTrue(validate_inputs(args))
+    
+    def test_run_analyze_missing_file(self):
+        """存在しないPPTXファイルの解析はエラーになること"""
+        args = {"input_pptx": "/nonexistent.pptx", "top": 10, "json": False, "verbose": False}
+        self.assertEqual(run_analyze(args), 1)
+
+
+class TestCLIImportTime(unittest.TestCase):
+    """CLI起動時のインポートの回帰テスト"""
+    
+    def setUp(self):
+        """テスト開始前の準備"""
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.work_dir = temp_dir.name
+    
+    def assertNoHeavyImports(self, modules: set) -> None:
+        heavy = sorted(set(HEAVY_MODULES) & modules)
+        self.assertEqual(heavy, [], f"重い依存が読み込まれている: {heavy}")
+    
+    def test_import_cli_module(self):
+        """CLIモジュールのインポートで重い依存が読み込まれないこと"""
+        modules = _imported_modules("-c", "import md2pptx_builder.cli")
+        self.assertIn("md2pptx_builder", modules)
+        self.assertNoHeavyImports(modules)
+    
+    def test_package_import_self_time(self):
+        """md2pptx_builder のモジュールがインポート時に重い処理をしないこと"""
+        # 計測のばらつきを抑えるため、3回のうち最も短い合計で判定する
+        totals = []
+        for _ in range(3):
+            _, self_times = _run_importtime("-c", "import md2pptx_builder.cli")
+            package_times = {
+                name: time for name, time in self_times.items()
+                if name.split(".")[0] == "md2pptx_builder"
+            }
+            self.assertIn("md2pptx_builder.cli", package_times)
+            totals.append((sum(package_times.values()), package_times))
+        total, package_times = min(totals, key=lambda item: item[0])
+        slowest = max(package_times, key=package_times.get)
+        self.assertLess(
+            total, PACKAGE_IMPORT_SELF_TIME_LIMIT,
+            f"インポート時の処理に時間がかかっている: {slowest} ({package_times[slowest]} us)"
+        )
+    
+    def test_help(self):
+        """--helpで重い依存が読み込まれないこと"""
+        modules = _imported_modules("-m", "md2pptx_builder.cli", "--help")
+        self.assertNoHeavyImports(modules)
+    
+    def test_dry_run(self):
+        """ドライランでmistuneとpython-pptxが読み込まれないこと"""
+        from PIL import Image
+        
+        md_path = os.path.join(self.work_dir, "input.md")
+        image_path = os.path.join(self.work_dir, "image.png")
+        with open(md_path, "w", encoding="utf-8") as f:
+            f.write("# Slide 1\n\nContent\n\n---\n\n# Slide 2\n")
+        Image.new("RGB", (4, 4)).save(image_path)
+        
+        modules = _imported_modules(
+            "-m", "md2pptx_builder.cli", md_path, "-b", image_path, "-l", image_path, "--dry-run"
+        )
+        self.assertIn("md2pptx_builder", modules)
+        for name in ("pptx", "mistune", "lxml"):
+            self.assertNotIn(name, modules)
+    
+    def test_manifest(self):
+        """マニフェストをJSONで標準出力に書き出し、mistuneとpython-pptxを読み込まないこと"""
+        from PIL import Image
+        
+        md_path = os.path.join(self.work_dir, "input.md")
+        image_path = os.path.join(self.work_dir, "image.png")
+        with open(md_path, "w", encoding="utf-8") as f:
+            f.write("# Slide 1\n\n![図](a.png)\n\n---\n\n# Slide 2\n\n---\n\n# Slide 3\n")
+        Image.new("RGB", (4, 4)).save(image_path)
+        
+        result, self_times = _run_importtime(
+            "-m", "md2pptx_builder.cli", md_path, "-b", image_path, "-l", image_path,
+            "--manifest", "-", "--slides", "2-3"
+        )
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+        manifest = json.loads(result.stdout)
+        self.assertEqual(manifest["total_slides"], 3)
+        self.assertEqual([slide["title"] for slide in manifest["slides"]], ["Slide 2", "Slide 3"])
+        self.assertEqual(manifest["images"], [])
+        
+        modules = _top_level_modules(self_times)
+        for name in ("pptx", "mistune", "lxml"):
+            self.assertNotIn(name, modules)
+    
+    def test_missing_input(self):
+        """入力ファイルが存在しない場合に重い依存が読み込まれないこと"""
+        modules = _imported_modules(
+            "-m", "md2pptx_builder.cli", "/nonexistent.md", "-b", "bg.png", "-l", "logo.png"
+        )
+        self.assertNoHeavyImports(modules)
+    
+    def test_analyze(self):
+        """analyzeサブコマンドはZIPを直接読み、重い依存を読み込まないこと"""
+        pptx_path = os.path.join(self.work_dir, "deck.pptx")
+        with zipfile.ZipFile(pptx_path, "w") as zf:
+            zf.writestr("ppt/slides/slide1.xml", "<p:sld><p:sp><a:p><a:r/></a:p></p:sp></p:sld>")
+        
+        result, self_times = _run_importtime("-m", "md2pptx_builder.cli", "analyze", pptx_path)
+        self.assertEqual(result.returncode, 0)
+        self.assertIn("図形 1, 段落 1, ラン 1", result.stdout)
+        self.assertNoHeavyImports(_top_level_modules(self_times))
+    
+    def test_merge(self):
+        """mergeサブコマンドはZIPを直接読み書きし、重い依存を読み込まないこと"""
+        pptx_path = os.path.join(self.work_dir, "deck.pptx")
+        output_path = os.path.join(self.work_dir, "merged.pptx")
+        with zipfile.ZipFile(pptx_path, "w") as zf:
+            zf.writestr("[Content_Types].xml", "<Types></Types>")
+            zf.writestr("ppt/presentation.xml", '<p:presentation><p:sldSz cx="1" cy="1"/></p:presentation>')
+            zf.writestr("ppt/_rels/presentation.xml.rels", "<Relationships></Relationships>")
+        
+        result, self_times = _run_importtime(
+            "-m", "md2pptx_builder.cli", "merge", pptx_path, pptx_path, "-o", output_path
+        )
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+        self.assertTrue(os.path.exists(output_path))
+        self.assertNoHeavyImports(_top_level_modules(self_times))
 
 if __name__ == "__main__":
     unittest.main() 
\ No newline at end of file
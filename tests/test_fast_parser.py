@@ -0,0 +1,135 @@
+"""
+md2pptx-builder - 組み込みパーサー（fast エンジン）のmistuneとの適合性テスト
+"""
+
+import random
+import unittest
+
+import mistune
+
+from md2pptx_builder.fast_parser import parse_subset
+from md2pptx_builder.parser import MarkdownParser
+
+# fast エンジンで処理し、mistuneと同じASTになるべきスライド
+SUPPORTED = [
+    "# タイトル",
+    "# タイトル\n\n本文です。",
+    "# タイトル\n本文です。",
+    "## 見出し2\n### 見出し3\n###### 見出し6",
+    "段落1\n\n\n段落2",
+    "1行目\n2行目 \n3行目\n    インデントした継続行",
+    "これは**重要**です。*強調*と`code`と[リンク](https://example.com/a?b=1&c=2)。",
+    "**「重要」**です。**重要**。です",
+    "*a **b** c*\n\n**a *b* c**\n\n*a *b* c*\n\nx*y*z\n\na * b\n\na *b\n\n**a* b",
+    "`a``b` と `` `x` `` と ` a ` と `  `",
+    "**a `b**` c** と *x [y*](z) w*",
+    "[リンク](https://example.com \"タイトル\") と [*強調*のリンク](/path)",
+    "R&D と 1 < 2 と a > b と snake_case と 100% と ~チルダ~ と (注)!",
+    "- 項目1\n- 項目2\n- 項目3",
+    "* 項目1\n* 項目2\n\n+ 項目3",
+    "- a\n* b",
+    "1. 手順1\n2. 手順2\n\n3) 別のリスト\n4) 続き",
+    "3. 3から\n4. 続き\n\n0) ゼロから\n\n- 箇条書き\n\n01. 先頭のゼロ",
+    "- a\n  続き\n- b\n  - 入れ子\n    - さらに入れ子\n  - 入れ子2\n- c\n  1. 番号付き\n  2. 番号付き",
+    "- a\n    - 4つのインデント\n - 1つのインデント\n  - 2つのインデント",
+    "  - インデントしたリスト\n  - 項目",
+    "1. a\n   - b\n2. c",
+    "段落\n- 段落の直後のリスト\n\n段落\n1. 1で始まる番号付きリスト\n\n段落\n2. これは段落の続き",
+    "- # 項目の中の見出し\n- ```\n  code\n  ```\n- 最後",
+    "- 1つ目の段落\n  # 見出し\n  2つ目の段落",
+    "- a\n- b\n\n後の段落",
+    "- a\n\n# 見出し",
+    "- a\n# 見出し",
+    "```python\nprint(1)\n\n  indented\n```\n\n後の段落",
+    "```\n```",
+    "```py title\nx\n````",
+    "~~~\n```\n~~~",
+    "段落\n```\ncode\n```\n段落",
+]
+
+# 扱わない構文を含むため None を返し、mistuneに任せるべきスライド
+UNSUPPORTED = [
+    "| a | b |\n|---|---|\n| 1 | 2 |",
+    "> 引用",
+    "<div>HTML</div>",
+    "段落\n\n    インデントしたコード",
+    "***",
+    "見出し\n===",
+    "エスケープ \\*a\\*",
+    "_下線の強調_",
+    "***強い強調***",
+    "![画像](a.png)",
+    "<https://example.com>",
+    "改行  \n次の行",
+    "- a\n\n- ゆるいリスト",
+    "- a\n怠惰な継続行",
+    "[参照]: https://example.com",
+    "[参照リンク][ref]",
+    "```\n閉じていないコードブロック",
+    "# 閉じの # がある見出し #",
+    "タブ\tを含む",
+    "-",
+    "　全角空白で始まる段落",
+]
+
+class TestFastParser(unittest.TestCase):
+    """組み込みパーサーのテスト"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """mistuneのパーサーを作成する（MarkdownParser と同じ設定）"""
+        cls.mistune = mistune.create_markdown(renderer='ast', plugins=['table'])
+    
+    def test_supported_matches_mistune(self):
+        """扱う構文はmistuneと同じASTになること"""
+        for text in SUPPORTED:
+            with self.subTest(text=text):
+                ast = parse_subset(text)
+                self.assertIsNotNone(ast)
+                self.assertEqual(ast, self.mistune(text))
+    
+    def test_unsupported_falls_back(self):
+        """扱わない構文ではNoneを返すこと"""
+        for text in UNSUPPORTED:
+            with self.subTest(text=text):
+                self.assertIsNone(parse_subset(text))
+    
+    def test_random_documents(self):
+        """ランダムに組み立てたスライドで、処理できた場合は必ずmistuneと一致すること"""
+        atoms = ["これは", "重要", "a", " ", "  ", "*", "**", "`", "``", "[", "]", "(", ")", "「", "」", "。",
+                 "`code`", "**強調**", "*斜体*", "[x](https://example.com/p)", "_", "<", "&", "#", "!", "　"]
+        prefixes = ["", "", "", " ", "  ", "    ", "# ", "## ", "#", "- ", "* ", "1. ", "2) ", "  - ", "```", "~~~"]
+        rng = random.Random(41)
+        handled = 0
+        for _ in range(3000):
+            lines = []
+            for _ in range(rng.randint(1, 8)):
+                if rng.random() < 0.15:
+                    lines.append("")
+                    continue
+                lines.append(rng.choice(prefixes) + "".join(rng.choice(atoms) for _ in range(rng.randint(1, 6))))
+            text = "\n".join(lines).strip()
+            if not text:
+                continue
+            ast = parse_subset(text)
+            if ast is None:
+                continue
+            handled += 1
+            self.assertEqual(ast, self.mistune(text), repr(text))
+        # 比較が意味を持つ程度には処理できていること
+        self.assertGreater(handled, 300)
+    
+    def test_parser_engine(self):
+        """fast エンジンでもスライド情報が mistune エンジンと同じになること"""
+        content = "\n---\n".join(SUPPORTED + UNSUPPORTED)
+        expected = MarkdownParser(engine="mistune").process_markdown_content(content)
+        actual = MarkdownParser(engine="fast").process_markdown_content(content)
+        self.assertEqual([dict(slide) for slide in actual], [dict(slide) for slide in expected])
+    
+    def test_unknown_engine(self):
+        """未知のエンジンはエラーになること"""
+        with self.assertRaises(ValueError):
+            MarkdownParser(engine="commonmark")
+
+if __name__ == "__main__":
+    unittest.main()
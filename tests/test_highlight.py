@@ -0,0 +1,63 @@
+"""
+md2pptx-builder - コードハイライトのテスト
+"""
+
+import unittest
+from unittest.mock import patch
+
+from md2pptx_builder import highlight
+from md2pptx_builder.highlight import highlight_code, clear_highlight_cache
+
+try:
+    import pygments
+    HAS_PYGMENTS = True
+except ImportError:
+    HAS_PYGMENTS = False
+
+@unittest.skipUnless(HAS_PYGMENTS, "Pygmentsがインストールされていません")
+class TestHighlight(unittest.TestCase):
+    """コードハイライトのテスト"""
+    
+    def setUp(self):
+        """テスト開始前の準備"""
+        clear_highlight_cache()
+        self.code = 'def hello(name):\n    print("Hello, " + name)\n    return 1\n'
+    
+    def test_roundtrip(self):
+        """ランを連結すると元のコードに戻ること"""
+        runs = highlight_code(self.code, "python")
+        
+        self.assertEqual("".join(text for text, _, _, _ in runs), self.code)
+        self.assertTrue(any(color for _, color, _, _ in runs))
+    
+    def test_coalescing(self):
+        """同じスタイルの隣接トークンと空白が1つのランにまとめられること"""
+        from pygments.lexers import get_lexer_by_name
+        
+        runs = highlight_code(self.code, "python")
+        tokens = list(get_lexer_by_name("python").get_tokens(self.code))
+        
+        self.assertLess(len(runs), len(tokens))
+        for previous, current in zip(runs, runs[1:]):
+            self.assertNotEqual(previous[1:], current[1:])
+        self.assertFalse(any(text.isspace() for text, _, _, _ in runs[1:]))
+    
+    def test_cache(self):
+        """同じコードと言語の結果はキャッシュされること"""
+        runs = highlight_code(self.code, "python")
+        
+        with patch.object(highlight, "_tokenize") as mock_tokenize:
+            self.assertEqual(highlight_code(self.code, "python"), runs)
+            self.assertEqual(highlight_code(self.code, "Python title=x.py"), runs)
+            mock_tokenize.assert_not_called()
+            
+            highlight_code(self.code, "ruby")
+            mock_tokenize.assert_called_once()
+    
+    def test_plain_code(self):
+        """言語がない場合や未対応の言語はハイライトしないこと"""
+        self.assertEqual(highlight_code("x = 1\n", ""), [("x = 1\n", None, False, False)])
+        self.assertEqual(highlight_code("x = 1\n", "no-such-language"), [("x = 1\n", None, False, False)])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+md2pptx-builder - 画像検証キャッシュのテスト
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from PIL import Image
+
+from md2pptx_builder import image_check
+from md2pptx_builder.image_check import ImageInfo, ImageValidator, sniff_image
+
+class TestImageValidator(unittest.TestCase):
+    """画像検証キャッシュのテスト"""
+    
+    def setUp(self):
+        """テスト開始前の準備"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.temp_dir, "cache")
+        self.image_path = os.path.join(self.temp_dir, "background.png")
+        Image.new("RGB", (800, 400), (10, 120, 200)).save(self.image_path)
+        image_check._checked.clear()
+    
+    def tearDown(self):
+        """テスト終了後のクリーンアップ"""
+        image_check._checked.clear()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_sniff_formats(self):
+        """ヘッダーだけからPillowと同じ形式とサイズを読み取れること"""
+        for fmt, mode, ext in [("PNG", "RGBA", "png"), ("JPEG", "RGB", "jpg"),
+                               ("GIF", "P", "gif"), ("BMP", "RGB", "bmp")]:
+            with self.subTest(fmt=fmt):
+                path = os.path.join(self.temp_dir, f"image.{ext}")
+                Image.new(mode, (321, 123)).save(path, format=fmt)
+                with open(path, "rb") as f:
+                    self.assertEqual(sniff_image(f), ImageInfo(fmt, 321, 123))
+        
+        path = os.path.join(self.temp_dir, "text.png")
+        with open(path, "wb") as f:
+            f.write(b"not an image")
+        with open(path, "rb") as f:
+            self.assertIsNone(sniff_image(f))
+    
+    def test_verifies_once(self):
+        """同じファイルは一度だけ全体を検証すること"""
+        validator = ImageValidator()
+        with patch.object(image_check, "_verify", wraps=image_check._verify) as verify:
+            self.assertEqual(validator.inspect(self.image_path), ImageInfo("PNG", 800, 400))
+            self.assertTrue(validator.is_valid(self.image_path))
+            # 別の検証器でもこのプロセスの結果を使う
+            self.assertTrue(ImageValidator().is_valid(self.image_path))
+        self.assertEqual(verify.call_count, 1)
+    
+    def test_invalid_cached(self):
+        """壊れた画像は無効と判定し、その結果もキャッシュすること"""
+        with open(self.image_path, "rb") as f:
+            data = f.read()
+        path = os.path.join(self.temp_dir, "broken.png")
+        with open(path, "wb") as f:
+            f.write(data[:len(data) // 2])
+        
+        validator = ImageValidator()
+        with patch.object(image_check, "_verify", wraps=image_check._verify) as verify:
+            self.assertFalse(validator.is_valid(path))
+            self.assertFalse(validator.is_valid(path))
+            with self.assertRaises(ValueError):
+                validator.inspect(path)
+        self.assertEqual(verify.call_count, 1)
+        self.assertFalse(validator.is_valid(os.path.join(self.temp_dir, "missing.png")))
+    
+    def test_persistent_cache(self):
+        """キャッシュディレクトリの結果を次回の実行で使うこと"""
+        self.assertTrue(ImageValidator(self.cache_dir).is_valid(self.image_path))
+        self.assertTrue(os.path.exists(os.path.join(self.cache_dir, image_check.IMAGE_CHECK_CACHE_NAME)))
+        image_check._checked.clear()
+        
+        with patch.object(image_check, "_verify") as verify:
+            self.assertEqual(ImageValidator(self.cache_dir).inspect(self.image_path), ImageInfo("PNG", 800, 400))
+        verify.assert_not_called()
+    
+    def test_content_hash(self):
+        """更新時刻やパスが変わっても内容が同じなら検証し直さないこと"""
+        self.assertTrue(ImageValidator(self.cache_dir).is_valid(self.image_path))
+        image_check._checked.clear()
+        stat = os.stat(self.image_path)
+        os.utime(self.image_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        copy_path = os.path.join(self.temp_dir, "copy.png")
+        shutil.copyfile(self.image_path, copy_path)
+        
+        validator = ImageValidator(self.cache_dir)
+        with patch.object(image_check, "_verify") as verify:
+            self.assertTrue(validator.is_valid(self.image_path))
+            self.assertTrue(validator.is_valid(copy_path))
+        verify.assert_not_called()
+    
+    def test_modified_file(self):
+        """内容が変わったファイルは検証し直すこと"""
+        validator = ImageValidator(self.cache_dir)
+        self.assertEqual(validator.inspect(self.image_path).width, 800)
+        stat = os.stat(self.image_path)
+        Image.new("RGB", (200, 100)).save(self.image_path)
+        os.utime(self.image_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        
+        with patch.object(image_check, "_verify", wraps=image_check._verify) as verify:
+            self.assertEqual(validator.inspect(self.image_path), ImageInfo("PNG", 200, 100))
+        self.assertEqual(verify.call_count, 1)
+
+if __name__ == "__main__":
+    unittest.main()
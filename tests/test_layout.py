@@ -0,0 +1,155 @@
+"""
+md2pptx-builder - テキスト計測とレイアウトのテスト
+"""
+
+import unittest
+
+from md2pptx_builder.parser import MarkdownParser
+from md2pptx_builder.layout import (
+    TextMeasurer, ContentLayout, get_measurer, MIN_FONT_SCALE
+)
+
+class TestTextMeasurer(unittest.TestCase):
+    """テキスト計測のテスト"""
+    
+    def setUp(self):
+        """テスト開始前の準備"""
+        self.measurer = TextMeasurer()
+    
+    def test_glyph_width_cache(self):
+        """文字幅がサイズごとにキャッシュされること"""
+        width = self.measurer.text_width("abc", 18)
+        
+        self.assertGreater(width, 0)
+        self.assertEqual(set(self.measurer.glyph_widths(18)), {"a", "b", "c"})
+        self.assertEqual(self.measurer.glyph_widths(12), {})
+        self.assertAlmostEqual(self.measurer.text_width("abc", 36), width * 2)
+    
+    def test_cjk_is_full_width(self):
+        """CJK文字は全角幅として計測されること"""
+        self.assertAlmostEqual(self.measurer.text_width("日本語", 20), 60)
+        self.assertLess(self.measurer.text_width("abc", 20), 60)
+    
+    def test_count_lines_cjk(self):
+        """CJK文字は文字単位で折り返されること"""
+        self.assertEqual(self.measurer.count_lines("あ" * 10, 10, 100), 1)
+        self.assertEqual(self.measurer.count_lines("あ" * 11, 10, 100), 2)
+        self.assertEqual(self.measurer.count_lines("あ" * 30, 10, 100), 3)
+    
+    def test_count_lines_kinsoku(self):
+        """句読点は行頭に送られないこと"""
+        # 10文字目の直後の「。」は前の文字と一緒に次の行へ送られる
+        self.assertEqual(self.measurer.count_lines("あ" * 10 + "。", 10, 100), 2)
+        self.assertEqual(self.measurer.count_lines("あ" * 9 + "。", 10, 100), 1)
+    
+    def test_count_lines_words(self):
+        """英単語は空白で折り返され、長い単語は文字単位で分割されること"""
+        word_width = self.measurer.text_width("word", 10)
+        space_width = self.measurer.text_width(" ", 10)
+        max_width = word_width * 2 + space_width + 0.01
+        
+        self.assertEqual(self.measurer.count_lines("word word", 10, max_width), 1)
+        self.assertEqual(self.measurer.count_lines("word word word", 10, max_width), 2)
+        self.assertGreater(self.measurer.count_lines("w" * 100, 10, max_width), 1)
+        self.assertEqual(self.measurer.count_lines("a\nb\n", 10, max_width), 3)
+    
+    def test_shared_measurer(self):
+        """同じフォントの計測器は共有されること"""
+        self.assertIs(get_measurer(None), get_measurer(None))
+        self.assertIsNot(get_measurer(None), get_measurer(None, True))
+
+class TestContentLayout(unittest.TestCase):
+    """コンテンツレイアウトのテスト"""
+    
+    def setUp(self):
+        """テスト開始前の準備"""
+        self.parser = MarkdownParser()
+        self.layout = ContentLayout(720, 300, TextMeasurer())
+    
+    def _content(self, markdown: str):
+        """Markdownからタイトルを除いたコンテンツのASTを作成する"""
+        return self.parser.get_slide_title(self.parser.parse_slide(markdown))[1]
+    
+    def test_fits_without_scaling(self):
+        """収まるコンテンツは縮小も分割もされないこと"""
+        content = self._content("# タイトル\n\n短い段落です。\n\n- 項目1\n- 項目2")
+        pages = self.layout.paginate(content)
+        
+        self.assertEqual(pages, [(content, 1.0)])
+    
+    def test_scale_to_fit(self):
+        """少しはみ出すコンテンツはフォントの縮小で収めること"""
+        items = "\n".join(f"- 項目{i}" for i in range(9))
+        content = self._content(f"# タイトル\n\n段落です。\n\n{items}")
+        self.assertGreater(self.layout.content_height(content), self.layout.height)
+        
+        pages = self.layout.paginate(content)
+        
+        self.assertEqual(len(pages), 1)
+        scale = pages[0][1]
+        self.assertGreaterEqual(scale, MIN_FONT_SCALE)
+        self.assertLess(scale, 1.0)
+        self.assertLessEqual(self.layout.content_height(content, scale), self.layout.height)
+    
+    def test_paginate_long_list(self):
+        """長いリストは項目単位で続きのページに分割されること"""
+        items = "\n".join(f"{i}. 項目{i}" for i in range(1, 61))
+        content = self._content(f"# タイトル\n\n{items}")
+        
+        pages = self.layout.paginate(content)
+        
+        self.assertGreater(len(pages), 1)
+        lists = [node for nodes, _ in pages for node in nodes if node["type"] == "list"]
+        self.assertEqual(sum(len(node["children"]) for node in lists), 60)
+        # 番号付きリストは続きの番号から始まる
+        starts = [node["attrs"]["start"] for node in lists]
+        self.assertEqual(starts[0], 1)
+        self.assertEqual(starts[1], 1 + len(lists[0]["children"]))
+        for nodes, scale in pages:
+            self.assertEqual(scale, 1.0)
+            self.assertLessEqual(self.layout.content_height(nodes), self.layout.height)
+        # 元のASTは変更されない
+        original = [node for node in content if node["type"] == "list"][0]
+        self.assertEqual(len(original["children"]), 60)
+        self.assertNotIn("start", original["attrs"])
+    
+    def test_paginate_long_code(self):
+        """長いコードブロックは行単位で分割されること"""
+        code = "\n".join(f"print({i})" for i in range(100))
+        content = self._content(f"```python\n{code}\n```")
+        
+        pages = self.layout.paginate(content)
+        
+        self.assertGreater(len(pages), 1)
+        raw = "".join(node["raw"] for nodes, _ in pages for node in nodes)
+        self.assertEqual(raw, code + "\n")
+    
+    def test_table_metrics(self):
+        """表の列幅は内容に比例し、合計はコンテンツ領域の幅になること"""
+        content = self._content("| 短 | とても長い列の内容です |\n|---|---|\n| a | b |")
+        
+        column_widths, row_heights = self.layout.table_metrics(content[0])
+        
+        self.assertEqual(len(column_widths), 2)
+        self.assertEqual(len(row_heights), 2)
+        self.assertLess(column_widths[0], column_widths[1])
+        self.assertAlmostEqual(sum(column_widths), 720)
+    
+    def test_paginate_long_table(self):
+        """長い表は行単位で分割され、各ページにヘッダー行が付くこと"""
+        rows = "\n".join(f"| {i} | 値{i} |" for i in range(100))
+        content = self._content(f"| 番号 | 値 |\n|---|---|\n{rows}")
+        
+        pages = self.layout.paginate(content)
+        
+        self.assertGreater(len(pages), 1)
+        body_rows = 0
+        for nodes, scale in pages:
+            table = [node for node in nodes if node["type"] == "table"][0]
+            self.assertEqual(table["children"][0]["type"], "table_head")
+            body_rows += len(table["children"][1]["children"])
+            self.assertLessEqual(self.layout.content_height(nodes), self.layout.height)
+        self.assertEqual(body_rows, 100)
+
+if __name__ == "__main__":
+    unittest.main()
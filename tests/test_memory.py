@@ -0,0 +1,103 @@
+"""
+md2pptx-builder - 段階ごとのメモリレポートのテスト
+"""
+
+import os
+import sys
+import json
+import shutil
+import subprocess
+import tempfile
+import tracemalloc
+import unittest
+
+from PIL import Image
+
+from md2pptx_builder.memory import MemoryReport, memory_stage
+from md2pptx_builder.parser import MarkdownParser
+from md2pptx_builder.builder import PPTXBuilder
+
+class TestMemoryReport(unittest.TestCase):
+    """メモリレポートのテスト"""
+    
+    def setUp(self):
+        """テスト開始前の準備"""
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """テスト終了後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_stage(self):
+        """段階中の割り当ての最大値と割り当て元を記録すること"""
+        self.assertFalse(tracemalloc.is_tracing())
+        with MemoryReport(top=5) as report:
+            with report.stage("allocate"):
+                data = [bytearray(1024) for _ in range(1000)]
+                temporary = bytearray(4 * 1024 * 1024)
+                del temporary
+            self.assertTrue(tracemalloc.is_tracing())
+        # レポートが有効にした tracemalloc は停止する
+        self.assertFalse(tracemalloc.is_tracing())
+        
+        stage = report.to_dict()["stages"][0]
+        self.assertEqual(stage["name"], "allocate")
+        # 解放した一時的な割り当ても最大値には含まれる
+        self.assertGreater(stage["peak_increase"], 4 * 1024 * 1024)
+        self.assertGreater(stage["traced_after"] - stage["traced_before"], 1000 * 1024)
+        self.assertLessEqual(len(stage["top_sites"]), 5)
+        self.assertEqual(stage["top_sites"][0]["file"], __file__)
+        self.assertGreater(stage["top_sites"][0]["size_diff"], 1000 * 1024)
+        self.assertEqual(len(data), 1000)
+    
+    def test_keeps_existing_tracing(self):
+        """既に有効な tracemalloc は停止しないこと"""
+        tracemalloc.start()
+        try:
+            with MemoryReport() as report:
+                with report.stage("noop"):
+                    pass
+            self.assertTrue(tracemalloc.is_tracing())
+        finally:
+            tracemalloc.stop()
+    
+    def test_memory_stage_without_report(self):
+        """レポートがなければ何も記録しないこと"""
+        with memory_stage(None, "noop"):
+            pass
+        self.assertFalse(tracemalloc.is_tracing())
+    
+    def test_tracemalloc_loaded_on_demand(self):
+        """レポートを使わなければ tracemalloc を読み込まないこと"""
+        code = (
+            "import sys, md2pptx_builder.parser, md2pptx_builder.memory; "
+            "print('tracemalloc' in sys.modules)"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "False")
+    
+    def test_pipeline_stages(self):
+        """パーサーとビルダーが分割・パース・構築・保存の段階を記録すること"""
+        background_path = os.path.join(self.temp_dir, "background.png")
+        logo_path = os.path.join(self.temp_dir, "logo.png")
+        Image.new("RGB", (160, 90)).save(background_path)
+        Image.new("RGBA", (40, 20)).save(logo_path)
+        builder = PPTXBuilder(background_path, logo_path)
+        
+        report_path = os.path.join(self.temp_dir, "memory.json")
+        with MemoryReport() as report:
+            slides_data = MarkdownParser(workers=1).process_markdown_content(
+                "# 1\n\n- a\n- b\n\n---\n\n# 2\n\n本文", memory_report=report
+            )
+            builder.build(slides_data, memory_report=report)
+        report.write(report_path)
+        
+        with open(report_path, encoding="utf-8") as f:
+            data = json.load(f)
+        self.assertEqual([stage["name"] for stage in data["stages"]], ["split", "parse", "build", "save"])
+        self.assertEqual(data["traced_peak"], max(stage["traced_peak"] for stage in data["stages"]))
+        for stage in data["stages"]:
+            self.assertGreaterEqual(stage["traced_peak"], stage["traced_before"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+md2pptx-builder - デッキ結合のテスト
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+from PIL import Image
+from pptx import Presentation
+
+from md2pptx_builder.parser import MarkdownParser
+from md2pptx_builder.builder import PPTXBuilder
+from md2pptx_builder.merge import merge_presentations
+from md2pptx_builder.package import CUSTOM_PROPERTIES_PART, SLIDE_HASHES_PROPERTY
+from md2pptx_builder.utils import parse_slide_selection
+
+# 2枚目のスライドは長い段落で2ページに分かれる
+MARKDOWN = "\n\n---\n\n".join(
+    f"# スライド{i}\n\n本文 {i}\n\n- 項目A\n- 項目B" + ("\n\n" + "長い段落です。" * 300 if i == 2 else "")
+    for i in range(1, 8)
+)
+
+class TestMergePresentations(unittest.TestCase):
+    """デッキ結合のテスト"""
+    
+    def setUp(self):
+        """テスト開始前の準備"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.background_path = os.path.join(self.temp_dir, "background.png")
+        self.logo_path = os.path.join(self.temp_dir, "logo.png")
+        Image.new("RGB", (160, 90), (220, 230, 255)).save(self.background_path)
+        Image.new("RGBA", (40, 20), (255, 0, 0, 255)).save(self.logo_path)
+        
+        self.parser = MarkdownParser(workers=1)
+        self.builder = PPTXBuilder(self.background_path, self.logo_path)
+    
+    def tearDown(self):
+        """テスト終了後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _build(self, name: str, markdown: str = MARKDOWN, slides: str = None, builder: PPTXBuilder = None) -> str:
+        """Markdownからデッキを作成してパスを返す"""
+        path = os.path.join(self.temp_dir, name)
+        selection = parse_slide_selection(slides) if slides else None
+        slides_data = self.parser.process_markdown_content(markdown, slides=selection)
+        (builder or self.builder).build_presentation(slides_data, path)
+        return path
+    
+    def _numbers(self, path: str) -> list:
+        """各スライドの最後の図形（スライド番号）のテキストを返す"""
+        return [list(slide.shapes)[-1].text_frame.text for slide in Presentation(path).slides]
+    
+    def test_merge_document_ranges(self):
+        """同じ文書のスライド範囲を結合すると全体を作成した場合と同じファイルになること"""
+        full_path = self._build("full.pptx")
+        first_path = self._build("first.pptx", slides="1-3")
+        second_path = self._build("second.pptx", slides="4-7")
+        output_path = os.path.join(self.temp_dir, "merged.pptx")
+        
+        stats = merge_presentations([first_path, second_path], output_path)
+        
+        self.assertEqual(stats["decks"], 2)
+        self.assertEqual(stats["slides"], 8)
+        self.assertFalse(stats["renumbered"])
+        self.assertEqual(stats["media_copied"], 0)
+        self.assertEqual(stats["media_deduplicated"], 2)
+        with zipfile.ZipFile(full_path) as full, zipfile.ZipFile(output_path) as merged:
+            self.assertIsNone(merged.testzip())
+            self.assertEqual(sorted(merged.namelist()), sorted(full.namelist()))
+            for name in full.namelist():
+                self.assertEqual(merged.read(name), full.read(name), name)
+        
+        # ページごとのハッシュもつながっているので、変更がなければそのまま更新できる
+        slides_data = self.parser.process_markdown_content(MARKDOWN)
+        self.assertTrue(self.builder.update_presentation(slides_data, output_path))
+        self.assertEqual(self._numbers(output_path), self._numbers(full_path))
+    
+    def test_merge_separate_documents(self):
+        """別々の文書を結合するとスライド番号を通し番号に書き換えること"""
+        first_path = self._build("first.pptx", "# A\n\n本文\n\n---\n\n# B\n\n本文")
+        second_path = self._build("second.pptx", "# C\n\n本文\n\n---\n\n# D\n\n本文\n\n---\n\n# E\n\n本文")
+        output_path = os.path.join(self.temp_dir, "merged.pptx")
+        
+        stats = merge_presentations([first_path, second_path], output_path)
+        
+        self.assertTrue(stats["renumbered"])
+        prs = Presentation(output_path)
+        self.assertEqual(self._numbers(output_path), [f"{i}/5" for i in range(1, 6)])
+        texts = [" ".join(shape.text_frame.text for shape in slide.shapes if shape.has_text_frame)
+                 for slide in prs.slides]
+        for text, title in zip(texts, "ABCDE"):
+            self.assertIn(title, text)
+        # 結合後のハッシュはないため、次回の --update は全体を作成し直す
+        with zipfile.ZipFile(output_path) as zf:
+            self.assertIn(f'name="{SLIDE_HASHES_PROPERTY}"', zf.read(CUSTOM_PROPERTIES_PART).decode("utf-8"))
+        slides_data = self.parser.process_markdown_content("# A\n\n本文")
+        self.assertFalse(self.builder.update_presentation(slides_data, output_path))
+    
+    def test_merge_copies_new_media(self):
+        """異なるメディアはコピーし、同じ内容のメディアは1つにまとめること"""
+        other_logo_path = os.path.join(self.temp_dir, "other_logo.png")
+        Image.new("RGBA", (40, 20), (0, 0, 255, 255)).save(other_logo_path)
+        first_path = self._build("first.pptx", "# A\n\n本文")
+        second_path = self._build("second.pptx", "# B\n\n本文",
+                                  builder=PPTXBuilder(self.background_path, other_logo_path))
+        output_path = os.path.join(self.temp_dir, "merged.pptx")
+        
+        stats = merge_presentations([first_path, second_path], output_path)
+        
+        self.assertEqual(stats["media_copied"], 1)
+        self.assertEqual(stats["media_deduplicated"], 1)
+        prs = Presentation(output_path)
+        blobs = [{shape.image.blob for shape in slide.shapes if shape.shape_type == 13} for slide in prs.slides]
+        self.assertEqual(len(blobs[0] | blobs[1]), 3)
+        self.assertEqual(len(blobs[0] & blobs[1]), 1)
+    
+    def test_template_mismatch(self):
+        """テンプレートが異なるデッキは結合しないこと"""
+        first_path = self._build("first.pptx", "# A\n\n本文")
+        other_path = os.path.join(self.temp_dir, "other.pptx")
+        Presentation().save(other_path)
+        output_path = os.path.join(self.temp_dir, "merged.pptx")
+        
+        with self.assertRaises(ValueError):
+            merge_presentations([first_path, other_path], output_path)
+        self.assertFalse(os.path.exists(output_path))
+        self.assertFalse([name for name in os.listdir(self.temp_dir) if name.startswith(".tmp-")])
+    
+    def test_no_inputs(self):
+        """入力がなければエラーになること"""
+        with self.assertRaises(ValueError):
+            merge_presentations([], os.path.join(self.temp_dir, "merged.pptx"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+md2pptx-builder - PPTXパッケージ操作のテスト
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+from md2pptx_builder.package import (
+    rewrite_package, referenced_parts, get_custom_property, set_custom_property, add_default_content_type
+)
+
+class TestPackage(unittest.TestCase):
+    """PPTXパッケージ操作のテスト"""
+    
+    def setUp(self):
+        """テスト開始前の準備"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "package.zip")
+        with zipfile.ZipFile(self.path, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("a.xml", b"<a/>" * 1000)
+            zf.writestr("ppt/media/image1.png", b"\x89PNG" + bytes(range(256)) * 10, zipfile.ZIP_STORED)
+            zf.writestr("ppt/slides/_rels/slide1.xml.rels",
+                        b'<Relationships><Relationship Id="rId1" Type="t" Target="../media/image1.png"/>'
+                        b'<Relationship Id="rId2" Type="t" Target="https://example.com/" TargetMode="External"/>'
+                        b'</Relationships>')
+    
+    def tearDown(self):
+        """テスト終了後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_rewrite_package(self):
+        """変更のないエントリは圧縮済みのままコピーされ、指定したエントリだけが書き換わること"""
+        with zipfile.ZipFile(self.path) as zf:
+            before = {info.filename: (info.compress_type, info.compress_size, info.CRC) for info in zf.infolist()}
+        
+        rewrite_package(self.path, self.path, {"a.xml": b"<b/>", "new.xml": b"<new/>"}, {"ppt/media/image1.png"})
+        
+        with zipfile.ZipFile(self.path) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(zf.namelist(), ["a.xml", "ppt/slides/_rels/slide1.xml.rels", "new.xml"])
+            self.assertEqual(zf.read("a.xml"), b"<b/>")
+            self.assertEqual(zf.read("new.xml"), b"<new/>")
+            name = "ppt/slides/_rels/slide1.xml.rels"
+            info = zf.getinfo(name)
+            self.assertEqual((info.compress_type, info.compress_size, info.CRC), before[name])
+        self.assertEqual([name for name in os.listdir(self.temp_dir) if name.startswith(".tmp-")], [])
+    
+    def test_referenced_parts(self):
+        """リレーションシップの参照先がパッケージ内のパート名に解決されること"""
+        with zipfile.ZipFile(self.path) as zf:
+            self.assertEqual(referenced_parts(zf), {"ppt/media/image1.png"})
+            replaced = {"ppt/slides/_rels/slide1.xml.rels": b"<Relationships/>"}
+            self.assertEqual(referenced_parts(zf, replaced), set())
+    
+    def test_custom_property(self):
+        """ユーザー定義プロパティを追加・更新して読み出せること"""
+        data = set_custom_property(None, "name", "value1")
+        self.assertEqual(get_custom_property(data, "name"), "value1")
+        data = set_custom_property(data, "other", "x")
+        data = set_custom_property(data, "name", "value2")
+        self.assertEqual(get_custom_property(data, "name"), "value2")
+        self.assertEqual(get_custom_property(data, "other"), "x")
+        self.assertIsNone(get_custom_property(data, "missing"))
+        self.assertIsNone(get_custom_property(b"broken", "name"))
+    
+    def test_add_default_content_type(self):
+        """拡張子の既定のコンテンツタイプが重複せずに追加されること"""
+        data = b'<Types><Default Extension="png" ContentType="image/png"/></Types>'
+        self.assertEqual(add_default_content_type(data, "png", "image/png"), data)
+        updated = add_default_content_type(data, "gif", "image/gif")
+        self.assertIn(b'<Default Extension="gif" ContentType="image/gif"/></Types>', updated)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+md2pptx-builder - パースキャッシュのテスト
+"""
+
+import os
+import sys
+import shutil
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from md2pptx_builder import parse_cache
+from md2pptx_builder.parser import MarkdownParser
+from md2pptx_builder.parse_cache import load_parse_cache, parse_cache_path
+
+class TestParseCache(unittest.TestCase):
+    """パースキャッシュのテスト"""
+    
+    def setUp(self):
+        """テスト開始前の準備"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.chapter = self._write("chapter.md", "# 章\n\n- 項目1\n  - 子項目")
+        self.deck = self._write("deck.md", "# 表紙\n\n本文\n\n<!-- include: chapter.md -->")
+    
+    def tearDown(self):
+        """テスト終了後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _write(self, name: str, content: str) -> str:
+        """一時ディレクトリにファイルを書き込む"""
+        path = os.path.join(self.temp_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+    
+    def test_roundtrip(self):
+        """保存したキャッシュから同じスライド情報を読み込めること"""
+        slides_data = MarkdownParser().process_markdown_file(self.deck, cache=True)
+        
+        self.assertTrue(os.path.exists(parse_cache_path(self.deck)))
+        self.assertEqual(load_parse_cache(self.deck, "---"), slides_data)
+        
+        parser = MarkdownParser()
+        with patch.object(parser, "parse_slide") as mock_parse:
+            self.assertEqual(parser.process_markdown_file(self.deck, cache=True), slides_data)
+            selected = parser.process_markdown_file(self.deck, slides=[(2, 2)], cache=True)
+            mock_parse.assert_not_called()
+        self.assertEqual(selected, slides_data[1:])
+    
+    def test_invalidation(self):
+        """入力ファイルやインクルードしたファイルが変わると無効になること"""
+        MarkdownParser().process_markdown_file(self.deck, cache=True)
+        self.assertIsNone(load_parse_cache(self.deck, "==="))
+        with patch.object(parse_cache, "__version__", "0.0.0-test"):
+            self.assertIsNone(load_parse_cache(self.deck, "---"))
+        
+        self._write("chapter.md", "# 改訂した章")
+        self.assertIsNone(load_parse_cache(self.deck, "---"))
+        
+        slides_data = MarkdownParser().process_markdown_file(self.deck, cache=True)
+        self.assertEqual(slides_data[1]["title"], "改訂した章")
+        self.assertEqual(load_parse_cache(self.deck, "---"), slides_data)
+    
+    def test_corrupt_cache(self):
+        """壊れたキャッシュファイルは無視されること"""
+        with open(parse_cache_path(self.deck), "wb") as f:
+            f.write(b"\x00broken")
+        
+        self.assertIsNone(load_parse_cache(self.deck, "---"))
+        slides_data = MarkdownParser().process_markdown_file(self.deck, cache=True)
+        self.assertEqual(len(slides_data), 2)
+    
+    def test_hit_without_mistune(self):
+        """有効なキャッシュがあればmistuneを読み込まないこと"""
+        MarkdownParser().process_markdown_file(self.deck, cache=True)
+        
+        code = (
+            "import sys\n"
+            "from md2pptx_builder.parser import MarkdownParser\n"
+            f"slides = MarkdownParser().process_markdown_file({self.deck!r}, cache=True)\n"
+            "print(len(slides), 'mistune' in sys.modules)\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, cwd=Path(__file__).parent.parent
+        )
+        self.assertEqual(result.stdout.split(), ["2", "False"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,10 +3,13 @@ md2pptx-builder - Markdownパーサーのテスト
 """
 
 import os
+import shutil
 import tempfile
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
+from md2pptx_builder import parser as parser_module
 from md2pptx_builder.parser import MarkdownParser
 
 class TestMarkdownParser(unittest.TestCase):
@@ -72,6 +75,20 @@ print("Hello, World!")
         self.assertIn("スライド3タイトル", slides[2])
         self.assertIn("最後のスライドです。", slides[2])
     
+    def test_split_to_slides_matches_pipeline(self):
+        """行の途中の区切りでは分割せず、スライド情報と同じ範囲に分割すること"""
+        chapter = os.path.join(os.path.dirname(self.temp_file.name), "chapter.md")
+        with open(chapter, "w", encoding="utf-8") as f:
+            f.write("# 章")
+        self.addCleanup(os.unlink, chapter)
+        content = "# A\n\n本文 <!-- pagebreak --> の続き\n<!-- include: chapter.md -->\n# B\n<!-- pagebreak -->\n# C"
+        
+        slides = self.parser.split_to_slides(content)
+        slides_data = self.parser.process_markdown_content(content, base_dir=os.path.dirname(chapter))
+        
+        self.assertEqual(slides, ["# A\n\n本文 <!-- pagebreak --> の続き", "# B", "# C"])
+        self.assertEqual(slides, [slide["raw_text"] for slide in slides_data if slide["title"] != "章"])
+    
     def test_parse_slide(self):
         """スライドパースのテスト"""
         slide_content = "# タイトル\n\nこれはテスト段落です。"
@@ -119,6 +136,161 @@ print("Hello, World!")
         self.assertEqual(slides_data[0]["index"], 0)
         self.assertEqual(slides_data[1]["index"], 1)
         self.assertEqual(slides_data[2]["index"], 2)
+    
+    def test_process_selected_slides(self):
+        """指定したスライドだけをパースすること"""
+        with patch.object(self.parser, "parse_slide", wraps=self.parser.parse_slide) as mock_parse:
+            slides_data = self.parser.process_markdown_file(self.temp_file.name, slides=[(3, None), (1, 1)])
+        
+        self.assertEqual(mock_parse.call_count, 2)
+        self.assertEqual([slide["title"] for slide in slides_data], ["スライド1タイトル", "スライド3タイトル"])
+        self.assertEqual([slide["index"] for slide in slides_data], [0, 2])
+        self.assertTrue(all(slide["total_slides"] == 3 for slide in slides_data))
+    
+    def test_slide_records(self):
+        """スライド情報がファイル全体のバイト列を共有し、辞書と同じキーで参照できること"""
+        with open(self.temp_file.name, "w", encoding="utf-8", newline="") as f:
+            f.write(self.test_md_content.replace("\n", "\r\n"))
+        slides_data = self.parser.process_markdown_file(self.temp_file.name)
+        
+        self.assertEqual([slide["raw_text"] for slide in slides_data],
+                         self.parser.split_to_slides(self.test_md_content))
+        self.assertEqual(set(dict(slides_data[0])), {"title", "content", "index", "total_slides", "raw_text"})
+        self.assertEqual(slides_data[0].get("title"), "スライド1タイトル")
+        self.assertFalse(hasattr(slides_data[0], "__dict__"))
+        self.assertIs(slides_data[0].span[0], slides_data[2].span[0])
+        
+        # ASTを解放してもパーサーのキャッシュには影響しない
+        content = slides_data[0]["content"]
+        slides_data[0].drop_content()
+        self.assertIsNone(slides_data[0]["content"])
+        self.assertEqual(self.parser.process_markdown_file(self.temp_file.name)[0]["content"], content)
+
+class TestIncludes(unittest.TestCase):
+    """インクルード指令のテスト"""
+    
+    def setUp(self):
+        """テスト開始前の準備"""
+        self.temp_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.temp_dir, "chapters"))
+        self._write("chapters/one.md", "# 1章-1\n\n本文\n\n---\n\n# 1章-2")
+        self._write("chapters/two.md", "# 2章\n\n<!-- include: three.md -->\n\n# 2章の続き")
+        self._write("chapters/three.md", "# 3章")
+        self.deck = self._write(
+            "deck.md",
+            "# 表紙\n\n<!-- include: chapters/one.md -->\n\n---\n\n"
+            "```markdown\n<!-- include: chapters/missing.md -->\n```\n\n"
+            "<!-- include: chapters/two.md -->\n# まとめ"
+        )
+        self.parser = MarkdownParser()
+    
+    def tearDown(self):
+        """テスト終了後のクリーンアップ"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _write(self, name: str, content: str) -> str:
+        """一時ディレクトリにファイルを書き込む"""
+        path = os.path.join(self.temp_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+    
+    def test_expand_includes(self):
+        """インクルードしたファイルのスライドが文書順に展開されること"""
+        slides_data = self.parser.process_markdown_file(self.deck)
+        
+        titles = [slide["title"] for slide in slides_data]
+        self.assertEqual(titles, ["表紙", "1章-1", "1章-2", "スライド 4", "2章", "3章", "2章の続き", "まとめ"])
+        self.assertEqual([slide["index"] for slide in slides_data], list(range(8)))
+        self.assertTrue(all(slide["total_slides"] == 8 for slide in slides_data))
+        # コードブロック内の指令はそのまま残る
+        self.assertEqual(slides_data[3]["content"][0]["type"], "block_code")
+    
+    def test_include_from_content(self):
+        """文字列のMarkdownでは基準ディレクトリからの相対パスで読み込むこと"""
+        slides_data = self.parser.process_markdown_content(
+            "<!-- include: one.md -->", base_dir=os.path.join(self.temp_dir, "chapters")
+        )
+        self.assertEqual([slide["title"] for slide in slides_data], ["1章-1", "1章-2"])
+    
+    def test_cycle(self):
+        """インクルードの循環を検出すること"""
+        self._write("chapters/three.md", "<!-- include: two.md -->")
+        
+        with self.assertRaises(ValueError) as context:
+            self.parser.process_markdown_file(self.deck)
+        self.assertIn("two.md -> ", str(context.exception))
+    
+    def test_missing_include(self):
+        """存在しないファイルのインクルードはエラーになること"""
+        self._write("chapters/three.md", "<!-- include: nothing.md -->")
+        
+        with self.assertRaises(FileNotFoundError):
+            self.parser.process_markdown_file(self.deck)
+    
+    def test_reparse_changed_file_only(self):
+        """変更されたファイルのスライドだけを再度パースすること"""
+        self.parser.process_markdown_file(self.deck)
+        
+        with patch.object(self.parser, "parse_slide", wraps=self.parser.parse_slide) as mock_parse:
+            self.parser.process_markdown_file(self.deck)
+            self.assertEqual(mock_parse.call_count, 0)
+            
+            # 更新時刻だけが変わった場合も内容のハッシュが同じならパースしない
+            os.utime(os.path.join(self.temp_dir, "chapters/one.md"))
+            self.parser.process_markdown_file(self.deck)
+            self.assertEqual(mock_parse.call_count, 0)
+            
+            self._write("chapters/one.md", "# 1章（改訂）")
+            slides_data = self.parser.process_markdown_file(self.deck)
+            self.assertEqual(mock_parse.call_count, 1)
+        
+        self.assertEqual(slides_data[1]["title"], "1章（改訂）")
+        self.assertEqual(len(slides_data), 7)
+    
+    def test_parallel_parse(self):
+        """並列にパースしても同じ結果になること"""
+        serial = MarkdownParser(workers=1).process_markdown_file(self.deck)
+        
+        with patch.object(parser_module, "PARALLEL_PARSE_MIN_SLIDES", 2), \
+             patch.object(parser_module, "PARSE_BATCH_SIZE", 3):
+            parallel = MarkdownParser(workers=2).process_markdown_file(self.deck)
+        
+        self.assertEqual(parallel, serial)
+    
+    def test_serial_parse_by_default(self):
+        """workers を指定しなければプロセスプールを使わないこと"""
+        with patch.object(parser_module, "PARALLEL_PARSE_MIN_SLIDES", 2), \
+             patch.object(parser_module.os, "cpu_count", return_value=4), \
+             patch.object(parser_module, "ProcessPoolExecutor") as mock_executor:
+            MarkdownParser().process_markdown_file(self.deck)
+        
+        mock_executor.assert_not_called()
+    
+    def test_memory_mapped_input(self):
+        """メモリマップで読み込んでも同じ結果になり、処理後にマップを閉じること"""
+        expected = MarkdownParser().process_markdown_file(self.deck)
+        
+        with patch.object(parser_module, "MMAP_MIN_BYTES", 1):
+            slides_data = self.parser.process_markdown_file(self.deck)
+            self.assertEqual(slides_data, expected)
+            self.assertTrue(all(source["buffer"] is None for source in self.parser._source_cache.values()))
+            
+            # 閉じたマップは未パースのスライドが必要になったときに開き直す
+            self._write("chapters/three.md", "# 3章\n\n---\n\n# 3章-2")
+            slides_data = self.parser.process_markdown_file(self.deck)
+        self.assertEqual([slide["title"] for slide in slides_data][5:7], ["3章", "3章-2"])
+        self.assertEqual(slides_data[6]["raw_text"], "# 3章-2")
+    
+    def test_invalid_utf8(self):
+        """不正なUTF-8はファイル先頭からのバイト位置とともに報告されること"""
+        with open(os.path.join(self.temp_dir, "chapters/three.md"), "wb") as f:
+            f.write("# 3章\n\n---\n\nあ".encode("utf-8") + b"\xff")
+        
+        with self.assertRaises(ValueError) as context:
+            self.parser.process_markdown_file(self.deck)
+        self.assertIn("three.md", str(context.exception))
+        self.assertIn("バイト位置 16", str(context.exception))
 
 if __name__ == "__main__":
     unittest.main() 
\ No newline at end of file
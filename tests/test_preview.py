@@ -0,0 +1,87 @@
+"""
+md2pptx-builder - 差分プレビューのテスト
+"""
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from md2pptx_builder.parser import MarkdownParser
+from md2pptx_builder.preview import IncrementalPreview
+
+class TestIncrementalPreview(unittest.TestCase):
+    """差分プレビューのテスト"""
+    
+    def setUp(self):
+        """テスト開始前の準備"""
+        self.parser = MarkdownParser(workers=1)
+        self.text = "\n\n---\n\n".join(f"# スライド{i}\n\n本文 {i}\n\n- 項目A\n- 項目B" for i in range(1, 21))
+    
+    def assertSameSlides(self, preview: IncrementalPreview, text: str) -> None:
+        expected = self.parser.process_markdown_content(text)
+        self.assertEqual([dict(slide) for slide in preview.slides], [dict(slide) for slide in expected])
+    
+    def test_parses_only_changed_slides(self):
+        """編集されたスライドだけをパースし直すこと"""
+        preview = IncrementalPreview()
+        self.assertEqual(preview.update(self.text), list(range(20)))
+        
+        text = self.text.replace("本文 7", "本文 7（修正）")
+        with patch.object(preview.parser, "parse_slide", wraps=preview.parser.parse_slide) as parse_slide:
+            self.assertEqual(preview.update(text), [6])
+            self.assertEqual(preview.update(text), [])
+        self.assertEqual(parse_slide.call_count, 1)
+        self.assertSameSlides(preview, text)
+    
+    def test_insert_and_remove_pagebreak(self):
+        """区切りの追加と削除でスライドの番号と総数が変わること"""
+        preview = IncrementalPreview()
+        preview.update(self.text)
+        
+        text = self.text.replace("- 項目A\n- 項目B", "- 項目A\n\n---\n\n- 項目B", 1)
+        self.assertEqual(preview.update(text), [0, 1])
+        self.assertEqual(len(preview.slides), 21)
+        self.assertEqual(preview.slides[1]["title"], "スライド 2")
+        self.assertSameSlides(preview, text)
+        
+        self.assertEqual(preview.update(self.text), [0])
+        self.assertEqual(len(preview.slides), 20)
+        self.assertSameSlides(preview, self.text)
+    
+    def test_random_edits(self):
+        """任意の編集の後も全体をパースした場合と同じ結果になること"""
+        pieces = ["---", "\n", "\n---\n", "# 見出し", "本文", " ", "<!-- pagebreak -->", "- a", "\n\n", "　", "```\n"]
+        rng = random.Random(0)
+        for trial in range(50):
+            preview = IncrementalPreview()
+            text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 30)))
+            for step in range(10):
+                start = rng.randint(0, len(text))
+                end = rng.randint(start, min(len(text), start + 8))
+                text = text[:start] + "".join(rng.choice(pieces) for _ in range(rng.randint(0, 3))) + text[end:]
+                with self.subTest(trial=trial, step=step):
+                    preview.update(text)
+                    self.assertSameSlides(preview, text)
+    
+    def test_include_falls_back_to_full_parse(self):
+        """インクルード指令を含む場合は全体を処理すること"""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(temp_dir, "chapter.md"), "w", encoding="utf-8") as f:
+                f.write("# 章\n\n本文")
+            text = f"# 表紙\n\n<!-- include: {os.path.join(temp_dir, 'chapter.md')} -->\n\n# 最後"
+            preview = IncrementalPreview()
+            self.assertEqual(preview.update(text), [0, 1, 2])
+            self.assertEqual([slide["title"] for slide in preview.slides], ["表紙", "章", "最後"])
+            
+            # インクルードをやめた後は差分で更新できる
+            preview.update("# 表紙\n\n---\n\n# 最後")
+            self.assertEqual(preview.update("# 表紙\n\n---\n\n# 最後の章"), [1])
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,200 @@
+"""
+md2pptx-builder - スライドスキャナーのテスト
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+from md2pptx_builder.parser import MarkdownParser
+from md2pptx_builder.scanner import (
+    scan_markdown, scan_markdown_file, manifest_document, estimate_build_cost, BUILD_COST_WEIGHTS,
+    iter_slide_spans, split_segments, _EXTRA_SPACES
+)
+
+class TestScanner(unittest.TestCase):
+    """スライドスキャナーのテスト"""
+    
+    def setUp(self):
+        """テスト開始前の準備"""
+        self.parser = MarkdownParser()
+        
+        # テスト用Markdownテキスト
+        self.test_md_content = """# スライド1タイトル
+
+これは最初のスライドです。
+
+- 箇条書き1
+- 箇条書き2
+
+---
+
+# スライド2タイトル
+
+## 見出し2
+
+```python
+# コメントは見出しではない
+print("Hello, World!")
+```
+
+| 列1 | 列2 |
+|-----|-----|
+| a   | b   |
+
+<!-- pagebreak -->
+
+最後のスライドです。
+"""
+    
+    def test_matches_parser_split(self):
+        """パーサーと同じスライド境界を検出すること"""
+        contents = [
+            self.test_md_content,
+            "a\n---\n---\nb",
+            "---\n\n---\n　\n---\n本文　\n",
+            "x---\n---\ny",
+        ]
+        for content in contents:
+            data = content.encode("utf-8")
+            manifest = scan_markdown(data)
+            slides = self.parser.split_to_slides(content)
+            self.assertEqual(
+                [data[entry["start"]:entry["end"]].decode("utf-8") for entry in manifest],
+                slides
+            )
+    
+    def test_manifest(self):
+        """タイトルと要素数が取得できること"""
+        manifest = scan_markdown(self.test_md_content)
+        
+        self.assertEqual(len(manifest), 3)
+        self.assertEqual([entry["index"] for entry in manifest], [0, 1, 2])
+        
+        self.assertEqual(manifest[0]["title"], "スライド1タイトル")
+        self.assertEqual(manifest[0]["counts"]["paragraphs"], 1)
+        self.assertEqual(manifest[0]["counts"]["list_items"], 2)
+        
+        self.assertEqual(manifest[1]["title"], "スライド2タイトル")
+        self.assertEqual(manifest[1]["counts"]["headings"], 2)
+        self.assertEqual(manifest[1]["counts"]["code_blocks"], 1)
+        self.assertEqual(manifest[1]["counts"]["tables"], 1)
+        self.assertEqual(manifest[1]["counts"]["paragraphs"], 0)
+        
+        # タイトルがない場合はパーサーと同じ既定のタイトル
+        self.assertEqual(manifest[2]["title"], "スライド 3")
+    
+    def test_scan_markdown_file(self):
+        """ファイルからバイト範囲付きのマニフェストが作成できること"""
+        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".md")
+        temp_file.write(self.test_md_content.encode("utf-8"))
+        temp_file.close()
+        
+        try:
+            manifest = scan_markdown_file(temp_file.name)
+        finally:
+            os.unlink(temp_file.name)
+        
+        data = self.test_md_content.encode("utf-8")
+        self.assertEqual(len(manifest), 3)
+        self.assertTrue(data[manifest[0]["start"]:].startswith("# スライド1タイトル".encode("utf-8")))
+        self.assertEqual(manifest[2]["end"], len(data.rstrip()))
+
+    def test_crlf(self):
+        """CRLFとCRの改行でもパーサーと同じスライドを検出すること"""
+        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".md")
+        temp_file.write("# A\r\n\r\n本文\r\n\r\n---\r\n\r\n# B\r<!-- pagebreak -->\r# C".encode("utf-8"))
+        temp_file.close()
+        
+        try:
+            manifest = scan_markdown_file(temp_file.name)
+            slides_data = self.parser.process_markdown_file(temp_file.name)
+        finally:
+            os.unlink(temp_file.name)
+        
+        self.assertEqual([entry["title"] for entry in manifest], ["A", "B", "C"])
+        self.assertEqual([entry["title"] for entry in manifest], [slide["title"] for slide in slides_data])
+        self.assertEqual([(entry["start"], entry["end"]) for entry in manifest],
+                         [slide.span[1:] for slide in slides_data])
+    
+    def test_includes(self):
+        """インクルードを展開し、パーサーと同じスライドを同じ順に走査すること"""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            os.makedirs(os.path.join(temp_dir, "chapters"))
+            deck = os.path.join(temp_dir, "deck.md")
+            chapter = os.path.join(temp_dir, "chapters", "one.md")
+            with open(deck, "w", encoding="utf-8") as f:
+                f.write("# Intro\n\n```\n<!-- include: ignored.md -->\n```\n\n<!-- include: chapters/one.md -->\n\n"
+                        "---\n\n# End")
+            with open(chapter, "w", encoding="utf-8") as f:
+                f.write("# Ch1\n\n---\n\n# Ch1b")
+            
+            manifest = scan_markdown_file(deck)
+            slides_data = self.parser.process_markdown_file(deck)
+            
+            self.assertEqual(manifest_document(manifest, len(manifest))["total_slides"], len(slides_data))
+            self.assertEqual([entry["title"] for entry in manifest], [slide["title"] for slide in slides_data])
+            self.assertEqual([entry["title"] for entry in manifest], ["Intro", "Ch1", "Ch1b", "End"])
+            self.assertEqual([entry["index"] for entry in manifest], [0, 1, 2, 3])
+            self.assertEqual([entry["source"] for entry in manifest],
+                             [None, os.path.realpath(chapter), os.path.realpath(chapter), None])
+            with open(chapter, "rb") as f:
+                data = f.read()
+            self.assertEqual(data[manifest[2]["start"]:manifest[2]["end"]], b"# Ch1b")
+            
+            # 循環するインクルードはパーサーと同じくエラーになる
+            with open(chapter, "a", encoding="utf-8") as f:
+                f.write("\n\n<!-- include: ../deck.md -->")
+            with self.assertRaisesRegex(ValueError, "循環"):
+                scan_markdown_file(deck)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    def test_manifest_details(self):
+        """バイト数、コードと表の行数、画像の参照、描画コストが取得できること"""
+        content = (
+            "# 図\n\n![構成図](images/arch.png) と ![](<my image.png> \"題\")\n\n"
+            "| a | b |\n|---|---|\n| 1 | 2 |\n| 3 | 4 |\n- 表の後のリスト\n\n"
+            "```\n![コード内](ignored.png)\nline 2\n```\n"
+            "---\n# 空"
+        )
+        manifest = scan_markdown(content)
+        
+        first, second = manifest
+        self.assertEqual(first["bytes"], first["end"] - first["start"])
+        self.assertEqual(first["images"], ["images/arch.png", "my image.png"])
+        self.assertEqual(first["counts"]["images"], 2)
+        self.assertEqual(first["counts"]["tables"], 1)
+        self.assertEqual(first["counts"]["table_rows"], 3)
+        self.assertEqual(first["counts"]["list_items"], 1)
+        self.assertEqual(first["counts"]["code_lines"], 2)
+        self.assertEqual(first["estimated_cost"], estimate_build_cost(first["counts"], first["bytes"]))
+        self.assertGreater(first["estimated_cost"], second["estimated_cost"])
+        self.assertGreaterEqual(second["estimated_cost"], BUILD_COST_WEIGHTS["slide"])
+        
+        document = manifest_document(manifest[1:], len(manifest), "deck.md")
+        self.assertEqual(document["total_slides"], 2)
+        self.assertEqual(document["slide_count"], 1)
+        self.assertEqual(document["bytes"], second["bytes"])
+        self.assertEqual(document["images"], [])
+        self.assertEqual(document["estimated_cost"], second["estimated_cost"])    
+    def test_split_segments(self):
+        """区切り行の間の範囲から空白を除くとスライドの範囲になること"""
+        data = "---\n# A\n\n---\n\n\n---\n# B\n---".encode("utf-8")
+        segments = split_segments(data)
+        self.assertEqual(segments[0], (0, 0))
+        self.assertEqual(segments[-1], (len(data), len(data)))
+        self.assertEqual([data[start:end].strip() for start, end in segments if data[start:end].strip()],
+                         [data[start:end] for start, end in iter_slide_spans(data)])
+    
+    def test_extra_spaces(self):
+        """列挙した空白文字が str.isspace() の複数バイトの空白文字と一致すること"""
+        expected = {chr(code).encode("utf-8") for code in range(0x80, sys.maxunicode + 1) if chr(code).isspace()}
+        self.assertEqual(set(_EXTRA_SPACES), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
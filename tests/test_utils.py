@@ -0,0 +1,77 @@
+"""
+md2pptx-builder - ユーティリティ関数のテスト
+"""
+
+import unittest
+
+from md2pptx_builder.utils import parse_slide_selection, select_slide_indices, flatten_text, TextFlattener
+
+class TestSlideSelection(unittest.TestCase):
+    """スライドの選択指定のテスト"""
+    
+    def test_parse(self):
+        """番号と範囲をパースできること"""
+        self.assertEqual(parse_slide_selection("300-320,5"), [(300, 320), (5, 5)])
+        self.assertEqual(parse_slide_selection(" 7- , 2 "), [(7, None), (2, 2)])
+    
+    def test_invalid(self):
+        """不正な指定はValueErrorとなること"""
+        for spec in ("", "a", "0", "5-3", "1-x", ","):
+            with self.assertRaises(ValueError, msg=spec):
+                parse_slide_selection(spec)
+    
+    def test_select(self):
+        """文書順に重複なく、範囲外を除いて選択すること"""
+        ranges = parse_slide_selection("8-12,2,3-4,4,20")
+        self.assertEqual(select_slide_indices(ranges, 10), [1, 2, 3, 7, 8, 9])
+        self.assertEqual(select_slide_indices(parse_slide_selection("3-"), 5), [2, 3, 4])
+
+class TestFlattenText(unittest.TestCase):
+    """ノードのテキストの連結のテスト"""
+    
+    def test_inline(self):
+        """入れ子のインライン要素のテキストを文書順に連結すること"""
+        node = {"type": "paragraph", "children": [
+            {"type": "text", "raw": "a"},
+            {"type": "strong", "children": [
+                {"type": "emphasis", "children": [
+                    {"type": "link", "children": [{"type": "strong", "children": [{"type": "text", "raw": "b"}]}]}
+                ]},
+                {"type": "codespan", "raw": "c"},
+            ]},
+            {"type": "softbreak"},
+            {"type": "text", "raw": "d"},
+        ]}
+        self.assertEqual(flatten_text(node), "abcd")
+    
+    def test_skips_nested_lists(self):
+        """リスト項目のテキストにネストされたリストを含めないこと"""
+        item = {"type": "list_item", "children": [
+            {"type": "block_text", "children": [{"type": "text", "raw": "親"}]},
+            {"type": "list", "children": [{"type": "list_item", "children": [
+                {"type": "block_text", "children": [{"type": "text", "raw": "子"}]}
+            ]}]},
+        ]}
+        self.assertEqual(flatten_text(item), "親")
+        self.assertEqual(flatten_text(item["children"][1]), "子")
+    
+    def test_deep_nesting(self):
+        """再帰の上限を超える深さでも扱えること"""
+        node = {"type": "text", "raw": "x"}
+        for _ in range(50000):
+            node = {"type": "emphasis", "children": [node]}
+        self.assertEqual(flatten_text(node), "x")
+    
+    def test_memo(self):
+        """同じノードの結果を記憶し、ノードには書き込まないこと"""
+        node = {"type": "paragraph", "children": [{"type": "text", "raw": "a"}]}
+        text = TextFlattener()
+        self.assertEqual(text(node), "a")
+        node["children"].append({"type": "text", "raw": "b"})
+        self.assertEqual(text(node), "a")
+        self.assertEqual(set(node), {"type", "children"})
+        text.clear()
+        self.assertEqual(text(node), "ab")
+
+if __name__ == "__main__":
+    unittest.main()